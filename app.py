@@ -2,14 +2,26 @@ from flask import Flask, jsonify
 from config import Config
 import logging
 from backend.utils.json_encoder import CustomJSONEncoder
-from backend.utils.session_interface import setup_database_sessions
+from backend.utils.session_interface import setup_sessions
 
 # Create Flask app
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# Setup database-based sessions for concurrent support
-setup_database_sessions(app)
+# Bring the database schema up to date once at startup
+from backend.services.schema_service import apply_migrations
+apply_migrations()
+
+# Resume report writes left in the write-behind spool by a previous run
+from backend.services.write_behind import get_write_behind_queue
+get_write_behind_queue()
+
+# Setup sessions (database-backed or signed cookies, per SESSION_MODE)
+setup_sessions(app)
+
+# Write each request's interview state once, when the request ends
+from backend.services.redis_service import flush_interview_data
+app.teardown_request(flush_interview_data)
 
 # Setup monitoring for concurrent interviews
 from backend.services.monitoring_service import start_monitoring
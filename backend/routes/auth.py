@@ -1,5 +1,5 @@
 from flask import Blueprint, render_template, request, session, redirect, url_for, jsonify
-from backend.services.snowflake_service import get_snowflake_connection
+from backend.services.connection_pool import pooled_connection
 from backend.services.redis_service import clear_interview_data
 from werkzeug.security import generate_password_hash, check_password_hash
 import uuid
@@ -51,16 +51,12 @@ def login():
 
         # --- Student / normal login via Snowflake ---
         try:
-            conn = get_snowflake_connection()
-            if not conn:
-                raise Exception("Could not connect to Snowflake")
-
-            cs = conn.cursor()
-            logger.debug(f"Checking credentials for user: {username}")
-            cs.execute("SELECT PASSWORD FROM REGISTER WHERE EMAIL_ID=%s;", (username,))
-            row = cs.fetchone()
-            cs.close()
-            conn.close()
+            with pooled_connection() as conn:
+                cs = conn.cursor()
+                logger.debug(f"Checking credentials for user: {username}")
+                cs.execute("SELECT PASSWORD FROM REGISTER WHERE EMAIL_ID=%s;", (username,))
+                row = cs.fetchone()
+                cs.close()
 
             if row and check_password_hash(row[0], password):
                 logger.debug("User login successful")
@@ -98,32 +94,15 @@ def register():
         hashed_password = generate_password_hash(password)
         student_id = str(uuid.uuid4())
         try:
-            conn = get_snowflake_connection()
-            if not conn:
-                raise Exception("Could not connect to Snowflake")
-            cs = conn.cursor()
-            logger.debug("Creating REGISTER table if not exists")
-            cs.execute("""
-                CREATE TABLE IF NOT EXISTS REGISTER (
-                    STUDENT_ID STRING PRIMARY KEY,
-                    NAME STRING,
-                    COURSE_NAME STRING,
-                    EMAIL_ID STRING,
-                    MOBILE_NO STRING,
-                    CENTER STRING,
-                    BATCH_NO STRING,
-                    PASSWORD STRING,
-                    CREATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-                """)
-            logger.debug("Inserting new user registration")
-            cs.execute("""
-                INSERT INTO REGISTER (STUDENT_ID, NAME, COURSE_NAME, EMAIL_ID, MOBILE_NO, CENTER, BATCH_NO, PASSWORD)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s);
-            """, (student_id, name, course_name, email_id, mobile_no, center, batch_no, hashed_password))
-            conn.commit()
-            cs.close()
-            conn.close()
+            with pooled_connection() as conn:
+                cs = conn.cursor()
+                logger.debug("Inserting new user registration")
+                cs.execute("""
+                    INSERT INTO REGISTER (STUDENT_ID, NAME, COURSE_NAME, EMAIL_ID, MOBILE_NO, CENTER, BATCH_NO, PASSWORD)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s);
+                """, (student_id, name, course_name, email_id, mobile_no, center, batch_no, hashed_password))
+                conn.commit()
+                cs.close()
             logger.info(f"Registration successful for email: {email_id}")
             return render_template("login.html", message="Registration successful! Please login.")
         except Exception as e:
@@ -146,23 +125,22 @@ def forgot_password():
         logger.debug(f"Password reset for email: {email}")
         
         try:
-            # Connect to Snowflake
-            conn = get_snowflake_connection()
-            if not conn:
-                raise Exception("Could not connect to Snowflake")
-            cs = conn.cursor()
-
-            # Check if user exists
-            cs.execute("SELECT * FROM REGISTER WHERE EMAIL_ID=%s", (email,))
-            user = cs.fetchone()
-            if not user:
-                logger.warning(f"No account found for email: {email}")
-                return render_template("forgot_password.html", error="No account found with that email.")
-
-            # Update new password
-            logger.debug(f"Updating password for email: {email}")
-            cs.execute("UPDATE REGISTER SET PASSWORD=%s WHERE EMAIL_ID=%s", (hashed_password, email))
-            conn.commit()
+            with pooled_connection() as conn:
+                cs = conn.cursor()
+
+                # Check if user exists
+                cs.execute("SELECT * FROM REGISTER WHERE EMAIL_ID=%s", (email,))
+                user = cs.fetchone()
+                if not user:
+                    cs.close()
+                    logger.warning(f"No account found for email: {email}")
+                    return render_template("forgot_password.html", error="No account found with that email.")
+
+                # Update new password
+                logger.debug(f"Updating password for email: {email}")
+                cs.execute("UPDATE REGISTER SET PASSWORD=%s WHERE EMAIL_ID=%s", (hashed_password, email))
+                conn.commit()
+                cs.close()
 
             # Prepare email
             msg = MIMEText(
@@ -180,9 +158,6 @@ def forgot_password():
                 server.login(Config.GMAIL_EMAIL, Config.GMAIL_APP_PASSWORD)  # Use Gmail App Password
                 server.send_message(msg)
 
-            cs.close()
-            conn.close()
-
             logger.info(f"Password reset email sent to: {email}")
             return render_template("forgot_password.html", message="A new password has been sent to your email.")
         
@@ -1,12 +1,16 @@
 from flask import Blueprint, render_template, session, redirect, url_for, send_file, jsonify, send_from_directory, flash, request
 from werkzeug.utils import secure_filename
-from backend.services.snowflake_service import get_snowflake_connection
+from backend.services.connection_pool import pooled_connection
+from backend.services.query_cache import cached_query, invalidate_tables
 import pandas as pd
 import io
 import logging
+import uuid
 import json
 from backend.utils.file_utils import extract_text_from_file
 from backend.services.redis_service import save_interview_data, get_interview_data
+from backend.services.question_service import pregenerate_questions
+from backend.utils.compression import decompress_text
 import os
 from backend.services.email_service import send_email
 from backend.routes.interview import insert_jd
@@ -29,21 +33,16 @@ def dashboard():
         logger.warning("Unauthorized access to dashboard")
         return redirect(url_for("auth.login"))
     try:
-        conn = get_snowflake_connection()
-        if not conn:
-            raise Exception("Could not connect to Snowflake")
-        cs = conn.cursor()
         # Only fetch ratings for the logged-in student
-        cs.execute("""
+        rows, cols = cached_query("""
             SELECT roll_no, technical_rating, communication_rating, problem_solving_rating,
                    time_management_rating, total_rating, interview_ts
             FROM interview_rating
             WHERE roll_no = %s AND total_rating IS NOT NULL
             ORDER BY interview_ts
             LIMIT 200
-        """, (session["user"],))
-        rows = cs.fetchall()
-        cols = [desc[0].lower() for desc in cs.description]
+        """, (session["user"],), tables=('interview_rating',))
+        cols = [col.lower() for col in cols]
         df_ratings = pd.DataFrame(rows, columns=cols)
         df_ratings['interview_number'] = range(1, len(df_ratings) + 1)
         skill_avg = {
@@ -62,8 +61,6 @@ def dashboard():
         recent_interviews = []
         if not df_ratings.empty:
             recent_interviews = df_ratings.sort_values('interview_ts', ascending=False).head(3).to_dict('records')
-        cs.close()
-        conn.close()
         # skill_avg_json = json.dumps(skill_avg)
         line_data_json = json.dumps(line_data)
         return render_template(
@@ -91,22 +88,15 @@ def recruiter_home():
         return redirect(url_for('auth.login', next=request.path))  # <-- Pass next=request.path to redirect after login
     
     try:
-        # Get connection to Snowflake
-        conn = get_snowflake_connection()
-        if not conn:
-            raise Exception("Could not connect to Snowflake")
-        cs = conn.cursor()
-        
-        # Fetch interview ratings
-        cs.execute("""
+        # Fetch interview ratings (cached briefly; recruiters refresh this page constantly)
+        ratings_rows, ratings_cols = cached_query("""
             SELECT roll_no, technical_rating, communication_rating, problem_solving_rating,
                    time_management_rating, total_rating, interview_ts
             FROM interview_rating
             ORDER BY interview_ts DESC
             LIMIT 100
-        """)
-        ratings_rows = cs.fetchall()
-        ratings_cols = [desc[0].lower() for desc in cs.description]
+        """, tables=('interview_rating',))
+        ratings_cols = [col.lower() for col in ratings_cols]
         interview_ratings_json = [
             {
                 "roll_no": row[0],
@@ -121,32 +111,27 @@ def recruiter_home():
         ]
         
         # Fetch interview table details
-        cs.execute("""
+        interview_table_rows, interview_table_cols = cached_query("""
             SELECT student_name, roll_no, batch_no, center, course, evaluation_date, difficulty_level, interview_ts, jd_id, status
             FROM interview
             ORDER BY interview_ts DESC
             LIMIT 100
-        """)
-        interview_table_rows = cs.fetchall()
-        interview_table_cols = [desc[0].lower() for desc in cs.description]
+        """, tables=('interview',))
+        interview_table_cols = [col.lower() for col in interview_table_cols]
         interview_table_json = [
             {col: row[i] for i, col in enumerate(interview_table_cols)}
             for row in interview_table_rows
         ]
         
         # Fetch visual feedback details
-        cs.execute("""
+        visual_feedback_rows, visual_feedback_cols = cached_query("""
             SELECT roll_no, professional_appearance, body_language, environment, 
                    distractions, interview_ts
             FROM visual_feedback
             ORDER BY interview_ts DESC
             LIMIT 100
-        """)
-        visual_feedback_rows = cs.fetchall()
-        visual_feedback_cols = [desc[0].lower() for desc in cs.description]
-        
-        cs.close()
-        conn.close()
+        """, tables=('visual_feedback',))
+        visual_feedback_cols = [col.lower() for col in visual_feedback_cols]
         
         # Serialize interview data
         interview_table_serialized = [serialize_row(row) for row in interview_table_rows]
@@ -178,21 +163,18 @@ def export_interview_ratings():
         logger.warning("Unauthorized export attempt")
         return redirect(url_for('auth.login', next=request.path))
     try:
-        conn = get_snowflake_connection()
-        if not conn:
-            raise Exception("Could not connect to Snowflake")
-        cs = conn.cursor()
-        cs.execute("""
-            SELECT roll_no, technical_rating, communication_rating, problem_solving_rating,
-                   time_management_rating, total_rating, interview_ts
-            FROM interview_rating
-            ORDER BY interview_ts DESC
-            LIMIT 200
-        """)
-        rows = cs.fetchall()
-        cols = [desc[0] for desc in cs.description]
-        cs.close()
-        conn.close()
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                SELECT roll_no, technical_rating, communication_rating, problem_solving_rating,
+                       time_management_rating, total_rating, interview_ts
+                FROM interview_rating
+                ORDER BY interview_ts DESC
+                LIMIT 200
+            """)
+            rows = cs.fetchall()
+            cols = [desc[0] for desc in cs.description]
+            cs.close()
         df = pd.DataFrame(rows, columns=cols)
         output = io.BytesIO()
         with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
@@ -213,20 +195,17 @@ def export_student_info():
         logger.warning("Unauthorized export attempt")
         return redirect(url_for('auth.login', next=request.path))
     try:
-        conn = get_snowflake_connection()
-        if not conn:
-            raise Exception("Could not connect to Snowflake")
-        cs = conn.cursor()
-        cs.execute("""
-            SELECT student_name, roll_no, batch_no, center, course, evaluation_date, difficulty_level, interview_ts
-            FROM student_info
-            ORDER BY interview_ts DESC
-            LIMIT 200
-        """)
-        rows = cs.fetchall()
-        cols = [desc[0] for desc in cs.description]
-        cs.close()
-        conn.close()
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                SELECT student_name, roll_no, batch_no, center, course, evaluation_date, difficulty_level, interview_ts
+                FROM student_info
+                ORDER BY interview_ts DESC
+                LIMIT 200
+            """)
+            rows = cs.fetchall()
+            cols = [desc[0] for desc in cs.description]
+            cs.close()
         df = pd.DataFrame(rows, columns=cols)
         output = io.BytesIO()
         with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
@@ -247,21 +226,18 @@ def export_visual_feedback():
         logger.warning("Unauthorized export attempt")
         return redirect(url_for('auth.login', next=request.path))
     try:
-        conn = get_snowflake_connection()
-        if not conn:
-            raise Exception("Could not connect to Snowflake")
-        cs = conn.cursor()
-        cs.execute("""
-            SELECT roll_no, professional_appearance, body_language, environment, 
-                   distractions, interview_ts
-            FROM visual_feedback
-            ORDER BY interview_ts DESC
-            LIMIT 200
-        """)
-        rows = cs.fetchall()
-        cols = [desc[0] for desc in cs.description]
-        cs.close()
-        conn.close()
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                SELECT roll_no, professional_appearance, body_language, environment, 
+                       distractions, interview_ts
+                FROM visual_feedback
+                ORDER BY interview_ts DESC
+                LIMIT 200
+            """)
+            rows = cs.fetchall()
+            cols = [desc[0] for desc in cs.description]
+            cs.close()
         df = pd.DataFrame(rows, columns=cols)
         output = io.BytesIO()
         with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
@@ -291,23 +267,22 @@ def student_reports():
     if "user" not in session or session.get("role") != "student":
         return redirect(url_for("auth.login"))
     try:
-        conn = get_snowflake_connection()
-        cs = conn.cursor()
-        cs.execute("""
-            SELECT ir.roll_no, ir.technical_rating, ir.communication_rating, ir.problem_solving_rating,
-                   ir.time_management_rating, ir.total_rating, ir.interview_ts,
-                   si.course, si.evaluation_date, si.difficulty_level
-            FROM interview_rating ir
-            JOIN student_info si ON ir.roll_no = si.roll_no AND ir.interview_ts = si.interview_ts
-            WHERE ir.roll_no = %s
-            ORDER BY ir.interview_ts DESC
-        """, (session["user"],))
-        reports = cs.fetchall()
-        # KPIs: average rating (out of 10), completed interviews
-        completed_interviews = len(reports)
-        average_rating = round(sum(r[5] for r in reports) / completed_interviews, 1) if completed_interviews > 0 else 0
-        cs.close()
-        conn.close()
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                SELECT ir.roll_no, ir.technical_rating, ir.communication_rating, ir.problem_solving_rating,
+                       ir.time_management_rating, ir.total_rating, ir.interview_ts,
+                       si.course, si.evaluation_date, si.difficulty_level
+                FROM interview_rating ir
+                JOIN student_info si ON ir.roll_no = si.roll_no AND ir.interview_ts = si.interview_ts
+                WHERE ir.roll_no = %s
+                ORDER BY ir.interview_ts DESC
+            """, (session["user"],))
+            reports = cs.fetchall()
+            # KPIs: average rating (out of 10), completed interviews
+            completed_interviews = len(reports)
+            average_rating = round(sum(r[5] for r in reports) / completed_interviews, 1) if completed_interviews > 0 else 0
+            cs.close()
         return render_template("student_reports.html", reports=reports, average_rating=average_rating, completed_interviews=completed_interviews)
     except Exception as e:
         return f"Error loading reports: {e}"
@@ -316,19 +291,18 @@ def student_reports():
 def schedule_interview():
     if 'user' not in session or session.get('role') != 'recruiter':
         return redirect(url_for('auth.login'))
-    conn = get_snowflake_connection()
-    cs = conn.cursor()
-    cs.execute("""
-        SELECT si.student_name, si.roll_no, si.batch_no, si.center, si.course, si.evaluation_date, si.difficulty_level, si.interview_ts, r.email_id
-        FROM student_info si
-        JOIN REGISTER r ON si.roll_no = r.email_id
-        ORDER BY si.interview_ts DESC
-        LIMIT 200
-    """)
-    students = cs.fetchall()
-    student_cols = [desc[0].lower() for desc in cs.description]
-    cs.close()
-    conn.close()
+    with pooled_connection() as conn:
+        cs = conn.cursor()
+        cs.execute("""
+            SELECT si.student_name, si.roll_no, si.batch_no, si.center, si.course, si.evaluation_date, si.difficulty_level, si.interview_ts, r.email_id
+            FROM student_info si
+            JOIN REGISTER r ON si.roll_no = r.email_id
+            ORDER BY si.interview_ts DESC
+            LIMIT 200
+        """)
+        students = cs.fetchall()
+        student_cols = [desc[0].lower() for desc in cs.description]
+        cs.close()
     if request.method == 'POST':
         jd_file = request.files.get('jd_file')
         student_name = request.form.get('student_name')
@@ -362,33 +336,20 @@ def schedule_interview():
         jd_id = insert_jd(jd_text, admin_id)
         # Schedule interview for this student
         interview_ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        interview_id = str(uuid.uuid4())
         # Insert into new interview table
-        conn = get_snowflake_connection()
-        cs = conn.cursor()
-        cs.execute("""
-            CREATE TABLE IF NOT EXISTS interview (
-                student_name TEXT,
-                roll_no TEXT,
-                email_id TEXT,
-                batch_no TEXT,
-                center TEXT,
-                course TEXT,
-                evaluation_date TEXT,
-                difficulty_level TEXT,
-                interview_ts TIMESTAMP,
-                jd_id TEXT,
-                status TEXT
-            );
-        """)
-        cs.execute("""
-            INSERT INTO interview (student_name, roll_no, email_id, batch_no, center, course, evaluation_date, difficulty_level, language, interview_ts, jd_id, status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (student_name, roll_no, email_id, batch_no, center, course, evaluation_date, difficulty_level, request.form.get('language'), interview_ts, jd_id, 'Scheduled'))
-        conn.commit()
-        cs.close()
-        conn.close()
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                INSERT INTO interview (interview_id, student_name, roll_no, email_id, batch_no, center, course, evaluation_date, difficulty_level, language, interview_ts, jd_id, status)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (interview_id, student_name, roll_no, email_id, batch_no, center, course, evaluation_date, difficulty_level, request.form.get('language'), interview_ts, jd_id, 'Scheduled'))
+            conn.commit()
+            cs.close()
+        invalidate_tables('interview')
         # Save to Redis for interview flow
         interview_data = {
+            'interview_id': interview_id,
             'jd_text': jd_text,
             'jd_id': jd_id,
             'scheduled': True,
@@ -397,6 +358,7 @@ def schedule_interview():
             'language': request.form.get('language')
         }
         save_interview_data(email_id, interview_data)
+        pregenerate_questions(interview_id, jd_text, difficulty_level, roll_no, request.form.get('language'))
         flash('Interview scheduled and notification sent!', 'success')
         return render_template('schedule_interview.html', show_modal=True)
     return render_template('schedule_interview.html', students=students, student_cols=student_cols)
@@ -465,32 +427,13 @@ def performance_reports():
     if "user" not in session or session.get("role") != "recruiter":
         return redirect(url_for("auth.login"))
     try:
-        conn = get_snowflake_connection()
-        cs = conn.cursor()
-        cs.execute("""
-            CREATE TABLE IF NOT EXISTS student_performance_report (
-                id INTEGER AUTOINCREMENT PRIMARY KEY,
-                student_name TEXT,
-                roll_no TEXT,
-                batch_no TEXT,
-                center TEXT,
-                course TEXT,
-                evaluation_date TEXT,
-                difficulty_level TEXT,
-                interview_ts TIMESTAMP,
-                report TEXT
-            );
-        """)
-        cs.execute("""
-            SELECT id, student_name, roll_no, batch_no, center, course, evaluation_date, difficulty_level, interview_ts, report
+        reports, cols = cached_query("""
+            SELECT id, student_name, roll_no, batch_no, center, course, evaluation_date, difficulty_level, interview_ts,
+                   report IS NOT NULL AS has_report
             FROM student_performance_report
             ORDER BY interview_ts DESC
             LIMIT 200
-        """)
-        reports = cs.fetchall()
-        cols = [desc[0] for desc in cs.description]
-        cs.close()
-        conn.close()
+        """, tables=('student_performance_report',))
         return render_template("performance_reports.html", reports=reports, cols=cols)
     except Exception as e:
         return f"Error loading performance reports: {e}"
@@ -500,15 +443,14 @@ def view_performance_report(report_id):
     if "user" not in session or session.get("role") != "recruiter":
         return redirect(url_for("auth.login"))
     try:
-        conn = get_snowflake_connection()
-        cs = conn.cursor()
-        cs.execute("SELECT report FROM student_performance_report WHERE id = %s", (report_id,))
-        row = cs.fetchone()
-        cs.close()
-        conn.close()
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("SELECT report FROM student_performance_report WHERE id = %s", (report_id,))
+            row = cs.fetchone()
+            cs.close()
         if not row:
             return "Report not found", 404
-        return render_template("view_performance_report.html", report=row[0])
+        return render_template("view_performance_report.html", report=decompress_text(row[0]))
     except Exception as e:
         return f"Error loading report: {e}"
 
@@ -523,16 +465,15 @@ def download_performance_report(report_id):
     try:
         try:
             import pdfkit
-            conn = get_snowflake_connection()
-            cs = conn.cursor()
-            cs.execute("SELECT report FROM student_performance_report WHERE id = %s", (report_id,))
-            row = cs.fetchone()
-            cs.close()
-            conn.close()
+            with pooled_connection() as conn:
+                cs = conn.cursor()
+                cs.execute("SELECT report FROM student_performance_report WHERE id = %s", (report_id,))
+                row = cs.fetchone()
+                cs.close()
             if not row:
                 return "Report not found", 404
             # Use the same template as the view button for PDF export
-            report_html = render_template("view_performance_report.html", report=row[0], pdf_export=True)
+            report_html = render_template("view_performance_report.html", report=decompress_text(row[0]), pdf_export=True)
             pdf = pdfkit.from_string(report_html, False)
             return send_file(
                 io.BytesIO(pdf),
@@ -541,15 +482,14 @@ def download_performance_report(report_id):
                 mimetype='application/pdf'
             )
         except (ImportError, OSError):
-            conn = get_snowflake_connection()
-            cs = conn.cursor()
-            cs.execute("SELECT report FROM student_performance_report WHERE id = %s", (report_id,))
-            row = cs.fetchone()
-            cs.close()
-            conn.close()
+            with pooled_connection() as conn:
+                cs = conn.cursor()
+                cs.execute("SELECT report FROM student_performance_report WHERE id = %s", (report_id,))
+                row = cs.fetchone()
+                cs.close()
             if not row:
                 return "Report not found", 404
-            report_html = render_template("view_performance_report.html", report=row[0], pdf_export=True)
+            report_html = render_template("view_performance_report.html", report=decompress_text(row[0]), pdf_export=True)
             output = io.BytesIO(report_html.encode('utf-8'))
             return send_file(output, download_name=f"performance_report_{report_id}.html", as_attachment=True, mimetype='text/html')
     except Exception as e:
@@ -561,19 +501,14 @@ def student_performance():
         return redirect(url_for("auth.login"))
     try:
         roll_no = session["user"]
-        conn = get_snowflake_connection()
-        cs = conn.cursor()
-        cs.execute("""
-            SELECT id, student_name, roll_no, batch_no, center, course, evaluation_date, difficulty_level, interview_ts, report
+        reports, cols = cached_query("""
+            SELECT id, student_name, roll_no, batch_no, center, course, evaluation_date, difficulty_level, interview_ts,
+                   report IS NOT NULL AS has_report
             FROM student_performance_report
             WHERE roll_no = %s
             ORDER BY interview_ts DESC
             LIMIT 200
-        """, (roll_no,))
-        reports = cs.fetchall()
-        cols = [desc[0] for desc in cs.description]
-        cs.close()
-        conn.close()
+        """, (roll_no,), tables=('student_performance_report',))
         return render_template("student_performance.html", reports=reports, cols=cols)
     except Exception as e:
         return f"Error loading your performance reports: {e}"
@@ -587,18 +522,17 @@ def student_view_performance_report(report_id):
         return redirect(url_for("auth.login"))
 
     try:
-        conn = get_snowflake_connection()
-        cs = conn.cursor()
-        cs.execute("SELECT report FROM student_performance_report WHERE id = %s", (report_id,))
-        row = cs.fetchone()
-        cs.close()
-        conn.close()
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("SELECT report FROM student_performance_report WHERE id = %s", (report_id,))
+            row = cs.fetchone()
+            cs.close()
 
         if not row:
             return "<div class='text-danger'>Report not found.</div>", 404
 
         # Render the report using the same template as recruiter
-        return render_template("view_performance_report.html", report=row[0])
+        return render_template("view_performance_report.html", report=decompress_text(row[0]))
 
     except Exception as e:
         return f"<div class='text-danger'>Error loading report: {e}</div>", 500
@@ -610,15 +544,14 @@ def student_download_performance_report(report_id):
     try:
         try:
             import pdfkit
-            conn = get_snowflake_connection()
-            cs = conn.cursor()
-            cs.execute("SELECT report FROM student_performance_report WHERE id = %s", (report_id,))
-            row = cs.fetchone()
-            cs.close()
-            conn.close()
+            with pooled_connection() as conn:
+                cs = conn.cursor()
+                cs.execute("SELECT report FROM student_performance_report WHERE id = %s", (report_id,))
+                row = cs.fetchone()
+                cs.close()
             if not row:
                 return "Report not found", 404
-            report_html = render_template("view_performance_report.html", report=row[0], pdf_export=True)
+            report_html = render_template("view_performance_report.html", report=decompress_text(row[0]), pdf_export=True)
             pdf = pdfkit.from_string(report_html, False)
             return send_file(
                 io.BytesIO(pdf),
@@ -627,15 +560,14 @@ def student_download_performance_report(report_id):
                 mimetype='application/pdf'
             )
         except (ImportError, OSError):
-            conn = get_snowflake_connection()
-            cs = conn.cursor()
-            cs.execute("SELECT report FROM student_performance_report WHERE id = %s", (report_id,))
-            row = cs.fetchone()
-            cs.close()
-            conn.close()
+            with pooled_connection() as conn:
+                cs = conn.cursor()
+                cs.execute("SELECT report FROM student_performance_report WHERE id = %s", (report_id,))
+                row = cs.fetchone()
+                cs.close()
             if not row:
                 return "Report not found", 404
-            report_html = render_template("view_performance_report.html", report=row[0], pdf_export=True)
+            report_html = render_template("view_performance_report.html", report=decompress_text(row[0]), pdf_export=True)
             output = io.BytesIO(report_html.encode('utf-8'))
             return send_file(output, download_name=f"performance_report_{report_id}.html", as_attachment=True, mimetype='text/html')
     except Exception as e:
@@ -1,19 +1,26 @@
 from flask import Blueprint, render_template, request, session, jsonify, redirect, url_for, send_file, flash
 from backend.services.redis_service import get_interview_data, save_interview_data, clear_interview_data, init_interview_data
 from backend.services.monitoring_service import interview_monitor, system_monitor
-from backend.services.snowflake_service import get_snowflake_connection
+from backend.services.connection_pool import pooled_connection
+from backend.services.write_behind import enqueue_write
+from backend.services.schema_cache import table_columns
+from backend.services.query_cache import invalidate_tables
 from backend.services.openai_service import (
-    generate_questions_from_jd,
     generate_encouragement_prompt,
     evaluate_response,
     generate_interview_report,
     translate_text
 )
+from backend.services.question_service import (
+    sanitize_question_text,
+    generate_interview_questions,
+    get_question_pregenerator,
+    pregenerate_questions
+)
 from backend.services.audio_service import text_to_speech, process_audio_from_base64
 from backend.services.visual_service import process_frame_for_gpt4v, analyze_visual_response
 from backend.utils.file_utils import extract_text_from_file, save_conversation_to_file, load_conversation_from_file
 from config import Config
-import re
 import logging
 from datetime import datetime, timezone, timedelta
 from collections import Counter
@@ -21,89 +28,34 @@ import os
 from werkzeug.utils import secure_filename
 import requests
 import json
+import uuid
 from werkzeug.utils import secure_filename
 from deepgram.utils import verboselogs
 from deepgram import DeepgramClient,PrerecordedOptions,FileSource
 
 logger = logging.getLogger(__name__)
 interview_bp = Blueprint('interview', __name__)
-_interview_has_language = None
 DEEPGRAM_API = Config.DEEPGRAM_STT
 print("Deepgram API Key:", DEEPGRAM_API)
 
 deepgram = DeepgramClient(DEEPGRAM_API)
 
-def _sanitize_question_text(text):
-    """Remove leading markdown like **Question 1** / Question 1: and stray asterisks."""
-    if not text:
-        return text
-    
-    # Convert to string and strip whitespace
-    cleaned = str(text).strip()
-    
-    # AGGRESSIVE asterisk removal - handle all possible cases
-    
-    # Normalize non-breaking spaces
-    cleaned = cleaned.replace('\u00A0', ' ')
-    # 1. Remove any asterisks/bullets/hyphens at the very beginning (like "** ", "- ", "• ")
-    cleaned = re.sub(r'^[\s\*\-\u2022\u2023\u25E6\u2043\u2219]+', '', cleaned)
-    
-    # 2. Remove any asterisks at the very end
-    cleaned = re.sub(r'[\s\u00A0]*\*+[\s\u00A0]*$', '', cleaned)
-    
-    # 3. Remove all markdown asterisks from the entire text
-    # This handles cases like "**Question 1:** Tell us about yourself" or "*What is your experience?*"
-    cleaned = re.sub(r'\*+([^*]*?)\*+', r'\1', cleaned)
-    
-    # 4. Remove any remaining standalone asterisks (like "** " in the middle)
-    cleaned = re.sub(r'[\s\u00A0]+\*+[\s\u00A0]+', ' ', cleaned)
-    
-    # 5. Drop a leading line that is just a Question header (possibly bolded)
-    lines = cleaned.splitlines()
-    while lines and re.match(r"^\s*\**\s*question\s*\d+\s*\**\s*:?\s*$", lines[0], re.IGNORECASE):
-        lines.pop(0)
-    cleaned = "\n".join(lines).strip()
-    
-    # 6. Remove inline prefix like **Question 1:** or Question 1:
-    cleaned = re.sub(r"^\s*\**\s*question\s*\d+\s*\**\s*:?\s*", "", cleaned, flags=re.IGNORECASE)
-    
-    # 7. Remove any remaining question prefixes with numbers
-    cleaned = re.sub(r"^\s*\**\s*question\s*\d+\s*\**\s*:?\s*", "", cleaned, flags=re.IGNORECASE)
-    
-    # 8. Remove surrounding asterisks if entire text is wrapped
-    cleaned = re.sub(r"^\s*\*{1,3}\s*(.*?)\s*\*{1,3}\s*$", r"\1", cleaned)
-    
-    # 9. Final cleanup - remove any remaining asterisks/bullets at the beginning or end
-    cleaned = re.sub(r'^[\s\*\-\u2022\u2023\u25E6\u2043\u2219]+', '', cleaned)
-    cleaned = re.sub(r'[\s\*\-\u2022\u2023\u25E6\u2043\u2219]+$', '', cleaned)
-    
-    # 10. Clean up any double spaces that might have been created
-    cleaned = re.sub(r'[\s\u00A0]+', ' ', cleaned)
-    
-    return cleaned.strip()
-
-def interview_table_has_language():
-    global _interview_has_language
-    if _interview_has_language is not None:
-        return _interview_has_language
-    try:
-        conn = get_snowflake_connection()
-        cs = conn.cursor()
-        cs.execute("""
-            SELECT 1
-            FROM information_schema.columns
-            WHERE table_name = 'INTERVIEW'
-              AND table_schema = CURRENT_SCHEMA()
-              AND UPPER(column_name) = 'LANGUAGE'
-            LIMIT 1
-        """)
-        _interview_has_language = cs.fetchone() is not None
-        cs.close()
-        conn.close()
-    except Exception:
-        _interview_has_language = False
-    return _interview_has_language
+# Candidate details read from the interview table; columns missing from an older schema are skipped
+STUDENT_INFO_COLUMNS = ['student_name', 'roll_no', 'batch_no', 'center', 'course', 'evaluation_date', 'difficulty_level', 'language']
 
+def _apply_student_row(interview_data, row):
+    """Copy candidate details from an interview row (a column -> value dict) into interview_data"""
+    interview_data['student_info'] = {
+        'name': row.get('student_name'),
+        'roll_no': row.get('roll_no'),
+        'batch_no': row.get('batch_no'),
+        'center': row.get('center'),
+        'course': row.get('course'),
+        'eval_date': row.get('evaluation_date')
+    }
+    interview_data['difficulty_level'] = row.get('difficulty_level')
+    if 'language' in row:
+        interview_data['language'] = row['language']
 
 # Interview duration in seconds (15 minutes)
 INTERVIEW_DURATION = 900
@@ -111,65 +63,52 @@ INTERVIEW_DURATION = 900
 PAUSE_THRESHOLD = 10
 
 def get_jd_text(jd_id):
-    conn = get_snowflake_connection()
-    cs = conn.cursor()
-    cs.execute("SELECT jd_text FROM job_descriptions WHERE jd_id = %s", (jd_id,))
-    row = cs.fetchone()
-    cs.close()
-    conn.close()
+    with pooled_connection() as conn:
+        cs = conn.cursor()
+        cs.execute("SELECT jd_text FROM job_descriptions WHERE jd_id = %s", (jd_id,))
+        row = cs.fetchone()
+        cs.close()
     return row[0] if row else None
 
 def insert_jd(jd_text, admin_id):
-    conn = get_snowflake_connection()
-    cs = conn.cursor()
-    # Ensure table exists
-    cs.execute(
-        """
-        CREATE TABLE IF NOT EXISTS job_descriptions (
-            jd_id INTEGER AUTOINCREMENT PRIMARY KEY,
-            jd_text TEXT,
-            admin_id TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        """
-    )
-    # Insert the JD and try to fetch jd_id directly
-    jd_id = None
-    try:
-        cs.execute(
-            "INSERT INTO job_descriptions (jd_text, admin_id) VALUES (%s, %s) RETURNING jd_id",
-            (jd_text, admin_id)
-        )
-        row = cs.fetchone()
-        if row:
-            jd_id = row[0]
-    except Exception:
-        # Fallback path if RETURNING is not supported
-        cs.execute(
-            "INSERT INTO job_descriptions (jd_text, admin_id) VALUES (%s, %s)",
-            (jd_text, admin_id)
-        )
+    with pooled_connection() as conn:
+        cs = conn.cursor()
+        # Insert the JD and try to fetch jd_id directly
+        jd_id = None
         try:
             cs.execute(
-                "SELECT jd_id FROM job_descriptions WHERE jd_text = %s AND admin_id = %s ORDER BY jd_id DESC LIMIT 1",
+                "INSERT INTO job_descriptions (jd_text, admin_id) VALUES (%s, %s) RETURNING jd_id",
                 (jd_text, admin_id)
             )
             row = cs.fetchone()
-            jd_id = row[0] if row else None
-            if jd_id is None:
-                cs.execute("SELECT MAX(jd_id) FROM job_descriptions WHERE admin_id = %s", (admin_id,))
-                row2 = cs.fetchone()
-                jd_id = row2[0] if row2 and row2[0] is not None else None
+            if row:
+                jd_id = row[0]
         except Exception:
+            # Fallback path if RETURNING is not supported
+            cs.execute(
+                "INSERT INTO job_descriptions (jd_text, admin_id) VALUES (%s, %s)",
+                (jd_text, admin_id)
+            )
             try:
-                cs.execute("SELECT MAX(jd_id) FROM job_descriptions WHERE admin_id = %s", (admin_id,))
-                row3 = cs.fetchone()
-                jd_id = row3[0] if row3 and row3[0] is not None else None
+                cs.execute(
+                    "SELECT jd_id FROM job_descriptions WHERE jd_text = %s AND admin_id = %s ORDER BY jd_id DESC LIMIT 1",
+                    (jd_text, admin_id)
+                )
+                row = cs.fetchone()
+                jd_id = row[0] if row else None
+                if jd_id is None:
+                    cs.execute("SELECT MAX(jd_id) FROM job_descriptions WHERE admin_id = %s", (admin_id,))
+                    row2 = cs.fetchone()
+                    jd_id = row2[0] if row2 and row2[0] is not None else None
             except Exception:
-                jd_id = None
-    conn.commit()
-    cs.close()
-    conn.close()
+                try:
+                    cs.execute("SELECT MAX(jd_id) FROM job_descriptions WHERE admin_id = %s", (admin_id,))
+                    row3 = cs.fetchone()
+                    jd_id = row3[0] if row3 and row3[0] is not None else None
+                except Exception:
+                    jd_id = None
+        conn.commit()
+        cs.close()
     print(f"Inserted JD for admin {admin_id}, got jd_id: {jd_id}")
     return jd_id
 
@@ -243,23 +182,12 @@ def start_interview():
     # Ensure jd_id or jd_text exists; if missing, try DB; else error
     if not interview_data.get('jd_id') and not (interview_data.get('jd_text') and interview_data['jd_text'].strip()):
         try:
-            conn = get_snowflake_connection()
-            cs = conn.cursor()
-            if interview_table_has_language():
-                cs.execute(
-                    """
-                        SELECT jd_id, interview_ts, difficulty_level, language
-                        FROM interview
-                        WHERE email_id = %s
-                        ORDER BY interview_ts DESC
-                        LIMIT 1
-                    """,
-                    (email_id,)
-                )
-            else:
+            with pooled_connection() as conn:
+                cs = conn.cursor()
+                columns = table_columns('interview', ['interview_id', 'jd_id', 'interview_ts', 'difficulty_level', 'language'])
                 cs.execute(
-                    """
-                        SELECT jd_id, interview_ts, difficulty_level
+                    f"""
+                        SELECT {', '.join(columns)}
                         FROM interview
                         WHERE email_id = %s
                         ORDER BY interview_ts DESC
@@ -267,26 +195,26 @@ def start_interview():
                     """,
                     (email_id,)
                 )
-            row = cs.fetchone()
-            cs.close()
-            conn.close()
-            if row and row[0]:
-                interview_data['jd_id'] = row[0]
-                interview_data['interview_ts'] = row[1] if len(row) > 1 else None
-                if len(row) > 2 and row[2]:
-                    interview_data['difficulty_level'] = row[2]
-                if interview_table_has_language() and len(row) > 3 and row[3]:
-                    interview_data['language'] = row[3]
+                row = cs.fetchone()
+                cs.close()
+            row = dict(zip(columns, row)) if row else {}
+            if row.get('jd_id'):
+                interview_data['jd_id'] = row['jd_id']
+                interview_data['interview_id'] = row.get('interview_id')
+                interview_data['interview_ts'] = row.get('interview_ts')
+                if row.get('difficulty_level'):
+                    interview_data['difficulty_level'] = row['difficulty_level']
+                if row.get('language'):
+                    interview_data['language'] = row['language']
                 save_interview_data(email_id, interview_data)
             else:
                 # Final DB fallback: take latest JD in system
                 try:
-                    conn2 = get_snowflake_connection()
-                    cs2 = conn2.cursor()
-                    cs2.execute("SELECT MAX(jd_id) FROM job_descriptions")
-                    r = cs2.fetchone()
-                    cs2.close()
-                    conn2.close()
+                    with pooled_connection() as conn2:
+                        cs2 = conn2.cursor()
+                        cs2.execute("SELECT MAX(jd_id) FROM job_descriptions")
+                        r = cs2.fetchone()
+                        cs2.close()
                     if r and r[0]:
                         interview_data['jd_id'] = r[0]
                         save_interview_data(email_id, interview_data)
@@ -307,12 +235,11 @@ def start_interview():
         if not interview_data['jd_text']:
             # As a fallback, try latest jd_id for the admin (recruiter) that scheduled
             try:
-                conn = get_snowflake_connection()
-                cs = conn.cursor()
-                cs.execute("SELECT MAX(jd_id) FROM job_descriptions")
-                row = cs.fetchone()
-                cs.close()
-                conn.close()
+                with pooled_connection() as conn:
+                    cs = conn.cursor()
+                    cs.execute("SELECT MAX(jd_id) FROM job_descriptions")
+                    row = cs.fetchone()
+                    cs.close()
                 if row and row[0]:
                     interview_data['jd_id'] = row[0]
                     interview_data['jd_text'] = get_jd_text(interview_data['jd_id'])
@@ -350,33 +277,39 @@ def start_interview():
     # If difficulty_level is not set, fetch from scheduled interview record
     if not interview_data.get('difficulty_level'):
         try:
-            conn = get_snowflake_connection()
-            cs = conn.cursor()
-            # If interview_ts is missing, get the latest scheduled interview
-            if not interview_data.get('interview_ts'):
-                cs.execute("""
-                    SELECT difficulty_level, interview_ts FROM interview
-                    WHERE email_id = %s
-                    ORDER BY interview_ts DESC LIMIT 1
-                """, (email_id,))
-                row = cs.fetchone()
-                if row:
-                    interview_data['difficulty_level'] = row[0]
-                    interview_data['interview_ts'] = row[1]
-            else:
-                cs.execute("""
-                    SELECT difficulty_level FROM interview
-                    WHERE email_id = %s
-                      AND interview_ts = COALESCE(
-                        TRY_TO_TIMESTAMP_TZ(%s, 'YYYY-MM-DD"T"HH24:MI:SS.FF TZHTZM')::TIMESTAMP_NTZ,
-                        TRY_TO_TIMESTAMP(%s, 'YYYY-MM-DD HH24:MI:SS')
-                      )
-                """, (email_id, interview_data.get('interview_ts'), interview_data.get('interview_ts')))
-                row = cs.fetchone()
-                if row and row[0]:
-                    interview_data['difficulty_level'] = row[0]
-            cs.close()
-            conn.close()
+            with pooled_connection() as conn:
+                cs = conn.cursor()
+                if interview_data.get('interview_id'):
+                    cs.execute("SELECT difficulty_level FROM interview WHERE interview_id = %s", (interview_data['interview_id'],))
+                    row = cs.fetchone()
+                    if row and row[0]:
+                        interview_data['difficulty_level'] = row[0]
+                # If interview_ts is missing, get the latest scheduled interview
+                elif not interview_data.get('interview_ts'):
+                    cs.execute("""
+                        SELECT difficulty_level, interview_ts, interview_id FROM interview
+                        WHERE email_id = %s
+                        ORDER BY interview_ts DESC LIMIT 1
+                    """, (email_id,))
+                    row = cs.fetchone()
+                    if row:
+                        interview_data['difficulty_level'] = row[0]
+                        interview_data['interview_ts'] = row[1]
+                        interview_data['interview_id'] = row[2]
+                else:
+                    # Interviews started before interview_id existed
+                    cs.execute("""
+                        SELECT difficulty_level FROM interview
+                        WHERE email_id = %s
+                          AND interview_ts = COALESCE(
+                            TRY_TO_TIMESTAMP_TZ(%s, 'YYYY-MM-DD"T"HH24:MI:SS.FF TZHTZM')::TIMESTAMP_NTZ,
+                            TRY_TO_TIMESTAMP(%s, 'YYYY-MM-DD HH24:MI:SS')
+                          )
+                    """, (email_id, interview_data.get('interview_ts'), interview_data.get('interview_ts')))
+                    row = cs.fetchone()
+                    if row and row[0]:
+                        interview_data['difficulty_level'] = row[0]
+                cs.close()
         except Exception as e:
             logger.error(f"Error fetching difficulty_level: {e}")
     # If still not set, raise error (do NOT default to medium)
@@ -385,43 +318,16 @@ def start_interview():
         return jsonify({"status": "error", "message": "No difficulty level set for this interview. Please contact your recruiter."}), 400
     logger.debug(f"Starting interview with difficulty level: {interview_data['difficulty_level']}")
     try:
-        questions = generate_questions_from_jd(
-            interview_data['jd_text'],
-            interview_data['difficulty_level'],
-            interview_data.get('student_info', {}).get('roll_no', None),
-            interview_data.get('language', 'english')
-        )
-        # Ensure we have exactly 5 distinct, non-empty questions
-        fallback_pool = [
-            "Tell us about yourself.",
-            "What programming languages do you know?",
-            "Explain a basic project you've worked on.",
-            "Describe a challenge you faced and how you resolved it.",
-            "Where do you see yourself improving technically?"
-        ]
-        sanitized = []
-        seen = set()
-        for q in questions or []:
-            qn = _sanitize_question_text((q or "").strip())
-            if not qn:
-                continue
-            if qn in seen:
-                continue
-            sanitized.append(qn)
-            seen.add(qn)
-            if len(sanitized) == 5:
-                break
-        # Pad with fallback questions until we have 5
-        for fq in fallback_pool:
-            if len(sanitized) >= 5:
-                break
-            if fq not in seen:
-                sanitized.append(fq)
-                seen.add(fq)
-        if not sanitized:
-            logger.error("No questions generated, using fallback questions.")
-            sanitized = fallback_pool
-        interview_data['questions'] = sanitized[:5]
+        # Questions are normally generated when the interview is scheduled
+        questions = get_question_pregenerator().take(interview_data.get('interview_id'))
+        if not questions:
+            questions = generate_interview_questions(
+                interview_data['jd_text'],
+                interview_data['difficulty_level'],
+                interview_data.get('student_info', {}).get('roll_no', None),
+                interview_data.get('language', 'english')
+            )
+        interview_data['questions'] = questions
         interview_data['interview_started'] = True
         save_interview_data(email_id, interview_data)
         logger.info(f"Interview started with {len(questions)} questions")
@@ -484,7 +390,7 @@ def get_question():
                 return jsonify({"status": "error", "message": "No questions available"}), 400
             current_q = questions[idx]
             # Final safety check to ensure no asterisks remain
-            current_q = _sanitize_question_text(current_q)
+            current_q = sanitize_question_text(current_q)
             sel_lang = (interview_data.get('language') or 'english').lower()
             tts_lang = 'hi' if sel_lang in {'hindi', 'english+hindi', 'bilingual', 'hinglish', 'en+hi'} else 'en'
             audio_data = text_to_speech(current_q, tts_lang)
@@ -515,7 +421,7 @@ def get_question():
         interview_data['current_question'] = next_unique_idx
         current_q = questions[next_unique_idx]
         # Final safety check to ensure no asterisks remain
-        current_q = _sanitize_question_text(current_q)
+        current_q = sanitize_question_text(current_q)
         interview_data['conversation_history'].append({"speaker": "bot", "text": current_q})
         interview_data['current_answer'] = ""
         interview_data['waiting_for_answer'] = True
@@ -523,7 +429,7 @@ def get_question():
         if 'student_info' in interview_data and interview_data['student_info']:
             roll_no = interview_data['student_info'].get('roll_no')
         # Save per-interview conversation record (ensure question is clean before saving)
-        clean_question_for_save = _sanitize_question_text(current_q)
+        clean_question_for_save = sanitize_question_text(current_q)
         save_conversation_to_file([{ "speaker": "bot", "text": clean_question_for_save }], roll_no, interview_data.get('interview_ts'))
         interview_data['last_activity_time'] = datetime.now(timezone.utc)
         save_interview_data(email_id, interview_data)
@@ -584,8 +490,6 @@ def process_answer():
         interview_data['interview_time_used'] += speaking_time
         start_time = interview_data.get('start_time')
         if start_time:
-            if isinstance(start_time, str):
-                start_time = datetime.fromisoformat(start_time)
             elapsed = (datetime.now(timezone.utc) - start_time).total_seconds()
             if elapsed >= INTERVIEW_DURATION:
                 logger.info("Interview duration limit reached (elapsed time)")
@@ -716,17 +620,24 @@ def process_answer():
             interview_monitor.end_interview(email_id)
             
             try:
-                conn = get_snowflake_connection()
-                cs = conn.cursor()
-                # Update status to 'Completed' using both email_id and interview_ts
-                cs.execute("""
-                    UPDATE interview 
-                    SET status = 'Completed'
-                    WHERE email_id = %s AND interview_ts = TRY_TO_TIMESTAMP(%s, 'YYYY-MM-DD HH24:MI:SS')
-                """, (email_id, interview_data.get('interview_ts')))
-                conn.commit()
-                cs.close()
-                conn.close()
+                with pooled_connection() as conn:
+                    cs = conn.cursor()
+                    if interview_data.get('interview_id'):
+                        cs.execute("""
+                            UPDATE interview 
+                            SET status = 'Completed'
+                            WHERE interview_id = %s
+                        """, (interview_data['interview_id'],))
+                    else:
+                        # Update status to 'Completed' using both email_id and interview_ts
+                        cs.execute("""
+                            UPDATE interview 
+                            SET status = 'Completed'
+                            WHERE email_id = %s AND interview_ts = TRY_TO_TIMESTAMP(%s, 'YYYY-MM-DD HH24:MI:SS')
+                        """, (email_id, interview_data.get('interview_ts')))
+                    conn.commit()
+                    cs.close()
+                invalidate_tables('interview')
                 logger.info(f"Updated interview status to Completed for {email_id}")
             except Exception as e:
                 logger.error(f"Error updating interview status to Completed: {e}")
@@ -763,7 +674,8 @@ def check_speech():
         has_speech, speech_ratio = process_audio_from_base64(audio_data)
         interview_data['speech_detected'] = has_speech
         interview_data['last_speech_time'] = datetime.now(timezone.utc) if has_speech else None
-        save_interview_data(email_id, interview_data)
+        # Speech flags are transient; keep this 2s poll off the database
+        save_interview_data(email_id, interview_data, durable=False)
         speech_ended = False
         silence_duration = 0
         if interview_data['last_speech_time']:
@@ -821,9 +733,9 @@ def generate_report():
             # Sanitize any remaining asterisks in the conversation history
             for entry in conversation_history:
                 if 'text' in entry:
-                    entry['text'] = _sanitize_question_text(entry['text'])
+                    entry['text'] = sanitize_question_text(entry['text'])
                 if 'question' in entry:
-                    entry['question'] = _sanitize_question_text(entry['question'])
+                    entry['question'] = sanitize_question_text(entry['question'])
             interview_data['conversation_history'] = conversation_history
         report = generate_interview_report(interview_data)
         return jsonify({
@@ -841,37 +753,27 @@ def generate_report():
 
     # Fetch student/interview info from interview table
     try:
-        conn = get_snowflake_connection()
-        cs = conn.cursor()
-        if interview_table_has_language():
-            cs.execute("""
-                SELECT student_name, roll_no, batch_no, center, course, evaluation_date, difficulty_level, language
-                FROM interview
-                WHERE email_id = %s AND interview_ts = TRY_TO_TIMESTAMP_TZ(%s, 'YYYY-MM-DD"T"HH24:MI:SS.FF TZHTZM')::TIMESTAMP_NTZ
-                ORDER BY interview_ts DESC LIMIT 1
-            """, (email_id, interview_data.get('interview_ts')))
-        else:
-            cs.execute("""
-                SELECT student_name, roll_no, batch_no, center, course, evaluation_date, difficulty_level
-                FROM interview
-                WHERE email_id = %s AND interview_ts = TRY_TO_TIMESTAMP_TZ(%s, 'YYYY-MM-DD"T"HH24:MI:SS.FF TZHTZM')::TIMESTAMP_NTZ
-                ORDER BY interview_ts DESC LIMIT 1
-            """, (email_id, interview_data.get('interview_ts')))
-        student_row = cs.fetchone()
-        cs.close()
-        conn.close()
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            columns = table_columns('interview', STUDENT_INFO_COLUMNS)
+            if interview_data.get('interview_id'):
+                cs.execute(f"""
+                    SELECT {', '.join(columns)}
+                    FROM interview
+                    WHERE interview_id = %s
+                """, (interview_data['interview_id'],))
+            else:
+                # Interviews started before interview_id existed
+                cs.execute(f"""
+                    SELECT {', '.join(columns)}
+                    FROM interview
+                    WHERE email_id = %s AND interview_ts = TRY_TO_TIMESTAMP_TZ(%s, 'YYYY-MM-DD"T"HH24:MI:SS.FF TZHTZM')::TIMESTAMP_NTZ
+                    ORDER BY interview_ts DESC LIMIT 1
+                """, (email_id, interview_data.get('interview_ts')))
+            student_row = cs.fetchone()
+            cs.close()
         if student_row:
-            interview_data['student_info'] = {
-                'name': student_row[0],
-                'roll_no': student_row[1],
-                'batch_no': student_row[2],
-                'center': student_row[3],
-                'course': student_row[4],
-                'eval_date': student_row[5]
-            }
-            interview_data['difficulty_level'] = student_row[6]
-            if interview_table_has_language():
-                interview_data['language'] = student_row[7]
+            _apply_student_row(interview_data, dict(zip(columns, student_row)))
     except Exception as e:
         logger.error(f"Error fetching interview info for report: {e}")
 
@@ -884,9 +786,9 @@ def generate_report():
             # Sanitize any remaining asterisks in the conversation history
             for entry in conversation_history:
                 if 'text' in entry:
-                    entry['text'] = _sanitize_question_text(entry['text'])
+                    entry['text'] = sanitize_question_text(entry['text'])
                 if 'question' in entry:
-                    entry['question'] = _sanitize_question_text(entry['question'])
+                    entry['question'] = sanitize_question_text(entry['question'])
             interview_data['conversation_history'] = conversation_history
     except Exception:
         pass
@@ -896,80 +798,16 @@ def generate_report():
         return jsonify(report), 500
     interview_data['report_generated'] = True
     save_interview_data(email_id, interview_data)
-    # Ensure interview status is marked Completed after report generation
+    # Queue the end-of-interview writes. The write-behind queue spools them locally and
+    # flushes them to Snowflake in the background, so the candidate sees the report
+    # without waiting on these inserts.
     try:
-        conn = get_snowflake_connection()
-        cs = conn.cursor()
-        cs.execute("""
-            UPDATE interview 
-            SET status = 'Completed'
-            WHERE email_id = %s AND interview_ts = COALESCE(
-                TRY_TO_TIMESTAMP_TZ(%s, 'YYYY-MM-DD""T""HH24:MI:SS.FF TZHTZM')::TIMESTAMP_NTZ,
-                TRY_TO_TIMESTAMP(%s, 'YYYY-MM-DD HH24:MI:SS')
-            )
-        """, (email_id, interview_data.get('interview_ts'), interview_data.get('interview_ts')))
-        conn.commit()
-        cs.close()
-        conn.close()
-    except Exception as e:
-        logger.error(f"Error updating interview status to Completed after report: {e}")
+        enqueue_write('interview_status', (email_id, interview_data.get('interview_ts'), interview_data.get('interview_id')))
 
-    # ENHANCED VISUAL FEEDBACK DATABASE INSERTION
-    try:
-        conn = get_snowflake_connection()
-        if not conn:
-            raise Exception("Could not connect to Snowflake")
-        cs = conn.cursor()
         roll_no = email_id  # Use email_id as roll_no
-        
         interview_ts = interview_data['end_time']
-        
-        # Create required tables
-        cs.execute("""
-            CREATE TABLE IF NOT EXISTS interview_rating(
-              roll_no TEXT,
-              technical_rating FLOAT,
-              communication_rating FLOAT,
-              problem_solving_rating FLOAT,
-              time_management_rating FLOAT,
-              total_rating FLOAT,
-              interview_ts TIMESTAMP
-            );
-        """)
-        cs.execute("""
-            CREATE TABLE IF NOT EXISTS visual_feedback (
-              roll_no TEXT,
-              professional_appearance TEXT,
-              body_language TEXT,
-              environment TEXT,
-              distractions TEXT,
-              interview_ts TIMESTAMP,
-              feedback_timestamp TIMESTAMP
-            );
-        """)
-        cs.execute("""
-            CREATE TABLE IF NOT EXISTS student_performance_report (
-                id INTEGER AUTOINCREMENT PRIMARY KEY,
-                student_name TEXT,
-                roll_no TEXT,
-                batch_no TEXT,
-                center TEXT,
-                course TEXT,
-                evaluation_date TEXT,
-                difficulty_level TEXT,
-                interview_ts TIMESTAMP,
-                report TEXT
-            );
-        """)
 
-        # Insert interview rating
-        cs.execute("""
-            INSERT INTO interview_rating
-              (roll_no, technical_rating, communication_rating,
-               problem_solving_rating, time_management_rating,
-               total_rating, interview_ts)
-            VALUES (%s, %s, %s, %s, %s, %s, %s);
-        """, (
+        enqueue_write('interview_rating', (
             roll_no,
             report['category_ratings']['technical_knowledge']['rating'],
             report['category_ratings']['communication_skills']['rating'],
@@ -977,33 +815,25 @@ def generate_report():
             report['category_ratings']['time_management']['rating'],
             report['category_ratings']['overall_performance']['rating'],
             interview_ts
-         ))
+        ))
 
-        # Insert into student_performance_report if not already present
-        cs.execute("SELECT COUNT(*) FROM student_performance_report WHERE roll_no = %s AND interview_ts = TRY_TO_TIMESTAMP(%s, 'YYYY-MM-DD HH24:MI:SS')", (roll_no, interview_ts))
-        already_exists = cs.fetchone()[0]
-        if not already_exists:
-            cs.execute("""
-                INSERT INTO student_performance_report (
-                    student_name, roll_no, batch_no, center, course, evaluation_date, difficulty_level, interview_ts, report
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            (
-                interview_data.get('student_info', {}).get('name', ''),
-                roll_no,
-                interview_data.get('student_info', {}).get('batch_no', ''),
-                interview_data.get('student_info', {}).get('center', ''),
-                interview_data.get('student_info', {}).get('course', ''),
-                interview_data.get('student_info', {}).get('eval_date', ''),
-                interview_data.get('difficulty_level', ''),
-                interview_ts,
-                report['report_html']
-            ))
+        # Skipped by the writer if a report for this roll_no and interview_ts already exists
+        enqueue_write('student_performance_report', (
+            interview_data.get('student_info', {}).get('name', ''),
+            roll_no,
+            interview_data.get('student_info', {}).get('batch_no', ''),
+            interview_data.get('student_info', {}).get('center', ''),
+            interview_data.get('student_info', {}).get('course', ''),
+            interview_data.get('student_info', {}).get('eval_date', ''),
+            interview_data.get('difficulty_level', ''),
+            interview_ts,
+            report['report_html']
+        ))
 
-        # ENHANCED VISUAL FEEDBACK INSERTION WITH CANDIDATE-SPECIFIC PROCESSING
+        # ENHANCED VISUAL FEEDBACK WITH CANDIDATE-SPECIFIC PROCESSING
         if interview_data.get('visual_feedback_data') and len(interview_data['visual_feedback_data']) > 0:
             try:
-                logger.debug(f"Inserting visual feedback into Snowflake - {len(interview_data['visual_feedback_data'])} entries")
+                logger.debug(f"Preparing visual feedback for Snowflake - {len(interview_data['visual_feedback_data'])} entries")
                 
                 # Initialize containers for feedback collection
                 professional_appearance = []
@@ -1053,12 +883,12 @@ def generate_report():
                                                                ['no feedback', 'not available', 'not fully clear', 'no visual feedback']):
                                 contextual_bl = f"Q{question_num}: {bl}"
                                 body_language.append(contextual_bl)
-                                
+                            
                             if env and len(env) > 15 and not any(generic in env.lower() for generic in 
                                                                  ['no feedback', 'not available', 'not fully clear', 'no visual feedback']):
                                 contextual_env = f"Q{question_num}: {env}"
                                 environment.append(contextual_env)
-                                
+                            
                             if dist and len(dist) > 10 and not any(generic in dist.lower() for generic in 
                                                                    ['no feedback', 'not available', 'not fully clear', 'no visual feedback']):
                                 contextual_dist = f"Q{question_num}: {dist}"
@@ -1141,65 +971,25 @@ def generate_report():
                 
                 logger.info(f"Final processed visual feedback for {candidate_id}: {final_visual_feedback}")
                 
-                # Insert into database with proper error handling and truncation
-                try:
-                    cs.execute("""
-                        INSERT INTO visual_feedback
-                          (roll_no, professional_appearance, body_language,
-                           environment, distractions, interview_ts)
-                        VALUES (%s, %s, %s, %s, %s, %s);
-                    """, (
-                        candidate_id,
-                        final_visual_feedback['professional_appearance'][:800],  # Increased limit with truncation
-                        final_visual_feedback['body_language'][:800],
-                        final_visual_feedback['environment'][:800],
-                        final_visual_feedback['distractions'][:800],
-                        interview_ts
-                    ))
-                    
-                    logger.info(f"Successfully saved unique visual feedback for candidate {candidate_id} to Snowflake")
-                    
-                except Exception as db_error:
-                    logger.error(f"Database insertion error for visual feedback: {str(db_error)}")
-                    # Try simplified version with basic uniqueness
-                    try:
-                        simplified_feedback = {
-                            "professional_appearance": f"{candidate_name} - Professional appearance observed during {len(professional_appearance)} segments" if professional_appearance else "No appearance feedback",
-                            "body_language": f"{candidate_name} - Body language patterns noted across {len(body_language)} observations" if body_language else "No body language feedback", 
-                            "environment": f"{candidate_name} - Interview environment assessed in {len(environment)} instances" if environment else "No environment feedback",
-                            "distractions": f"{candidate_name} - Distraction analysis from {len(distractions)} checkpoints" if distractions else "No distraction feedback"
-                        }
-                        
-                        cs.execute("""
-                            INSERT INTO visual_feedback
-                              (roll_no, professional_appearance, body_language,
-                               environment, distractions, interview_ts)
-                            VALUES (%s, %s, %s, %s, %s, %s);
-                        """, (
-                            candidate_id,
-                            simplified_feedback['professional_appearance'][:500],
-                            simplified_feedback['body_language'][:500],
-                            simplified_feedback['environment'][:500],
-                            simplified_feedback['distractions'][:500],
-                            interview_ts
-                        ))
-                        logger.info(f"Saved simplified visual feedback for candidate {candidate_id}")
-                    except Exception as fallback_error:
-                        logger.error(f"Even simplified visual feedback insertion failed: {str(fallback_error)}")
-                        
+                # Queue the visual feedback row with truncation
+                enqueue_write('visual_feedback', (
+                    candidate_id,
+                    final_visual_feedback['professional_appearance'][:800],  # Increased limit with truncation
+                    final_visual_feedback['body_language'][:800],
+                    final_visual_feedback['environment'][:800],
+                    final_visual_feedback['distractions'][:800],
+                    interview_ts
+                ))
+                logger.info(f"Queued unique visual feedback for candidate {candidate_id}")
             except Exception as e:
                 logger.error(f"Error processing visual feedback for database: {str(e)}", exc_info=True)
         else:
             logger.info("No visual feedback data to insert into database")
 
-        conn.commit()
-        logger.info("Successfully saved all interview data to Snowflake")
-        
+        logger.info("Queued interview data for Snowflake")
+
     except Exception as e:
-        logger.error(f"Snowflake insert failed: {e}")
-    finally:
-        if 'cs' in locals(): cs.close()
-        if 'conn' in locals(): conn.close()
+        logger.error(f"Failed to queue interview data for Snowflake: {e}")
 
     return jsonify({
         "status": "success",
@@ -1242,134 +1032,96 @@ def scheduled_interview():
         return redirect(url_for('login'))
     email_id = session['user']
     # Fetch all scheduled interviews for this student from interview table by email_id
-    conn = get_snowflake_connection()
-    cs = conn.cursor()
-    if interview_table_has_language():
-        cs.execute("""
-            SELECT student_name, roll_no, email_id, batch_no, center, course, evaluation_date, difficulty_level, language, interview_ts, jd_id, status
-            FROM interview
-            WHERE email_id = %s OR roll_no = %s
-            ORDER BY interview_ts DESC
-        """, (email_id, email_id))
-    else:
-        cs.execute("""
-            SELECT student_name, roll_no, email_id, batch_no, center, course, evaluation_date, difficulty_level, interview_ts, jd_id, status
+    with pooled_connection() as conn:
+        cs = conn.cursor()
+        columns = table_columns('interview', [
+            'student_name', 'roll_no', 'email_id', 'batch_no', 'center', 'course', 'evaluation_date',
+            'difficulty_level', 'language', 'interview_ts', 'jd_id', 'status'
+        ])
+        # interview_id is selected last so it can be kept out of the displayed columns
+        cs.execute(f"""
+            SELECT {', '.join(columns)}, interview_id
             FROM interview
             WHERE email_id = %s OR roll_no = %s
             ORDER BY interview_ts DESC
         """, (email_id, email_id))
-    all_interviews = cs.fetchall()
-    student_cols = [desc[0].replace('_', ' ').title() for desc in cs.description]
-    cs.close()
-    conn.close()
+        all_interviews = cs.fetchall()
+        student_cols = [column.replace('_', ' ').title() for column in columns]
+        cs.close()
     # Add JD Name column
     student_cols.append('JD Name')
     # For each interview, get JD name
     interviews = []
     # Try Redis fallback for jd_id if missing
     redis_fallback = get_interview_data(email_id)
-    redis_ts = None
+    redis_interview_id = None
     redis_jd_id = None
     if redis_fallback:
-        redis_ts = redis_fallback.get('interview_ts')
+        redis_interview_id = redis_fallback.get('interview_id')
         redis_jd_id = redis_fallback.get('jd_id')
-    has_lang = interview_table_has_language()
-    # Set column indexes depending on presence of LANGUAGE column
-    idx_ts = 9 if has_lang else 8
-    idx_jd = 10 if has_lang else 9
-    idx_status = 11 if has_lang else 10
+    idx_ts = columns.index('interview_ts')
+    idx_jd = columns.index('jd_id')
+    idx_status = columns.index('status')
     for interview in all_interviews:
+        interview_id = interview[-1]
+        interview = interview[:-1]
         jd_id = interview[idx_jd]
         status = interview[idx_status]
         # Get JD name (first 30 chars of JD text or 'N/A')
         jd_name = 'N/A'
-        # Redis fallback when DB jd_id is missing but we have it in session for the same interview_ts
-        if (not jd_id or str(jd_id).lower() == 'none') and redis_ts and redis_jd_id and interview[idx_ts] == redis_ts:
+        # Redis fallback when DB jd_id is missing but we have it in session for the same interview
+        if (not jd_id or str(jd_id).lower() == 'none') and redis_interview_id and redis_jd_id and interview_id == redis_interview_id:
             jd_id = redis_jd_id
         if jd_id:
             jd_text = get_jd_text(jd_id)
             if jd_text:
                 jd_name = jd_text[:30] + ('...' if len(jd_text) > 30 else '')
-        # Add interview_ts for use in Start Interview link
+        # Add interview_id for use in Start Interview link
         interviews.append({
             'info': interview,
             'status': status,
             'jd_name': jd_name,
             'jd_id': jd_id,
+            'interview_id': interview_id,
             'interview_ts': interview[idx_ts]
         })
     return render_template('scheduled_interview.html', interviews=interviews, student_cols=student_cols)
 
-@interview_bp.route('/start_scheduled_interview/<jd_id>/<interview_ts>', methods=['POST'])
-def start_scheduled_interview(jd_id, interview_ts):
+@interview_bp.route('/start_scheduled_interview/<interview_id>', methods=['POST'])
+def start_scheduled_interview(interview_id):
     if 'user' not in session or session.get('role') != 'student':
         return jsonify({'status': 'error', 'message': 'Unauthorized'}), 401
     email_id = session['user']
     try:
-        conn = get_snowflake_connection()
-        cs = conn.cursor()
-        if interview_table_has_language():
-            cs.execute("""
-                SELECT student_name, roll_no, batch_no, center, course, evaluation_date, difficulty_level, language
-                FROM interview
-                WHERE (email_id = %s OR roll_no = %s)
-                  AND interview_ts = COALESCE(
-                    TRY_TO_TIMESTAMP_TZ(%s, 'YYYY-MM-DD"T"HH24:MI:SS.FF TZHTZM')::TIMESTAMP_NTZ,
-                    TRY_TO_TIMESTAMP(%s, 'YYYY-MM-DD HH24:MI:SS')
-                  )
-            """, (email_id, email_id, interview_ts, interview_ts))
-        else:
-            cs.execute("""
-                SELECT student_name, roll_no, batch_no, center, course, evaluation_date, difficulty_level
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            columns = table_columns('interview', STUDENT_INFO_COLUMNS + ['interview_ts', 'jd_id'])
+            cs.execute(f"""
+                SELECT {', '.join(columns)}
                 FROM interview
-                WHERE (email_id = %s OR roll_no = %s)
-                  AND interview_ts = COALESCE(
-                    TRY_TO_TIMESTAMP_TZ(%s, 'YYYY-MM-DD"T"HH24:MI:SS.FF TZHTZM')::TIMESTAMP_NTZ,
-                    TRY_TO_TIMESTAMP(%s, 'YYYY-MM-DD HH24:MI:SS')
-                  )
-            """, (email_id, email_id, interview_ts, interview_ts))
-        student_data = cs.fetchone()
-        cs.close()
-        conn.close()
-        if not student_data or len(student_data) < (8 if interview_table_has_language() else 7):
-            logger.error(f"Interview not found or incomplete data for {email_id} at {interview_ts}: {student_data}")
+                WHERE interview_id = %s AND (email_id = %s OR roll_no = %s)
+            """, (interview_id, email_id, email_id))
+            student_data = cs.fetchone()
+            cs.close()
+        if not student_data:
+            logger.error(f"Interview {interview_id} not found for {email_id}")
             return "Interview not found or incomplete data", 404
-        # If jd_id is 'None' from template fallback, try to recover from Redis or DB
+        row = dict(zip(columns, student_data))
+        jd_id = row.get('jd_id')
+        # If the interview row has no jd_id, try to recover it from Redis
         if not jd_id or str(jd_id).lower() == 'none':
             session_data = get_interview_data(email_id)
-            recovered_jd_id = None
-            if session_data and session_data.get('interview_ts') == interview_ts:
-                recovered_jd_id = session_data.get('jd_id')
-            if not recovered_jd_id:
-                try:
-                    conn2 = get_snowflake_connection()
-                    cs2 = conn2.cursor()
-                    cs2.execute("SELECT jd_id FROM interview WHERE (email_id = %s OR roll_no = %s) AND interview_ts = COALESCE(TRY_TO_TIMESTAMP_TZ(%s, 'YYYY-MM-DD""T""HH24:MI:SS.FF TZHTZM')::TIMESTAMP_NTZ, TRY_TO_TIMESTAMP(%s, 'YYYY-MM-DD HH24:MI:SS')) ORDER BY interview_ts DESC LIMIT 1", (email_id, email_id, interview_ts, interview_ts))
-                    r = cs2.fetchone()
-                    cs2.close()
-                    conn2.close()
-                    if r and r[0]:
-                        recovered_jd_id = r[0]
-                except Exception:
-                    recovered_jd_id = None
-            jd_id = recovered_jd_id
+            jd_id = None
+            if session_data and session_data.get('interview_id') == interview_id:
+                jd_id = session_data.get('jd_id')
         jd_text = get_jd_text(jd_id) if jd_id else None
         interview_data = init_interview_data()
+        interview_data['interview_id'] = interview_id
         interview_data['jd_id'] = jd_id
         interview_data['jd_text'] = jd_text
         interview_data['scheduled'] = True
-        interview_data['interview_ts'] = interview_ts
-        interview_data['difficulty_level'] = student_data[6]
-        if interview_table_has_language():
-            interview_data['language'] = student_data[7]
-        interview_data['student_info'] = {
-            'name': student_data[0],
-            'roll_no': student_data[1],
-            'batch_no': student_data[2],
-            'center': student_data[3],
-            'course': student_data[4],
-            'eval_date': student_data[5]
-        }
+        interview_data['interview_ts'] = str(row['interview_ts']) if row.get('interview_ts') else None
+        _apply_student_row(interview_data, row)
         save_interview_data(email_id, interview_data)
         return redirect(url_for('interview.interview_bot'))
     except Exception as e:
@@ -1380,19 +1132,18 @@ def start_scheduled_interview(jd_id, interview_ts):
 def schedule_interview():
     if 'user' not in session or session.get('role') != 'recruiter':
         return redirect(url_for('auth.login'))
-    conn = get_snowflake_connection()
-    cs = conn.cursor()
-    # Use only the interview table for fetching student/interview info
-    cs.execute("""
-        SELECT student_name, roll_no, email_id, batch_no, center, course, evaluation_date, interview_ts
-        FROM interview
-        ORDER BY interview_ts DESC
-        LIMIT 200
-    """)
-    students = cs.fetchall()
-    student_cols = [desc[0].lower() for desc in cs.description]
-    cs.close()
-    conn.close()
+    with pooled_connection() as conn:
+        cs = conn.cursor()
+        # Use only the interview table for fetching student/interview info
+        cs.execute("""
+            SELECT student_name, roll_no, email_id, batch_no, center, course, evaluation_date, interview_ts
+            FROM interview
+            ORDER BY interview_ts DESC
+            LIMIT 200
+        """)
+        students = cs.fetchall()
+        student_cols = [desc[0].lower() for desc in cs.description]
+        cs.close()
     if request.method == 'POST':
         jd_file = request.files.get('jd_file')
         student_name = request.form.get('student_name')
@@ -1415,33 +1166,19 @@ def schedule_interview():
         admin_id = session['user']
         jd_id = insert_jd(jd_text, admin_id)
         interview_ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        conn = get_snowflake_connection()
-        cs = conn.cursor()
-        cs.execute("""
-            CREATE TABLE IF NOT EXISTS interview (
-                student_name TEXT,
-                roll_no TEXT,
-                email_id TEXT,
-                batch_no TEXT,
-                center TEXT,
-                course TEXT,
-                evaluation_date TEXT,
-                difficulty_level TEXT,
-                language TEXT,
-                interview_ts TIMESTAMP,
-                jd_id TEXT,
-                status TEXT
-            );
-        """)
-        cs.execute("""
-            INSERT INTO interview (student_name, roll_no, email_id, batch_no, center, course, evaluation_date, difficulty_level, language, interview_ts, jd_id, status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (student_name, roll_no, email_id, batch_no, center, course, evaluation_date, difficulty_level, request.form.get('language'), interview_ts, jd_id, 'Scheduled'))
-        conn.commit()
-        cs.close()
-        conn.close()
+        interview_id = str(uuid.uuid4())
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                INSERT INTO interview (interview_id, student_name, roll_no, email_id, batch_no, center, course, evaluation_date, difficulty_level, language, interview_ts, jd_id, status)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (interview_id, student_name, roll_no, email_id, batch_no, center, course, evaluation_date, difficulty_level, request.form.get('language'), interview_ts, jd_id, 'Scheduled'))
+            conn.commit()
+            cs.close()
+        invalidate_tables('interview')
         # Save to Redis for interview flow, including difficulty_level
         interview_data = {
+            'interview_id': interview_id,
             'jd_text': jd_text,
             'jd_id': jd_id,
             'scheduled': True,
@@ -1451,6 +1188,7 @@ def schedule_interview():
             'interview_ts': interview_ts
         }
         save_interview_data(email_id, interview_data)
+        pregenerate_questions(interview_id, jd_text, difficulty_level, roll_no, request.form.get('language'))
         flash('Interview scheduled and notification sent!', 'success')
         return render_template('schedule_interview.html', show_modal=True)
     return render_template('schedule_interview.html', students=students, student_cols=student_cols)
\ No newline at end of file
@@ -1,40 +1,201 @@
+import os
+import sys
+import contextlib
 import threading
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from queue import Queue, Empty
 from backend.services.snowflake_service import get_snowflake_connection
+from backend.utils.performance_utils import LatencyHistogram
+from config import Config
 
 logger = logging.getLogger(__name__)
 
 class ConnectionPool:
-    def __init__(self, max_connections=20, connection_timeout=30):
+    def __init__(self, max_connections=20, connection_timeout=30,
+                 validation_idle_threshold=None, max_connection_age=None, min_connections=None):
         self.max_connections = max_connections
         self.connection_timeout = connection_timeout
+        # Floor of connections opened by the background warm-up
+        self.min_connections = min(
+            Config.DB_POOL_MIN_CONNECTIONS if min_connections is None else min_connections,
+            max_connections
+        )
+        # Connections idle for less than this are trusted without a SELECT 1
+        self.validation_idle_threshold = (
+            Config.DB_POOL_VALIDATION_IDLE_SECONDS if validation_idle_threshold is None else validation_idle_threshold
+        )
+        # Connections older than this are closed instead of being reused
+        self.max_connection_age = (
+            Config.DB_POOL_MAX_CONNECTION_AGE if max_connection_age is None else max_connection_age
+        )
         self.pool = Queue(maxsize=max_connections)
         self.active_connections = 0
         self.lock = threading.Lock()
-        self._initialize_pool()
+        # Per-connection metadata keyed by id(conn): created_at, last_used, last_validated
+        self.connection_info = {}
+        self.validations_performed = 0
+        self.validations_skipped = 0
+        self.connections_retired = 0
+        # Checkout telemetry
+        self.leak_threshold = Config.DB_POOL_LEAK_THRESHOLD_SECONDS
+        self.wait_time_histogram = LatencyHistogram()
+        self.hold_time_histogram = LatencyHistogram()
+        self.checkout_timeouts = 0
+        self.fallback_connections = 0
+        self.leaks_detected = 0
+        # Connections currently handed out, keyed by id(conn)
+        self.checked_out = {}
+        self._closed = threading.Event()
+        # Set once the pool holds at least min_connections connections
+        self.ready = threading.Event()
+        self.warming_up = threading.Event()
+        # Warm-up logins still in flight, and checkouts waiting for one of them to land
+        self.warm_up_pending = 0
+        self.warm_up_waiters = 0
+        self._start_warm_up()
+        threading.Thread(target=self._leak_monitor_loop, name="connection-pool-leak-monitor", daemon=True).start()
     
-    def _initialize_pool(self):
-        """Initialize the connection pool with some connections"""
+    def _start_warm_up(self):
+        """Open the minimum connections on a background thread"""
+        if self.min_connections <= 0:
+            self.ready.set()
+            return
+        self.warming_up.set()
+        with self.lock:
+            self.warm_up_pending = self.min_connections
+        threading.Thread(target=self._warm_up, name="connection-pool-warm-up", daemon=True).start()
+    
+    def _warm_up(self):
+        """Open min_connections connections in parallel, pooling each as soon as it is ready"""
+        start_time = time.time()
         try:
-            for _ in range(min(5, self.max_connections)):
-                conn = get_snowflake_connection()
-                if conn:
-                    self.pool.put(conn)
+            with ThreadPoolExecutor(max_workers=self.min_connections) as executor:
+                futures = [executor.submit(self._open_connection) for _ in range(self.min_connections)]
+                for future in as_completed(futures):
+                    try:
+                        conn = future.result()
+                    except Exception as e:
+                        logger.error(f"Error opening connection during pool warm-up: {e}")
+                        conn = None
+                    if conn:
+                        self.pool.put(conn)
+                        self._check_ready()
                     with self.lock:
-                        self.active_connections += 1
-            logger.info(f"Connection pool initialized with {self.active_connections} connections")
+                        self.warm_up_pending -= 1
+            logger.info(f"Connection pool warmed up with {self.active_connections} connections in {time.time() - start_time:.2f}s")
         except Exception as e:
-            logger.error(f"Error initializing connection pool: {e}")
+            logger.error(f"Error warming up connection pool: {e}")
+        finally:
+            with self.lock:
+                self.warm_up_pending = 0
+            self.warming_up.clear()
     
-    def get_connection(self):
-        """Get a connection from the pool"""
+    def _check_ready(self):
+        """Flag the pool as ready once it has reached its floor"""
+        with self.lock:
+            # Only opened connections count, not slots reserved for logins still in flight
+            reached_floor = len(self.connection_info) >= self.min_connections
+        if reached_floor:
+            self.ready.set()
+    
+    def is_ready(self):
+        """Whether the pool has reached min_connections"""
+        return self.ready.is_set()
+    
+    def wait_until_ready(self, timeout=None):
+        """Block until the pool reaches its floor; returns the readiness flag"""
+        return self.ready.wait(timeout)
+    
+    def _register_connection(self, conn):
+        """Start tracking metadata for a freshly opened connection"""
+        now = time.time()
+        with self.lock:
+            self.connection_info[id(conn)] = {
+                'created_at': now,
+                'last_used': now,
+                'last_validated': now
+            }
+    
+    def _is_expired(self, conn):
+        """Check whether a connection has outlived the maximum lifetime"""
+        with self.lock:
+            info = self.connection_info.get(id(conn))
+        if info is None:
+            return False
+        return time.time() - info['created_at'] > self.max_connection_age
+    
+    def _is_usable(self, conn):
+        """Decide whether an idle connection can be handed out.
+
+        Connections past their maximum lifetime are retired; connections idle
+        longer than the validation threshold are checked with a round trip;
+        everything else is trusted as-is.
+        """
+        if conn is None:
+            return False
+        is_closed = getattr(conn, 'is_closed', None)
+        if callable(is_closed) and is_closed():
+            return False
+        if self._is_expired(conn):
+            with self.lock:
+                self.connections_retired += 1
+            logger.debug("Retiring pooled connection past its maximum lifetime")
+            return False
+        with self.lock:
+            info = self.connection_info.get(id(conn))
+            idle_for = time.time() - info['last_used'] if info else None
+        if idle_for is not None and idle_for < self.validation_idle_threshold:
+            with self.lock:
+                self.validations_skipped += 1
+            return True
+        return self._test_connection(conn)
+    
+    def _mark_used(self, conn):
+        """Record that a connection was just handed out or returned"""
+        with self.lock:
+            info = self.connection_info.get(id(conn))
+            if info is not None:
+                info['last_used'] = time.time()
+    
+    def get_connection(self, call_site=None):
+        """Get a connection from the pool, recording wait time and the acquiring call site"""
+        start_time = time.time()
+        conn = self._acquire_connection()
+        self.wait_time_histogram.observe(time.time() - start_time)
+        if conn:
+            with self.lock:
+                self.checked_out[id(conn)] = {
+                    'checked_out_at': time.time(),
+                    'call_site': call_site or _caller_site(),
+                    'thread': threading.current_thread().name,
+                    'leak_reported': False
+                }
+        return conn
+    
+    def _acquire_connection(self):
+        """Take an idle connection, open a new one, or fall back to a direct connection"""
         try:
             # Try to get an existing connection
             try:
-                conn = self.pool.get(timeout=5)
-                if conn and self._test_connection(conn):
+                # Wait for a warm-up connection only if one is still logging in for this checkout;
+                # otherwise open a new connection rather than stall behind connections already handed out
+                with self.lock:
+                    wait_for_warm_up = self.warm_up_pending > self.warm_up_waiters
+                    if wait_for_warm_up:
+                        self.warm_up_waiters += 1
+                if wait_for_warm_up:
+                    try:
+                        conn = self.pool.get(timeout=5)
+                    finally:
+                        with self.lock:
+                            self.warm_up_waiters -= 1
+                else:
+                    conn = self.pool.get_nowait()
+                if conn and self._is_usable(conn):
+                    self._mark_used(conn)
                     return conn
                 else:
                     # Connection is invalid, create a new one
@@ -46,47 +207,97 @@ class ConnectionPool:
                 return self._create_new_connection()
         except Exception as e:
             logger.error(f"Error getting connection from pool: {e}")
-            return get_snowflake_connection()  # Fallback to direct connection
+            return self._open_fallback_connection()
     
-    def _create_new_connection(self):
-        """Create a new connection if pool is not full"""
+    def _open_fallback_connection(self):
+        """Open an unpooled direct connection when the pool cannot serve a checkout"""
         with self.lock:
-            if self.active_connections < self.max_connections:
+            self.fallback_connections += 1
+        logger.warning(f"Opening fallback direct connection (total fallbacks: {self.fallback_connections})")
+        return get_snowflake_connection()
+    
+    def _open_connection(self):
+        """Open and track a new connection if the pool has room; None if it is full or the login failed"""
+        conn = None
+        # Reserve a slot under the lock, then log in outside it so other callers are not blocked
+        with self.lock:
+            reserved = self.active_connections < self.max_connections
+            if reserved:
+                self.active_connections += 1
+        if reserved:
+            try:
                 conn = get_snowflake_connection()
-                if conn:
-                    self.active_connections += 1
-                    logger.debug(f"Created new connection. Active: {self.active_connections}")
-                    return conn
+            finally:
+                if not conn:
+                    with self.lock:
+                        self.active_connections = max(0, self.active_connections - 1)
+        if conn:
+            self._register_connection(conn)
+            logger.debug(f"Created new connection. Active: {self.active_connections}")
+        return conn
+    
+    def _create_new_connection(self):
+        """Create a new connection if pool is not full"""
+        conn = self._open_connection()
+        if conn:
+            self._check_ready()
+            return conn
         
         # Pool is full, wait for a connection
         try:
             conn = self.pool.get(timeout=self.connection_timeout)
-            if conn and self._test_connection(conn):
+            if conn and self._is_usable(conn):
+                self._mark_used(conn)
                 return conn
             else:
                 if conn:
                     self._close_connection(conn)
                 return self._create_new_connection()
         except Empty:
-            logger.warning("Connection pool timeout, creating direct connection")
-            return get_snowflake_connection()
+            with self.lock:
+                self.checkout_timeouts += 1
+            logger.warning(f"Connection pool timeout after {self.connection_timeout}s with {len(self.checked_out)} connections checked out")
+            return self._open_fallback_connection()
     
     def return_connection(self, conn):
         """Return a connection to the pool"""
         if conn is None:
             return
         
+        with self.lock:
+            checkout = self.checked_out.pop(id(conn), None)
+        if checkout:
+            self.hold_time_histogram.observe(time.time() - checkout['checked_out_at'])
+        
         try:
-            if self._test_connection(conn):
-                # Connection is still valid, return to pool
-                try:
-                    self.pool.put(conn, timeout=1)
-                    logger.debug("Connection returned to pool")
-                except:
-                    # Pool is full, close the connection
+            is_closed = getattr(conn, 'is_closed', None)
+            if callable(is_closed) and is_closed():
+                # Connection was dropped while checked out
+                self._close_connection(conn)
+                return
+            if self._is_expired(conn):
+                with self.lock:
+                    self.connections_retired += 1
+                self._close_connection(conn)
+                return
+            with self.lock:
+                known = id(conn) in self.connection_info
+                # A fallback direct connection is only adopted while the pool has room for it
+                adopt = not known and self.active_connections < self.max_connections
+                if adopt:
+                    self.active_connections += 1
+            if not known:
+                if not adopt:
+                    logger.debug("Pool is full, closing fallback connection")
                     self._close_connection(conn)
-            else:
-                # Connection is invalid, close it
+                    return
+                self._register_connection(conn)
+            self._mark_used(conn)
+            try:
+                self.pool.put(conn, timeout=1)
+                logger.debug("Connection returned to pool")
+            except:
+                # Pool is full, close the connection
                 self._close_connection(conn)
         except Exception as e:
             logger.error(f"Error returning connection to pool: {e}")
@@ -101,8 +312,15 @@ class ConnectionPool:
             cursor.execute("SELECT 1")
             cursor.fetchone()
             cursor.close()
+            with self.lock:
+                self.validations_performed += 1
+                info = self.connection_info.get(id(conn))
+                if info is not None:
+                    info['last_validated'] = time.time()
             return True
         except Exception:
+            with self.lock:
+                self.validations_performed += 1
             return False
     
     def _close_connection(self, conn):
@@ -114,20 +332,81 @@ class ConnectionPool:
             logger.error(f"Error closing connection: {e}")
         finally:
             with self.lock:
-                self.active_connections = max(0, self.active_connections - 1)
+                # Untracked fallback connections never counted towards the pool
+                if self.connection_info.pop(id(conn), None) is not None:
+                    self.active_connections = max(0, self.active_connections - 1)
+    
+    def get_checked_out_connections(self):
+        """Describe the connections currently held by callers, longest-held first"""
+        now = time.time()
+        with self.lock:
+            holders = [
+                {
+                    'call_site': checkout['call_site'],
+                    'thread': checkout['thread'],
+                    'held_seconds': round(now - checkout['checked_out_at'], 2)
+                }
+                for checkout in self.checked_out.values()
+            ]
+        return sorted(holders, key=lambda h: h['held_seconds'], reverse=True)
+    
+    def check_for_leaks(self):
+        """Log connections held longer than the leak threshold; returns how many were newly found"""
+        now = time.time()
+        leaked = []
+        with self.lock:
+            for checkout in self.checked_out.values():
+                held = now - checkout['checked_out_at']
+                if held > self.leak_threshold and not checkout['leak_reported']:
+                    checkout['leak_reported'] = True
+                    self.leaks_detected += 1
+                    leaked.append((checkout, held))
+        for checkout, held in leaked:
+            logger.warning(
+                f"Possible connection leak: held for {held:.1f}s by {checkout['call_site']} "
+                f"(thread {checkout['thread']})"
+            )
+        return len(leaked)
+    
+    def _leak_monitor_loop(self):
+        """Periodically scan checked-out connections for leaks"""
+        interval = max(1, self.leak_threshold / 4)
+        while not self._closed.wait(interval):
+            try:
+                self.check_for_leaks()
+            except Exception as e:
+                logger.error(f"Error checking for connection leaks: {e}")
     
     def get_pool_stats(self):
         """Get current pool statistics"""
+        held_longer_than_threshold = [
+            h for h in self.get_checked_out_connections() if h['held_seconds'] > self.leak_threshold
+        ]
         with self.lock:
             return {
                 'active_connections': self.active_connections,
                 'pool_size': self.pool.qsize(),
-                'max_connections': self.max_connections
+                'max_connections': self.max_connections,
+                'min_connections': self.min_connections,
+                'ready': self.ready.is_set(),
+                'warming_up': self.warming_up.is_set(),
+                'validations_performed': self.validations_performed,
+                'validations_skipped': self.validations_skipped,
+                'connections_retired': self.connections_retired,
+                'checked_out': len(self.checked_out),
+                'checkout_timeouts': self.checkout_timeouts,
+                'fallback_connections': self.fallback_connections,
+                'leaks_detected': self.leaks_detected,
+                'leak_threshold_seconds': self.leak_threshold,
+                'suspected_leaks': held_longer_than_threshold,
+                'wait_time_ms': self.wait_time_histogram.snapshot(),
+                'hold_time_ms': self.hold_time_histogram.snapshot()
             }
     
     def cleanup(self):
         """Clean up all connections in the pool"""
         logger.info("Cleaning up connection pool")
+        self._closed.set()
         while not self.pool.empty():
             try:
                 conn = self.pool.get_nowait()
@@ -136,6 +415,20 @@ class ConnectionPool:
                 break
         with self.lock:
             self.active_connections = 0
+            self.connection_info.clear()
+            self.checked_out.clear()
+
+_IGNORED_CALLER_FILES = (os.path.abspath(__file__), os.path.abspath(contextlib.__file__))
+
+def _caller_site():
+    """Return 'file:line in function' for the first frame outside the pool machinery"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename not in _IGNORED_CALLER_FILES:
+            return f"{os.path.relpath(filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
 
 # Global connection pool instance
 _connection_pool = None
@@ -160,6 +453,21 @@ def return_pooled_connection(conn):
     pool = get_connection_pool()
     pool.return_connection(conn)
 
+@contextmanager
+def pooled_connection():
+    """Check out a pooled connection for the duration of a ``with`` block.
+
+    The connection is always handed back to the pool on exit, including when
+    the block raises, so callers must not ``close()`` it themselves.
+    """
+    conn = get_pooled_connection()
+    if not conn:
+        raise Exception("Could not connect to Snowflake")
+    try:
+        yield conn
+    finally:
+        return_pooled_connection(conn)
+
 def cleanup_connection_pool():
     """Clean up the connection pool"""
     global _connection_pool
@@ -0,0 +1,268 @@
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from backend.services.session_store import get_session_store
+from backend.utils.compression import compress_text, decompress_text
+from backend.services.interview_state import (
+    encode_state, decode_state, normalize_state, coerce_state, encode_value, decode_value,
+    merge_states, new_interview_state
+)
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# interview_data row that holds each user's latest snapshot
+SNAPSHOT_SESSION_ID = "snapshot"
+# Snapshot key recording the last event folded into it
+SEQ_KEY = "_event_seq"
+
+# Append-only list fields and the event recorded when items are added to them
+LIST_EVENTS = {
+    'questions': 'question_asked',
+    'answers': 'answer_recorded',
+    'ratings': 'rating_added',
+    'visual_feedback': 'frame_analyzed',
+    'visual_feedback_data': 'frame_analyzed',
+    'conversation_history': 'conversation_appended',
+}
+FIELDS_UPDATED = 'fields_updated'
+
+def diff_state(old, new):
+    """Describe the change from ``old`` to ``new`` as ``(event_type, payload)`` events.
+
+    Items appended to the fields in ``LIST_EVENTS`` become one event per field
+    carrying only the new items; every other change is folded into a single
+    ``fields_updated`` event with the keys that were set or removed.
+    """
+    events = []
+    changed = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if key in LIST_EVENTS and isinstance(value, list) and isinstance(previous, list) \
+                and len(value) >= len(previous) and value[:len(previous)] == previous:
+            if len(value) > len(previous):
+                events.append((LIST_EVENTS[key], {'field': key, 'items': value[len(previous):]}))
+        elif key not in old or previous != value:
+            changed[key] = value
+    removed = [key for key in old if key not in new]
+    if changed or removed:
+        events.append((FIELDS_UPDATED, {'set': changed, 'unset': removed}))
+    return events
+
+def apply_event(state, event_type, payload):
+    """Fold one event into ``state`` in place"""
+    if event_type == FIELDS_UPDATED:
+        state.update(payload.get('set', {}))
+        for key in payload.get('unset', []):
+            state.pop(key, None)
+    else:
+        field = payload['field']
+        if not isinstance(state.get(field), list):
+            state[field] = []
+        state[field].extend(payload['items'])
+    return state
+
+class InterviewEventLog:
+    """Persists interview state as small events on top of periodic snapshots.
+
+    Each save is diffed against the last persisted state and only the change
+    is appended to ``interview_events``, so write cost follows the size of the
+    change instead of the whole state. Every ``snapshot_every`` events the full
+    state is written to ``interview_data`` and the folded events are deleted.
+    Loading reads the snapshot and replays the events recorded after it.
+
+    Writes are compare-and-swap on the snapshot row's ``version`` column, so
+    two processes cannot claim the same sequence numbers. The loser reloads,
+    merges its change onto the winner's state with ``merge_states`` and retries.
+
+    With ``use_events=False`` every save writes the full snapshot, still
+    compare-and-swap and merged on conflict.
+    """
+
+    def __init__(self, snapshot_every=None, max_entries=None, expires_in=4600, max_attempts=3, use_events=None):
+        self.snapshot_every = snapshot_every or Config.INTERVIEW_SNAPSHOT_EVERY
+        self.use_events = Config.INTERVIEW_EVENT_LOG if use_events is None else use_events
+        self.max_entries = max_entries or Config.INTERVIEW_STATE_CACHE_MAX_ENTRIES
+        self.expires_in = expires_in
+        self.max_attempts = max_attempts
+        # user_id -> {'state', 'seq', 'snapshot_seq', 'version'} for the last persisted state
+        self.streams = OrderedDict()
+        self.user_locks = {}
+        self.lock = threading.Lock()
+
+        # Telemetry
+        self.events_written = 0
+        self.snapshots_written = 0
+        self.events_replayed = 0
+        self.bytes_written = 0
+        self.cas_conflicts = 0
+
+    def load(self, user_id):
+        """Rebuild the user's state from the latest snapshot plus the events after it"""
+        try:
+            stream = self._load_stream(user_id)
+        except Exception as e:
+            logger.error(f"Error loading interview state for {user_id}: {e}")
+            return None
+        with self.lock:
+            self._remember(user_id, stream)
+        if stream['state'] is None:
+            return None
+        return normalize_state(stream['state'])
+
+    def _load_stream(self, user_id):
+        store = get_session_store()
+        row = store.get_interview_data_version(user_id, SNAPSHOT_SESSION_ID)
+        if row is None:
+            # Rows written before the event log have other session ids; the latest one is the state
+            snapshot, version = store.get_interview_data(user_id), None
+        else:
+            snapshot, version = row
+        state = decode_state(decompress_text(snapshot)) if snapshot else None
+        seq = state.pop(SEQ_KEY, 0) if state else 0
+        events = store.get_interview_events(user_id, seq)
+        snapshot_seq = seq
+        if state is not None or events:
+            state = state or {}
+            for event_seq, event_type, payload in events:
+                apply_event(state, event_type, decode_value(decompress_text(payload)))
+                seq = event_seq
+            if events:
+                # Replayed values arrive as plain JSON; restore datetimes and other field types
+                state = coerce_state(state)
+        with self.lock:
+            self.events_replayed += len(events)
+        # ``version`` is the snapshot row's version column: the last sequence number claimed
+        # by any process. New sequence numbers continue after it, even past an expired snapshot.
+        return {'state': state, 'seq': max(seq, version or 0), 'snapshot_seq': snapshot_seq, 'version': version}
+
+    def _user_lock(self, user_id):
+        with self.lock:
+            return self.user_locks.setdefault(user_id, threading.Lock())
+
+    def save(self, user_id, data):
+        """Persist the change since the last save.
+
+        Returns True on success, or the persisted state if another process's
+        changes were merged into it, and False on failure.
+        """
+        # Sequence numbers are assigned from the in-memory stream, so one save per user at a time
+        with self._user_lock(user_id):
+            return self._save(user_id, data)
+
+    def _save(self, user_id, data):
+        try:
+            new_state = normalize_state(data)
+            with self.lock:
+                stream = self.streams.get(user_id)
+                if stream:
+                    self.streams.move_to_end(user_id)
+            if stream is None:
+                stream = self._load_stream(user_id)
+            expires_at = datetime.now() + timedelta(seconds=self.expires_in)
+
+            merged = False
+            for _ in range(self.max_attempts):
+                written = self._write(user_id, stream, new_state, expires_at)
+                if written is not None:
+                    break
+                # Another process wrote since our last save: merge onto its state and retry
+                theirs = self._load_stream(user_id)
+                new_state = normalize_state(merge_states(
+                    stream['state'] or new_interview_state(), new_state, theirs['state'] or new_interview_state()
+                ))
+                stream = theirs
+                merged = True
+                with self.lock:
+                    self.cas_conflicts += 1
+            else:
+                raise RuntimeError(f"still conflicting after {self.max_attempts} attempts")
+
+            with self.lock:
+                self._remember(user_id, written)
+            return normalize_state(new_state) if merged else True
+        except Exception as e:
+            logger.error(f"Error saving interview events for {user_id}: {e}")
+            # Reload the persisted state before the next diff
+            self.forget(user_id)
+            return False
+
+    def _write(self, user_id, stream, new_state, expires_at):
+        """Write ``new_state`` on top of ``stream``; return the new stream, or None if another process got there first"""
+        if stream['state'] is None or stream['version'] is None or not self.use_events:
+            # First save, only a pre-event-log row, or events turned off: the snapshot is the whole record
+            return self._write_snapshot(user_id, dict(stream, state=new_state), expires_at)
+
+        events = diff_state(stream['state'], new_state)
+        if not events:
+            return dict(stream, state=new_state)
+        rows = []
+        for offset, (event_type, payload) in enumerate(events, start=1):
+            rows.append((stream['seq'] + offset, event_type, compress_text(encode_value(payload))))
+        # Claim the sequence numbers by moving the snapshot row's version from the one we last saw,
+        # in the same transaction as the events so a failed insert cannot leave a claimed gap
+        if not get_session_store().append_interview_events(
+                user_id, SNAPSHOT_SESSION_ID, rows, stream['version'], expires_at):
+            return None
+        stream = {'state': new_state, 'seq': rows[-1][0], 'snapshot_seq': stream['snapshot_seq'], 'version': rows[-1][0]}
+        with self.lock:
+            self.events_written += len(rows)
+            self.bytes_written += sum(len(row[2]) for row in rows)
+        if stream['seq'] - stream['snapshot_seq'] >= self.snapshot_every:
+            # A lost race here only postpones the snapshot; the events are already written
+            stream = self._write_snapshot(user_id, stream, expires_at) or stream
+        return stream
+
+    def _write_snapshot(self, user_id, stream, expires_at):
+        """Write the full state under the next sequence number; return the new stream, or None on a conflict"""
+        store = get_session_store()
+        seq = stream['seq'] + 1
+        payload = compress_text(encode_state(dict(stream['state'], **{SEQ_KEY: seq})).decode('utf-8'))
+        if not store.compare_and_swap_interview_data(
+                user_id, SNAPSHOT_SESSION_ID, payload, stream['version'] or 0, seq, expires_at):
+            return None
+        if stream['seq'] > stream['snapshot_seq']:
+            # Fold away the events replayed on top of the previous snapshot
+            store.delete_interview_events(user_id, seq)
+        with self.lock:
+            self.snapshots_written += 1
+            self.bytes_written += len(payload)
+        return {'state': stream['state'], 'seq': seq, 'snapshot_seq': seq, 'version': seq}
+
+    def _remember(self, user_id, stream):
+        """Keep the persisted state as the base for the next diff. Must be called with ``self.lock`` held."""
+        self.streams[user_id] = stream
+        self.streams.move_to_end(user_id)
+        while len(self.streams) > self.max_entries:
+            evicted_id, _ = self.streams.popitem(last=False)
+            self.user_locks.pop(evicted_id, None)
+
+    def forget(self, user_id):
+        with self.lock:
+            self.streams.pop(user_id, None)
+
+    def get_stats(self):
+        """Get interview event log statistics"""
+        with self.lock:
+            return {
+                'streams': len(self.streams),
+                'events_written': self.events_written,
+                'snapshots_written': self.snapshots_written,
+                'events_replayed': self.events_replayed,
+                'bytes_written': self.bytes_written,
+                'cas_conflicts': self.cas_conflicts
+            }
+
+# Global event log instance
+_event_log = None
+_log_lock = threading.Lock()
+
+def get_interview_event_log():
+    """Get the global interview event log"""
+    global _event_log
+    if _event_log is None:
+        with _log_lock:
+            if _event_log is None:
+                _event_log = InterviewEventLog()
+    return _event_log
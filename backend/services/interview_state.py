@@ -0,0 +1,216 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+import msgspec
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class InterviewState(msgspec.Struct, kw_only=True):
+    """Typed interview state, as persisted in interview_data.
+
+    Routes keep working with plain dicts; this model is the codec between
+    those dicts and stored payloads. Datetime fields decode to ``datetime``
+    objects, and keys that are not fields here (``jd_id``, ``language``, ...)
+    travel in ``extra``. ``interview_ts`` stays text in the ``str(datetime)``
+    form (``YYYY-MM-DD HH:MM:SS``) that the SQL fallbacks and conversation
+    file names expect.
+    """
+
+    interview_id: Optional[str] = None
+    interview_ts: Optional[str] = None
+    questions: list = []
+    answers: list = []
+    ratings: list = []
+    current_question: int = 0
+    interview_started: bool = False
+    conversation_history: list = []
+    jd_text: Optional[str] = ""
+    difficulty_level: Optional[str] = None
+    student_info: dict = msgspec.field(default_factory=lambda: {
+        'name': '',
+        'roll_no': '',
+        'batch_no': '',
+        'center': '',
+        'course': '',
+        'eval_date': ''
+    })
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    visual_feedback: list = []
+    last_frame_time: float = 0
+    last_activity_time: Optional[datetime] = None
+    current_context: str = ""
+    last_speech_time: Optional[datetime] = None
+    speech_detected: bool = False
+    current_answer: str = ""
+    speech_start_time: Optional[datetime] = None
+    is_processing_answer: bool = False
+    interview_time_used: float = 0
+    visual_feedback_data: list = []
+    waiting_for_answer: bool = False
+    report_generated: bool = False
+    # None only when decoding payloads written before this model existed
+    extra: Optional[dict] = None
+
+STATE_FIELDS = frozenset(InterviewState.__struct_fields__) - {'extra'}
+
+def _enc_hook(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise NotImplementedError(f"Cannot encode {type(obj).__name__} in interview state")
+
+_encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+_decoder = msgspec.json.Decoder(InterviewState)
+_untyped_decoder = msgspec.json.Decoder()
+
+def new_interview_state():
+    """A fresh interview state dict with every field at its default"""
+    return state_to_dict(InterviewState())
+
+def legacy_timestamp(value):
+    """``interview_ts`` as ``str(datetime)`` text; also repairs ISO ``T``-separated text"""
+    if isinstance(value, datetime):
+        return str(value)
+    if isinstance(value, str) and 'T' in value:
+        try:
+            return str(datetime.fromisoformat(value))
+        except ValueError:
+            return value
+    return value
+
+def state_to_dict(state):
+    data = msgspec.structs.asdict(state)
+    extra = data.pop('extra', None)
+    if extra:
+        data.update(extra)
+    if data.get('interview_ts') is not None:
+        # Payloads written with the ISO encoding carried it in extra
+        data['interview_ts'] = legacy_timestamp(data['interview_ts'])
+    return data
+
+def encode_state(data):
+    """Encode an interview state dict to JSON bytes"""
+    fields = {}
+    extra = {}
+    for key, value in data.items():
+        if key == 'interview_ts':
+            fields[key] = legacy_timestamp(value)
+        elif key in STATE_FIELDS:
+            fields[key] = value
+        else:
+            extra[key] = value
+    fields['extra'] = dict(sorted(extra.items()))
+    return _encoder.encode(fields)
+
+def decode_state(payload):
+    """Decode a stored interview state (bytes or str) into a dict with native datetimes"""
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    try:
+        state = _decoder.decode(payload)
+        if state.extra is not None:
+            return state_to_dict(state)
+    except msgspec.ValidationError as e:
+        logger.warning(f"Interview state does not match InterviewState, decoding untyped: {e}")
+        return _untyped_decoder.decode(payload)
+    # Payload from before InterviewState: extra keys sit at the top level
+    return coerce_state(_untyped_decoder.decode(payload))
+
+def coerce_state(data):
+    """Convert the known fields of a plain dict (e.g. with ISO datetime strings) to their model types"""
+    fields = {key: value for key, value in data.items() if key in STATE_FIELDS}
+    extra = {key: value for key, value in data.items() if key not in STATE_FIELDS}
+    try:
+        state = msgspec.convert(fields, InterviewState, strict=False)
+    except msgspec.ValidationError as e:
+        logger.warning(f"Interview state does not match InterviewState, leaving it untyped: {e}")
+        return data
+    state.extra = extra
+    return state_to_dict(state)
+
+def normalize_state(data):
+    """Round-trip a state dict through the codec so it compares the way it will be stored"""
+    return decode_state(encode_state(data))
+
+def encode_value(value):
+    """Encode a fragment of interview state (e.g. an event payload) to JSON text"""
+    return _encoder.encode(value).decode('utf-8')
+
+def decode_value(payload):
+    return _untyped_decoder.decode(payload)
+
+# How fields changed by two writers at once are combined. Fields not listed
+# are last-writer-wins, and each such clash is counted as an overwrite.
+MERGE_POLICIES = {
+    'questions': 'append',
+    'answers': 'append',
+    'ratings': 'append',
+    'conversation_history': 'append',
+    'visual_feedback': 'append',
+    'visual_feedback_data': 'append',
+    'interview_time_used': 'sum',
+    'current_question': 'max',
+    'last_activity_time': 'max',
+    'last_speech_time': 'max',
+    'last_frame_time': 'max',
+    'interview_started': 'max',
+    'report_generated': 'max',
+}
+
+_MISSING = object()
+
+conflict_stats = {'conflicts': 0, 'fields_merged': 0, 'fields_overwritten': 0}
+_conflict_lock = threading.Lock()
+
+def _merge_field(policy, base, mine, theirs):
+    """Combine two concurrent changes to one field, or return _MISSING if the policy does not apply"""
+    if policy == 'append' and all(isinstance(value, list) for value in (base, mine, theirs)) \
+            and mine[:len(base)] == base and theirs[:len(base)] == base:
+        return base + theirs[len(base):] + mine[len(base):]
+    if policy == 'sum' and all(isinstance(value, (int, float)) for value in (base, mine, theirs)):
+        return theirs + (mine - base)
+    if policy == 'max' and mine is not None and theirs is not None:
+        try:
+            return max(mine, theirs)
+        except TypeError:
+            return _MISSING
+    return _MISSING
+
+def merge_states(base, mine, theirs):
+    """Three-way merge of interview states: ``mine`` and ``theirs`` were both derived from ``base``.
+
+    Keys only one side changed take that side's value; keys both changed are
+    combined per ``MERGE_POLICIES`` and otherwise resolved in favour of ``mine``.
+    Returns the merged state and counts it in ``conflict_stats``.
+    """
+    merged = {}
+    merged_fields = overwritten_fields = 0
+    for key in list(theirs) + [key for key in mine if key not in theirs]:
+        base_value = base.get(key, _MISSING)
+        mine_value = mine.get(key, _MISSING)
+        theirs_value = theirs.get(key, _MISSING)
+        if mine_value == base_value or mine_value == theirs_value:
+            value = theirs_value
+        elif theirs_value == base_value:
+            value = mine_value
+        else:
+            value = _merge_field(MERGE_POLICIES.get(key), base_value, mine_value, theirs_value)
+            if value is _MISSING:
+                value = mine_value
+                overwritten_fields += 1
+            else:
+                merged_fields += 1
+        if value is not _MISSING:
+            merged[key] = value
+    with _conflict_lock:
+        conflict_stats['conflicts'] += 1
+        conflict_stats['fields_merged'] += merged_fields
+        conflict_stats['fields_overwritten'] += overwritten_fields
+    return merged
+
+def get_conflict_stats():
+    """Get interview state write-conflict statistics"""
+    with _conflict_lock:
+        return dict(conflict_stats)
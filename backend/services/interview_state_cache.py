@@ -0,0 +1,220 @@
+import logging
+import threading
+from collections import OrderedDict
+from backend.services.interview_state import encode_state, decode_state, merge_states
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+CACHE_MODES = ('write_through', 'write_behind', 'off')
+
+class InterviewStateCache:
+    """Per-user LRU cache of interview state in front of the interview_data table.
+
+    Reads come from memory after the first load. When several workers serve
+    the same candidate, each database write is broadcast on the invalidation
+    bus and the other workers drop their copy. Writes follow ``mode``:
+
+    - ``write_through``: every durable save is written to the database immediately
+    - ``write_behind``: saves only mark the entry dirty; a background thread
+      writes the latest state of each dirty entry every ``flush_interval`` seconds
+    - ``off``: no caching, every call goes to the database
+
+    State is held as its encoded payload, so callers always get a private copy
+    with the same types a database load would give them. Each entry carries a
+    version; a save made from an older version than the cached one (e.g. a
+    ``/check_speech`` that read the state before a slow ``/process_answer``
+    saved) is merged onto the cached state instead of overwriting it.
+    """
+
+    def __init__(self, loader, saver, mode=None, max_entries=None, flush_interval=None):
+        self.loader = loader
+        self.saver = saver
+        self.mode = (mode or Config.INTERVIEW_STATE_CACHE_MODE).lower()
+        if self.mode not in CACHE_MODES:
+            logger.error(f"Unknown INTERVIEW_STATE_CACHE_MODE '{self.mode}', using write_through")
+            self.mode = 'write_through'
+        self.max_entries = max_entries or Config.INTERVIEW_STATE_CACHE_MAX_ENTRIES
+        self.flush_interval = flush_interval if flush_interval is not None else Config.INTERVIEW_STATE_FLUSH_INTERVAL
+        self.entries = OrderedDict()
+        # Versions are unique across entries, so a reloaded entry never matches a stale one
+        self.last_version = 0
+        self.lock = threading.Lock()
+        self._flusher = None
+        self._closed = threading.Event()
+
+        # Telemetry
+        self.hits = 0
+        self.misses = 0
+        self.db_writes = 0
+        self.memory_only_saves = 0
+        self.write_failures = 0
+        self.evictions = 0
+        self.conflicts = 0
+        self.invalidations = 0
+
+    def get(self, user_id):
+        """Return a copy of the user's state, loading it on a miss (None if there is none)"""
+        return self.get_versioned(user_id)[0]
+
+    def get_versioned(self, user_id):
+        """Return ``(state, version)``; pass both back to ``put`` to save with compare-and-swap"""
+        if self.mode == 'off':
+            return self.loader(user_id), None
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry:
+                self.entries.move_to_end(user_id)
+                self.hits += 1
+                return decode_state(entry['payload']), entry['version']
+            self.misses += 1
+
+        data = self.loader(user_id)
+        if data is None:
+            return None, None
+        payload = encode_state(data)
+        with self.lock:
+            # A save that raced with this load wins
+            entry = self.entries.get(user_id)
+            if entry is None:
+                entry = {'payload': payload, 'version': self._next_version(), 'dirty': False}
+                self._store(user_id, entry)
+            return decode_state(entry['payload']), entry['version']
+
+    def put(self, user_id, data, durable=True, base=None, base_version=None):
+        """Cache the user's state and persist it according to the consistency mode.
+
+        ``durable=False`` updates memory only, for transient fields that are not
+        worth a database write; they are persisted with the next durable save.
+        ``base`` and ``base_version`` are the state and version ``data`` was derived
+        from (``base_version`` None if nothing was stored); if the entry has moved
+        on since, the two changes are merged.
+        """
+        if self.mode == 'off':
+            return bool(self._write(user_id, data))
+
+        payload = encode_state(data)
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry and base is not None and entry['version'] != base_version:
+                self.conflicts += 1
+                data = merge_states(base, data, decode_state(entry['payload']))
+                payload = encode_state(data)
+            dirty = entry['dirty'] if entry else False
+            version = self._next_version()
+            entry = {'payload': payload, 'version': version, 'dirty': dirty or durable}
+            self._store(user_id, entry)
+            if not durable:
+                self.memory_only_saves += 1
+                return True
+            if self.mode == 'write_behind':
+                self._start_flusher()
+                return True
+
+        written = self._write(user_id, data)
+        if written:
+            self._mark_clean(user_id, version, written)
+            return True
+        with self.lock:
+            # Leave the entry dirty for the background flusher to retry
+            self._start_flusher()
+        return False
+
+    def invalidate(self, user_id, keep_dirty=False):
+        """Drop the user's cached state without writing it; ``keep_dirty`` spares an entry with unwritten changes"""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry and not (keep_dirty and entry['dirty']):
+                del self.entries[user_id]
+                self.invalidations += 1
+
+    def _next_version(self):
+        """Must be called with ``self.lock`` held."""
+        self.last_version += 1
+        return self.last_version
+
+    def _store(self, user_id, entry):
+        """Insert an entry and evict the least recently used ones. Must be called with ``self.lock`` held."""
+        self.entries[user_id] = entry
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.max_entries:
+            evicted_id, evicted = self.entries.popitem(last=False)
+            self.evictions += 1
+            if evicted['dirty']:
+                # Persist off the request thread; the caller holds the lock
+                threading.Thread(
+                    target=self._write, args=(evicted_id, decode_state(evicted['payload'])), daemon=True
+                ).start()
+
+    def _mark_clean(self, user_id, version, written=None):
+        """Clear the dirty flag if the entry is still at ``version``.
+
+        A saver returns the persisted state instead of True when it merged in
+        another process's changes; the entry then takes that state.
+        """
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry and entry['version'] == version:
+                entry['dirty'] = False
+                if isinstance(written, dict):
+                    entry['payload'] = encode_state(written)
+                    entry['version'] = self._next_version()
+
+    def _write(self, user_id, data):
+        try:
+            written = self.saver(user_id, data)
+        except Exception as e:
+            # Treated as a failed write, so the entry stays dirty for the flusher to retry
+            logger.error(f"Error saving interview state for {user_id}: {e}")
+            written = False
+        with self.lock:
+            if written:
+                self.db_writes += 1
+            else:
+                self.write_failures += 1
+        return written
+
+    def _start_flusher(self):
+        """Start the background flusher. Must be called with ``self.lock`` held."""
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True, name="interview-state-flusher")
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write every dirty entry to the database"""
+        with self.lock:
+            dirty = [(user_id, entry['version'], entry['payload'])
+                     for user_id, entry in self.entries.items() if entry['dirty']]
+        for user_id, version, payload in dirty:
+            written = self._write(user_id, decode_state(payload))
+            if written:
+                self._mark_clean(user_id, version, written)
+        return len(dirty)
+
+    def get_stats(self):
+        """Get interview state cache statistics"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'mode': self.mode,
+                'entries': len(self.entries),
+                'dirty': sum(1 for entry in self.entries.values() if entry['dirty']),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate_percent': round(self.hits / lookups * 100, 2) if lookups else 0,
+                'db_writes': self.db_writes,
+                'memory_only_saves': self.memory_only_saves,
+                'write_failures': self.write_failures,
+                'evictions': self.evictions,
+                'conflicts': self.conflicts,
+                'invalidations': self.invalidations
+            }
+
+    def shutdown(self):
+        """Stop the flusher and write any dirty state"""
+        self._closed.set()
+        self.flush()
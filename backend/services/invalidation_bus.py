@@ -0,0 +1,204 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class InvalidationBus:
+    """Broadcasts cache invalidations between the worker processes on one host.
+
+    ``publish(channel, key)`` appends a row to a change feed in a local SQLite
+    file (WAL mode). Every process polls the feed every ``poll_interval``
+    seconds and calls the handlers subscribed to each channel with the key,
+    skipping the rows it published itself: the writer's own caches are
+    already current. Rows older than ``retention`` seconds are pruned.
+
+    Nothing is opened or started until ``start()`` is called from app setup;
+    before that, ``subscribe`` only records handlers and ``publish`` is a no-op.
+    """
+
+    def __init__(self, path=None, poll_interval=None, retention=None, enabled=None):
+        self.path = path or Config.INVALIDATION_BUS_PATH
+        self.poll_interval = poll_interval if poll_interval is not None else Config.INVALIDATION_POLL_INTERVAL
+        self.retention = retention if retention is not None else Config.INVALIDATION_RETENTION
+        self.enabled = Config.INVALIDATION_BUS if enabled is None else enabled
+        self.handlers = {}
+        self.lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = None
+        self._origin = None
+        self._poller = None
+        self.started = False
+        self._closed = threading.Event()
+        self.last_id = 0
+        self.last_prune = 0
+
+        # Telemetry
+        self.published = 0
+        self.received = 0
+        self.handler_errors = 0
+        self.publish_failures = 0
+        self.last_lag_ms = None
+
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        """Workers forked from a preloaded app need their own poller"""
+        self.lock = threading.Lock()
+        self._pid = None
+        if self.enabled and self.started:
+            try:
+                self._ensure_started()
+            except Exception as e:
+                logger.error(f"Error starting invalidation bus after fork: {e}")
+
+    def _connection(self):
+        # Connections must not cross a fork, so they are keyed by process as well as thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS invalidations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    channel TEXT,
+                    key TEXT,
+                    origin TEXT,
+                    created_at REAL
+                )
+            """)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _ensure_started(self):
+        """Start the poller in this process (again after a fork). Must be called with ``self.lock`` held."""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._origin = f"{self._pid}-{uuid.uuid4().hex[:8]}"
+        # Only changes made after this process started are of interest
+        row = self._connection().execute("SELECT MAX(id) FROM invalidations").fetchone()
+        self.last_id = row[0] or 0
+        self._poller = threading.Thread(target=self._poll_loop, daemon=True, name="invalidation-bus")
+        self._poller.start()
+
+    def start(self):
+        """Open the change feed and start polling it in this process"""
+        with self.lock:
+            self.started = True
+            if self.enabled:
+                try:
+                    self._ensure_started()
+                except Exception as e:
+                    logger.error(f"Error starting invalidation bus: {e}")
+
+    def subscribe(self, channel, handler):
+        """Call ``handler(key)`` whenever another process publishes on ``channel``"""
+        with self.lock:
+            self.handlers.setdefault(channel, []).append(handler)
+
+    def publish(self, channel, key):
+        """Tell the other processes to drop their cached entries for ``key``"""
+        if not self.enabled or not self.started:
+            return
+        try:
+            with self.lock:
+                self._ensure_started()
+                origin = self._origin
+            self._connection().execute(
+                "INSERT INTO invalidations (channel, key, origin, created_at) VALUES (?, ?, ?, ?)",
+                (channel, str(key), origin, time.time())
+            )
+            with self.lock:
+                self.published += 1
+        except Exception as e:
+            logger.error(f"Error publishing invalidation {channel}:{key}: {e}")
+            with self.lock:
+                self.publish_failures += 1
+
+    def _poll_loop(self):
+        while not self._closed.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error polling invalidation bus: {e}")
+
+    def poll(self):
+        """Deliver the invalidations published by other processes since the last poll"""
+        rows = self._connection().execute("""
+            SELECT id, channel, key, origin, created_at FROM invalidations
+            WHERE id > ?
+            ORDER BY id
+            LIMIT 1000
+        """, (self.last_id,)).fetchall()
+        now = time.time()
+        for row_id, channel, key, origin, created_at in rows:
+            self.last_id = row_id
+            if origin == self._origin:
+                continue
+            with self.lock:
+                handlers = list(self.handlers.get(channel, ()))
+                self.received += 1
+                self.last_lag_ms = round((now - created_at) * 1000, 1)
+            for handler in handlers:
+                try:
+                    handler(key)
+                except Exception as e:
+                    logger.error(f"Error handling invalidation {channel}:{key}: {e}")
+                    with self.lock:
+                        self.handler_errors += 1
+        if now - self.last_prune > self.retention:
+            self.last_prune = now
+            self._connection().execute("DELETE FROM invalidations WHERE created_at < ?", (now - self.retention,))
+        return len(rows)
+
+    def get_stats(self):
+        """Get invalidation bus statistics"""
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'channels': sorted(self.handlers),
+                'published': self.published,
+                'received': self.received,
+                'handler_errors': self.handler_errors,
+                'publish_failures': self.publish_failures,
+                'last_lag_ms': self.last_lag_ms
+            }
+
+    def shutdown(self):
+        self._closed.set()
+
+# Global invalidation bus instance
+_bus = None
+_bus_lock = threading.Lock()
+
+def get_invalidation_bus():
+    """Get the global invalidation bus"""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = InvalidationBus()
+    return _bus
+
+def start_invalidation_bus():
+    """Start the global invalidation bus; called once from app setup"""
+    get_invalidation_bus().start()
+
+def publish(channel, key):
+    """Evict ``key`` from the ``channel`` caches of every other worker process"""
+    get_invalidation_bus().publish(channel, key)
+
+def subscribe(channel, handler):
+    """Register ``handler(key)`` for invalidations published by other worker processes"""
+    get_invalidation_bus().subscribe(channel, handler)
@@ -0,0 +1,138 @@
+import atexit
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class JobRunner:
+    """Runs registered maintenance jobs on a fixed interval in one background thread.
+
+    Jobs run one at a time; a job that raises is logged, counted and retried at
+    its next interval. Each run's duration and return value are kept for the
+    monitoring dashboard.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def schedule(self, name, func, interval, run_immediately=False):
+        """Run ``func`` every ``interval`` seconds, replacing any job with the same name"""
+        with self.lock:
+            self.jobs[name] = {
+                'func': func,
+                'interval': interval,
+                'next_run': time.time() + (0 if run_immediately else interval),
+                'running': False,
+                'runs': 0,
+                'failures': 0,
+                'last_run': None,
+                'last_duration_ms': None,
+                'last_result': None,
+                'last_error': None
+            }
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_loop, daemon=True, name="job-runner")
+                self._thread.start()
+        self._wakeup.set()
+        logger.info(f"Scheduled job '{name}' every {interval}s")
+        return name
+
+    def unschedule(self, name):
+        with self.lock:
+            self.jobs.pop(name, None)
+
+    def _run_loop(self):
+        while not self._closed.is_set():
+            with self.lock:
+                next_run = min((job['next_run'] for job in self.jobs.values()), default=None)
+            timeout = None if next_run is None else max(0, next_run - time.time())
+            self._wakeup.wait(timeout=timeout)
+            self._wakeup.clear()
+            if self._closed.is_set():
+                break
+            for name in self._due_jobs():
+                self.run_job(name)
+
+    def _due_jobs(self):
+        now = time.time()
+        with self.lock:
+            return [name for name, job in self.jobs.items() if job['next_run'] <= now and not job['running']]
+
+    def run_job(self, name):
+        """Run a job now and record its outcome"""
+        with self.lock:
+            job = self.jobs.get(name)
+            if job is None or job['running']:
+                return None
+            job['running'] = True
+
+        start_time = time.perf_counter()
+        result = None
+        error = None
+        try:
+            result = job['func']()
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Error running job '{name}': {e}")
+        duration_ms = round((time.perf_counter() - start_time) * 1000, 2)
+
+        with self.lock:
+            job['running'] = False
+            job['runs'] += 1
+            job['last_run'] = time.time()
+            job['last_duration_ms'] = duration_ms
+            job['next_run'] = job['last_run'] + job['interval']
+            if error is None:
+                job['last_result'] = result
+                job['last_error'] = None
+            else:
+                job['failures'] += 1
+                job['last_error'] = error
+        return result
+
+    def get_stats(self):
+        """Get per-job run statistics"""
+        with self.lock:
+            return {
+                name: {
+                    'interval_seconds': job['interval'],
+                    'runs': job['runs'],
+                    'failures': job['failures'],
+                    'last_run': job['last_run'],
+                    'last_duration_ms': job['last_duration_ms'],
+                    'last_result': job['last_result'],
+                    'last_error': job['last_error'],
+                    'next_run_in_seconds': round(max(0, job['next_run'] - time.time()), 1)
+                }
+                for name, job in self.jobs.items()
+            }
+
+    def shutdown(self):
+        """Stop the runner; a job already in progress finishes in the background"""
+        self._closed.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+# Global job runner instance
+_job_runner = None
+_runner_lock = threading.Lock()
+
+def get_job_runner():
+    """Get the global job runner"""
+    global _job_runner
+    if _job_runner is None:
+        with _runner_lock:
+            if _job_runner is None:
+                _job_runner = JobRunner()
+                atexit.register(_job_runner.shutdown)
+    return _job_runner
+
+def schedule_job(name, func, interval, run_immediately=False):
+    """Schedule a periodic job on the global job runner"""
+    return get_job_runner().schedule(name, func, interval, run_immediately)
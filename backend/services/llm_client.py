@@ -0,0 +1,101 @@
+import logging
+import threading
+import time
+import httpx
+from openai import OpenAI
+from config import Config
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+logger = logging.getLogger(__name__)
+
+class LLMClient:
+    """One OpenAI client per process, on a pooled httpx client.
+
+    Every chat completion in the app (question generation, evaluation,
+    reports, visual analysis, translation, encouragement) goes through
+    ``chat``, so TLS connections are opened once and kept alive across
+    requests and threads instead of being set up per call. HTTP/2 is used
+    when ``LLM_HTTP2`` is on and the ``h2`` package is installed, which lets
+    concurrent calls share one connection.
+    """
+
+    def __init__(self, max_connections=None, max_keepalive=None, http2=None):
+        self.http2 = Config.LLM_HTTP2 if http2 is None else http2
+        if self.http2 and h2 is None:
+            logger.warning("LLM_HTTP2 is on but the h2 package is not installed, using HTTP/1.1")
+            self.http2 = False
+        self.max_connections = max_connections or Config.LLM_MAX_CONNECTIONS
+        self.http_client = httpx.Client(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=max_keepalive or Config.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=Config.LLM_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(Config.LLM_TIMEOUT, connect=Config.LLM_CONNECT_TIMEOUT)
+        )
+        base_url = Config.OPENAI_API_BASE if Config.OPENAI_API_BASE not in ("", "Unknown") else None
+        self.client = OpenAI(
+            api_key=Config.OPENAI_API_KEY,
+            base_url=base_url,
+            http_client=self.http_client,
+            max_retries=Config.LLM_MAX_RETRIES
+        )
+        self.lock = threading.Lock()
+
+        # Telemetry
+        self.requests = 0
+        self.failures = 0
+        self.total_ms = 0.0
+
+    def chat(self, timeout=None, **kwargs):
+        """Create a chat completion; ``timeout`` (seconds) overrides LLM_TIMEOUT for this call"""
+        start_time = time.perf_counter()
+        try:
+            if timeout is not None:
+                kwargs['timeout'] = timeout
+            return self.client.chat.completions.create(**kwargs)
+        except Exception:
+            with self.lock:
+                self.failures += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            with self.lock:
+                self.requests += 1
+                self.total_ms += elapsed_ms
+
+    def get_stats(self):
+        """Get LLM client statistics"""
+        with self.lock:
+            return {
+                'http2': self.http2,
+                'max_connections': self.max_connections,
+                'requests': self.requests,
+                'failures': self.failures,
+                'avg_latency_ms': round(self.total_ms / self.requests, 1) if self.requests else 0
+            }
+
+    def close(self):
+        self.http_client.close()
+
+# Global LLM client instance
+_llm_client = None
+_client_lock = threading.Lock()
+
+def get_llm_client():
+    """Get the global LLM client"""
+    global _llm_client
+    if _llm_client is None:
+        with _client_lock:
+            if _llm_client is None:
+                _llm_client = LLMClient()
+    return _llm_client
+
+def chat_completion(**kwargs):
+    """Create a chat completion through the global pooled client"""
+    return get_llm_client().chat(**kwargs)
@@ -4,9 +4,24 @@ import time
 from datetime import datetime, timedelta
 from backend.services.session_service import get_active_interviews
 from backend.services.connection_pool import get_connection_pool
+from backend.services.write_behind import get_write_behind_queue
+from backend.services.query_cache import get_query_cache
+from backend.utils.session_interface import session_cache
+from backend.services.session_service import session_touch_buffer
+from backend.services.job_runner import get_job_runner
+from backend.services.redis_service import interview_state_cache, get_unit_of_work_stats
+from backend.services.interview_events import get_interview_event_log
+from backend.utils.compression import get_compression_stats
+from backend.services.interview_state import get_conflict_stats
+from backend.services.invalidation_bus import get_invalidation_bus, publish, subscribe
+from backend.services.llm_client import get_llm_client
+from backend.services.question_service import get_question_pregenerator, get_question_bank
 
 logger = logging.getLogger(__name__)
 
+# Invalidation bus channel: another worker ended a user's interview
+INTERVIEW_ENDED_CHANNEL = 'interview_ended'
+
 class InterviewMonitor:
     def __init__(self):
         self.active_interviews = {}
@@ -56,6 +71,13 @@ class InterviewMonitor:
                 
                 del self.active_interviews[user_id]
                 logger.info(f"Interview ended for user {user_id}. Active interviews: {len(self.active_interviews)}")
+        # The interview may also be tracked by the worker that started it
+        publish(INTERVIEW_ENDED_CHANNEL, user_id)
+
+    def forget_interview(self, user_id):
+        """Stop tracking an interview that another worker ended"""
+        with self.lock:
+            self.active_interviews.pop(user_id, None)
     
     def get_active_interview_count(self):
         """Get current number of active interviews"""
@@ -134,6 +156,22 @@ class SystemMonitor:
             
             # Get connection pool stats
             pool_stats = get_connection_pool().get_pool_stats()
+            write_behind_stats = get_write_behind_queue().get_stats()
+            query_cache_stats = get_query_cache().get_stats()
+            session_cache_stats = session_cache.get_stats()
+            session_touch_stats = session_touch_buffer.get_stats()
+            job_stats = get_job_runner().get_stats()
+            interview_state_stats = interview_state_cache.get_stats()
+            interview_event_stats = get_interview_event_log().get_stats()
+            unit_of_work_stats = get_unit_of_work_stats()
+            compression_stats = get_compression_stats()
+            write_conflict_stats = get_conflict_stats()
+            write_conflict_stats['cache_conflicts'] = interview_state_stats['conflicts']
+            write_conflict_stats['database_conflicts'] = interview_event_stats['cas_conflicts']
+            invalidation_stats = get_invalidation_bus().get_stats()
+            llm_stats = get_llm_client().get_stats()
+            question_stats = get_question_pregenerator().get_stats()
+            question_bank_stats = get_question_bank().get_stats()
             
             return {
                 'uptime_seconds': round(uptime, 2),
@@ -142,12 +180,27 @@ class SystemMonitor:
                 'total_errors': self.error_count,
                 'error_rate_percent': round(error_rate, 2),
                 'requests_per_minute': round(self.request_count / max(uptime / 60, 1), 2),
-                'connection_pool': pool_stats
+                'connection_pool': pool_stats,
+                'write_behind': write_behind_stats,
+                'query_cache': query_cache_stats,
+                'session_cache': session_cache_stats,
+                'session_touches': session_touch_stats,
+                'jobs': job_stats,
+                'interview_state_cache': interview_state_stats,
+                'interview_events': interview_event_stats,
+                'unit_of_work': unit_of_work_stats,
+                'compression': compression_stats,
+                'write_conflicts': write_conflict_stats,
+                'invalidation_bus': invalidation_stats,
+                'llm_client': llm_stats,
+                'question_pregeneration': question_stats,
+                'question_bank': question_bank_stats
             }
 
 # Global instances
 interview_monitor = InterviewMonitor()
 system_monitor = SystemMonitor()
+subscribe(INTERVIEW_ENDED_CHANNEL, interview_monitor.forget_interview)
 
 def start_monitoring():
     """Start the monitoring system"""
@@ -4,15 +4,12 @@ import json
 import hashlib
 import re
 import os
-from config import Config
-from datetime import datetime
 from collections import Counter
 from backend.services.audio_service import text_to_speech
 from backend.utils.file_utils import load_conversation_from_file
 from backend.utils.performance_utils import timing_decorator
+from backend.services.llm_client import chat_completion
 
-openai.api_key = Config.OPENAI_API_KEY
-openai.api_base = Config.OPENAI_API_BASE
 logger = logging.getLogger(__name__)
 
 # Simple in-memory cache for response evaluations
@@ -30,7 +27,7 @@ def translate_text(text: str, target_language: str) -> str:
             # default to English
             instruction = "Translate the following text to English only. Keep technical terms accurate. Return only the translated text."
         prompt = f"{instruction}\n\nText:\n{text}"
-        response = openai.ChatCompletion.create(
+        response = chat_completion(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.2,
@@ -118,14 +115,14 @@ def generate_questions_from_jd(jd_text, difficulty_level, roll_no=None, language
     IMPORTANT: Do not use any markdown formatting, asterisks (*), bold formatting (**), or special characters. Use only plain text.
     """
     try:
-        response = openai.ChatCompletion.create(
+        response = chat_completion(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
             max_tokens=1500,
             timeout=45
         )
-        if 'choices' not in response or not response['choices']:
+        if not response.choices:
             logger.error("No valid choices found in OpenAI response.")
             return []
         script = response.choices[0].message.content or ""
@@ -219,7 +216,7 @@ def generate_encouragement_prompt(conversation_history):
         {conversation_history[-2:] if len(conversation_history) > 2 else conversation_history}
         Return ONLY the prompt, nothing else.
         """
-        response = openai.ChatCompletion.create(
+        response = chat_completion(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.5,
@@ -415,7 +412,7 @@ CRITICAL REQUIREMENTS:
         try:
             logger.info(f"Attempting response evaluation (attempt {attempt + 1}/{max_retries})")
             
-            response = openai.ChatCompletion.create(
+            response = chat_completion(
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": rating_prompt}],
                 temperature=0.1,  # Very low temperature for consistent evaluation
@@ -501,16 +498,16 @@ CRITICAL REQUIREMENTS:
             logger.info(f"Successfully evaluated response: avg={avg_rating:.1f}, range={rating_range:.1f}")
             return normalized_ratings
             
-        except openai.error.Timeout:
+        except openai.APITimeoutError:
             logger.warning(f"OpenAI timeout on attempt {attempt + 1}")
             continue
-        except openai.error.RateLimitError:
+        except openai.RateLimitError:
             logger.warning(f"Rate limit hit on attempt {attempt + 1}")
             if attempt < max_retries - 1:
                 import time
                 time.sleep(2 ** attempt)  # Exponential backoff
             continue  
-        except openai.error.APIError as e:
+        except openai.APIError as e:
             logger.warning(f"API error on attempt {attempt + 1}: {str(e)}")
             continue
         except Exception as e:
@@ -574,10 +571,6 @@ def generate_interview_report(interview_data):
         duration = "N/A"
         if interview_data.get('start_time') and interview_data.get('end_time'):
             try:
-                if isinstance(interview_data['start_time'], str):
-                    interview_data['start_time'] = datetime.fromisoformat(interview_data['start_time'])
-                if isinstance(interview_data['end_time'], str):
-                    interview_data['end_time'] = datetime.fromisoformat(interview_data['end_time'])
                 total_secs = (interview_data['end_time'] - interview_data['start_time']).total_seconds()
                 m, s = divmod(int(total_secs), 60)
                 duration = f"{m}m {s}s"
@@ -651,7 +644,7 @@ Conversation Transcript:
 {conversation_history}
 """
         
-        response = openai.ChatCompletion.create(
+        response = chat_completion(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": report_prompt}],
             temperature=0.5,
@@ -693,7 +686,7 @@ Transcript:
 {conversation_history}
 """
         
-        rating_response = openai.ChatCompletion.create(
+        rating_response = chat_completion(
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": rating_prompt}],
             temperature=0.3,
@@ -834,7 +827,7 @@ Constraints:
 - If observations are sparse, write a brief, honest sentence.
 - Return ONLY JSON.
 """
-                    response = openai.ChatCompletion.create(
+                    response = chat_completion(
                         model="gpt-4o-mini",
                         messages=[{"role": "user", "content": narrative_prompt}],
                         temperature=0.4,
@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+from backend.services.connection_pool import pooled_connection
+from backend.services.invalidation_bus import publish, subscribe
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Invalidation bus channel: another worker wrote to a table (the key)
+QUERY_CACHE_CHANNEL = 'query_cache'
+
+class QueryCache:
+    """Short-lived cache of read-only query results keyed by (sql, params).
+
+    Each entry is tagged with the tables it reads so that writers can
+    invalidate exactly the entries they affect.
+    """
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl if ttl is not None else Config.QUERY_CACHE_TTL
+        self.max_entries = max_entries or Config.QUERY_CACHE_MAX_ENTRIES
+        self.entries = {}
+        self.tags = {}
+        # Bumped on every invalidation of a table, so a query that raced with a write is not cached
+        self.generations = {}
+        self.lock = threading.Lock()
+
+        # Telemetry
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def query(self, sql, params=(), tables=(), ttl=None):
+        """Return ``(rows, column_names)`` for a SELECT, from cache when fresh"""
+        key = (sql, tuple(params))
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry['expires_at'] > now:
+                self.hits += 1
+                return list(entry['rows']), list(entry['columns'])
+            self.misses += 1
+            generations = self._generations(tables)
+
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute(sql, params)
+            rows = cs.fetchall()
+            columns = [desc[0] for desc in cs.description]
+            cs.close()
+
+        with self.lock:
+            # Skip caching if a table was written while the query ran; the rows may predate the write
+            if self._generations(tables) == generations:
+                self._store(key, rows, columns, tables, time.time() + (ttl if ttl is not None else self.ttl))
+        return list(rows), list(columns)
+
+    def _generations(self, tables):
+        """Invalidation generation of each table. Must be called with ``self.lock`` held."""
+        return tuple(self.generations.get(table.lower(), 0) for table in tables)
+
+    def _store(self, key, rows, columns, tables, expires_at):
+        if key not in self.entries and len(self.entries) >= self.max_entries:
+            self._evict()
+        self.entries[key] = {
+            'rows': tuple(rows),
+            'columns': tuple(columns),
+            'tables': tuple(table.lower() for table in tables),
+            'expires_at': expires_at
+        }
+        for table in self.entries[key]['tables']:
+            self.tags.setdefault(table, set()).add(key)
+
+    def _evict(self):
+        """Drop expired entries, or the one closest to expiry if none have expired"""
+        now = time.time()
+        expired = [key for key, entry in self.entries.items() if entry['expires_at'] <= now]
+        if not expired:
+            expired = [min(self.entries, key=lambda key: self.entries[key]['expires_at'])]
+        for key in expired:
+            self._remove(key)
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry:
+            for table in entry['tables']:
+                keys = self.tags.get(table)
+                if keys:
+                    keys.discard(key)
+
+    def invalidate_tables(self, *tables):
+        """Drop every cached result that reads any of ``tables``"""
+        with self.lock:
+            removed = 0
+            for table in tables:
+                table = table.lower()
+                self.generations[table] = self.generations.get(table, 0) + 1
+                for key in list(self.tags.pop(table, ())):
+                    if key in self.entries:
+                        self._remove(key)
+                        removed += 1
+            self.invalidations += removed
+        if removed:
+            logger.debug(f"Invalidated {removed} cached queries for {', '.join(tables)}")
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.tags.clear()
+
+    def get_stats(self):
+        """Get query cache statistics"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate_percent': round(self.hits / lookups * 100, 2) if lookups else 0,
+                'invalidations': self.invalidations,
+                'ttl_seconds': self.ttl
+            }
+
+# Global query cache instance
+_query_cache = None
+_cache_lock = threading.Lock()
+
+def get_query_cache():
+    """Get the global query cache"""
+    global _query_cache
+    if _query_cache is None:
+        with _cache_lock:
+            if _query_cache is None:
+                _query_cache = QueryCache()
+    return _query_cache
+
+def cached_query(sql, params=(), tables=(), ttl=None):
+    """Run a read-only query through the global query cache"""
+    return get_query_cache().query(sql, params, tables, ttl)
+
+def invalidate_tables(*tables):
+    """Invalidate cached results that read any of ``tables``, in every worker"""
+    get_query_cache().invalidate_tables(*tables)
+    for table in tables:
+        publish(QUERY_CACHE_CHANNEL, table)
+
+def _invalidate_from_other_worker(table):
+    get_query_cache().invalidate_tables(table)
+
+subscribe(QUERY_CACHE_CHANNEL, _invalidate_from_other_worker)
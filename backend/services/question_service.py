@@ -0,0 +1,473 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from config import Config
+from backend.services.connection_pool import pooled_connection
+from backend.services.schema_cache import table_columns
+
+logger = logging.getLogger(__name__)
+
+QUESTIONS_PER_INTERVIEW = 5
+
+# Used to pad the set when generation returns fewer distinct questions
+FALLBACK_QUESTIONS = [
+    "Tell us about yourself.",
+    "What programming languages do you know?",
+    "Explain a basic project you've worked on.",
+    "Describe a challenge you faced and how you resolved it.",
+    "Where do you see yourself improving technically?"
+]
+
+def sanitize_question_text(text):
+    """Remove leading markdown like **Question 1** / Question 1: and stray asterisks."""
+    if not text:
+        return text
+
+    # Convert to string and strip whitespace
+    cleaned = str(text).strip()
+
+    # AGGRESSIVE asterisk removal - handle all possible cases
+
+    # Normalize non-breaking spaces
+    cleaned = cleaned.replace('\u00A0', ' ')
+    # 1. Remove any asterisks/bullets/hyphens at the very beginning (like "** ", "- ", "• ")
+    cleaned = re.sub(r'^[\s\*\-\u2022\u2023\u25E6\u2043\u2219]+', '', cleaned)
+
+    # 2. Remove any asterisks at the very end
+    cleaned = re.sub(r'[\s\u00A0]*\*+[\s\u00A0]*$', '', cleaned)
+
+    # 3. Remove all markdown asterisks from the entire text
+    # This handles cases like "**Question 1:** Tell us about yourself" or "*What is your experience?*"
+    cleaned = re.sub(r'\*+([^*]*?)\*+', r'\1', cleaned)
+
+    # 4. Remove any remaining standalone asterisks (like "** " in the middle)
+    cleaned = re.sub(r'[\s\u00A0]+\*+[\s\u00A0]+', ' ', cleaned)
+
+    # 5. Drop a leading line that is just a Question header (possibly bolded)
+    lines = cleaned.splitlines()
+    while lines and re.match(r"^\s*\**\s*question\s*\d+\s*\**\s*:?\s*$", lines[0], re.IGNORECASE):
+        lines.pop(0)
+    cleaned = "\n".join(lines).strip()
+
+    # 6. Remove inline prefix like **Question 1:** or Question 1:
+    cleaned = re.sub(r"^\s*\**\s*question\s*\d+\s*\**\s*:?\s*", "", cleaned, flags=re.IGNORECASE)
+
+    # 7. Remove any remaining question prefixes with numbers
+    cleaned = re.sub(r"^\s*\**\s*question\s*\d+\s*\**\s*:?\s*", "", cleaned, flags=re.IGNORECASE)
+
+    # 8. Remove surrounding asterisks if entire text is wrapped
+    cleaned = re.sub(r"^\s*\*{1,3}\s*(.*?)\s*\*{1,3}\s*$", r"\1", cleaned)
+
+    # 9. Final cleanup - remove any remaining asterisks/bullets at the beginning or end
+    cleaned = re.sub(r'^[\s\*\-\u2022\u2023\u25E6\u2043\u2219]+', '', cleaned)
+    cleaned = re.sub(r'[\s\*\-\u2022\u2023\u25E6\u2043\u2219]+$', '', cleaned)
+
+    # 10. Clean up any double spaces that might have been created
+    cleaned = re.sub(r'[\s\u00A0]+', ' ', cleaned)
+
+    return cleaned.strip()
+
+def finalize_questions(questions):
+    """Sanitize and de-duplicate generated questions, padding with fallbacks to exactly five"""
+    sanitized = []
+    seen = set()
+    for q in questions or []:
+        qn = sanitize_question_text((q or "").strip())
+        if not qn or qn in seen:
+            continue
+        sanitized.append(qn)
+        seen.add(qn)
+        if len(sanitized) == QUESTIONS_PER_INTERVIEW:
+            break
+    # Pad with fallback questions until we have 5
+    for fq in FALLBACK_QUESTIONS:
+        if len(sanitized) >= QUESTIONS_PER_INTERVIEW:
+            break
+        if fq not in seen:
+            sanitized.append(fq)
+            seen.add(fq)
+    return sanitized[:QUESTIONS_PER_INTERVIEW]
+
+def generate_interview_questions(jd_text, difficulty_level, roll_no=None, language='english'):
+    """Five questions for an interview, drawn from the question bank when it has enough unseen ones"""
+    return get_question_bank().draw(jd_text, difficulty_level, roll_no, language)
+
+def _generate_fresh_questions(jd_text, difficulty_level, roll_no, language):
+    # Imported here so monitoring can read the stats without loading the voice services
+    from backend.services.openai_service import generate_questions_from_jd
+    return finalize_questions(generate_questions_from_jd(jd_text, difficulty_level, roll_no, language))
+
+def _normalize_difficulty(difficulty_level):
+    normalized = (difficulty_level or "").strip().lower()
+    if normalized in {"easy", "beginner"}:
+        return "beginner"
+    if normalized in {"hard", "advanced"}:
+        return "advanced"
+    return "medium"
+
+def question_bank_key(jd_text, difficulty_level, language):
+    """Bank key: hash of the JD content (whitespace and case insensitive), difficulty and language"""
+    jd_hash = hashlib.sha256(" ".join((jd_text or "").split()).lower().encode()).hexdigest()
+    lang = (language or 'english').strip().lower()
+    return f"{jd_hash}:{_normalize_difficulty(difficulty_level)}:{lang}"
+
+def select_set(sets, use_counts, seen):
+    """The least used complete set with no question the candidate has seen (oldest first on ties).
+
+    ``sets`` is a list of ``(set_id, questions)`` oldest first. Returns ``(set_id, questions)`` or None.
+    """
+    eligible = [
+        (use_counts.get(set_id, 0), index, set_id, questions)
+        for index, (set_id, questions) in enumerate(sets)
+        if len(questions) >= QUESTIONS_PER_INTERVIEW and not seen.intersection(questions)
+    ]
+    if not eligible:
+        return None
+    _, _, set_id, questions = min(eligible, key=lambda candidate: candidate[:2])
+    return set_id, questions[:QUESTIONS_PER_INTERVIEW]
+
+class QuestionBank:
+    """Keeps every generated question set per (JD hash, difficulty, language).
+
+    Sets are stored whole, with each question's position, so the generated
+    easy-to-hard order is kept. Each interview draws the least used set that
+    has no question its roll_no has been asked before, so candidates on the
+    same JD rotate through different sets. The LLM is only called when no
+    such set exists, and only once per key at a time in this process: other
+    draws for the key wait for that generation. Sets padded with generic
+    fallback questions are never banked.
+    """
+
+    def __init__(self, enabled=None, generate=None, max_sets=None, wait_timeout=None):
+        self.enabled = Config.QUESTION_BANK if enabled is None else enabled
+        self.generate = generate or _generate_fresh_questions
+        self.max_sets = max_sets or Config.QUESTION_BANK_MAX_SETS
+        self.wait_timeout = wait_timeout if wait_timeout is not None else Config.LLM_TIMEOUT
+        self.lock = threading.Lock()
+        # bank_key -> Event set when the generation in progress for it finishes
+        self.in_flight = {}
+
+        # Telemetry
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.errors = 0
+        self.banked_sets = 0
+
+    def draw(self, jd_text, difficulty_level, roll_no=None, language='english'):
+        """Questions for a new interview; calls the LLM only when the bank has no unseen set"""
+        if not self.enabled:
+            return self.generate(jd_text, difficulty_level, roll_no, language)
+        bank_key = question_bank_key(jd_text, difficulty_level, language)
+        owner = False
+        try:
+            chosen = self._select(bank_key, roll_no)
+            if chosen is None:
+                with self.lock:
+                    pending = self.in_flight.get(bank_key)
+                    if pending is None:
+                        # This draw generates the key's next set
+                        self.in_flight[bank_key] = threading.Event()
+                        owner = True
+                if pending is not None:
+                    # Another draw is generating a set for this key; use it if it suits this candidate
+                    with self.lock:
+                        self.waits += 1
+                    pending.wait(self.wait_timeout)
+                    chosen = self._select(bank_key, roll_no)
+        except Exception as e:
+            logger.error(f"Error reading question bank: {e}")
+            with self.lock:
+                self.errors += 1
+            return self.generate(jd_text, difficulty_level, roll_no, language)
+
+        if chosen is not None:
+            with self.lock:
+                self.hits += 1
+            set_id, questions = chosen
+        else:
+            with self.lock:
+                self.misses += 1
+            try:
+                set_id, questions = self._generate_set(bank_key, jd_text, difficulty_level, roll_no, language)
+            finally:
+                if owner:
+                    with self.lock:
+                        self.in_flight.pop(bank_key).set()
+
+        try:
+            self._record_usage(bank_key, set_id, roll_no, questions)
+        except Exception as e:
+            logger.error(f"Error recording question bank usage: {e}")
+            with self.lock:
+                self.errors += 1
+        return questions
+
+    def _select(self, bank_key, roll_no):
+        sets, use_counts, seen = self._load(bank_key, roll_no)
+        return select_set(sets, use_counts, seen)
+
+    def _generate_set(self, bank_key, jd_text, difficulty_level, roll_no, language):
+        """Generate a fresh set and bank it; returns ``(set_id, questions)``, set_id None if not banked"""
+        questions = self.generate(jd_text, difficulty_level, roll_no, language)
+        if any(q in FALLBACK_QUESTIONS for q in questions):
+            return None, questions
+        set_id = uuid.uuid4().hex
+        try:
+            self._add(bank_key, set_id, questions)
+            with self.lock:
+                self.banked_sets += 1
+        except Exception as e:
+            logger.error(f"Error adding questions to the question bank: {e}")
+            with self.lock:
+                self.errors += 1
+            set_id = None
+        return set_id, questions
+
+    def _load(self, bank_key, roll_no):
+        """The newest ``max_sets`` sets (returned oldest first), their use counts, and the questions ``roll_no`` has seen"""
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                SELECT set_id, question FROM question_bank
+                WHERE bank_key = %s AND set_id IN (
+                    SELECT set_id FROM question_bank
+                    WHERE bank_key = %s AND set_id IS NOT NULL
+                    GROUP BY set_id
+                    ORDER BY MIN(created_at) DESC
+                    LIMIT %s
+                )
+                ORDER BY created_at, set_id, position
+            """, (bank_key, bank_key, self.max_sets))
+            sets = {}
+            for set_id, question in cs.fetchall():
+                sets.setdefault(set_id, []).append(question)
+            cs.execute("""
+                SELECT set_id, COUNT(*) FROM question_bank_usage
+                WHERE bank_key = %s AND set_id IS NOT NULL
+                GROUP BY set_id
+            """, (bank_key,))
+            use_counts = dict(cs.fetchall())
+            seen = set()
+            if roll_no:
+                cs.execute("""
+                    SELECT DISTINCT question FROM question_bank_usage
+                    WHERE bank_key = %s AND roll_no = %s
+                """, (bank_key, roll_no))
+                seen = {row[0] for row in cs.fetchall()}
+            cs.close()
+        return list(sets.items()), use_counts, seen
+
+    def _add(self, bank_key, set_id, questions):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute(
+                f"INSERT INTO question_bank (bank_key, set_id, position, question) VALUES {', '.join(['(%s, %s, %s, %s)'] * len(questions))}",
+                [value for position, q in enumerate(questions) for value in (bank_key, set_id, position, q)]
+            )
+            conn.commit()
+            cs.close()
+
+    def _record_usage(self, bank_key, set_id, roll_no, questions):
+        if not questions:
+            return
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute(
+                f"INSERT INTO question_bank_usage (bank_key, set_id, roll_no, question) VALUES {', '.join(['(%s, %s, %s, %s)'] * len(questions))}",
+                [value for q in questions for value in (bank_key, set_id, roll_no, q)]
+            )
+            conn.commit()
+            cs.close()
+
+    def get_stats(self):
+        """Get question bank statistics"""
+        with self.lock:
+            draws = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate_percent': round(self.hits / draws * 100, 1) if draws else 0,
+                'waits': self.waits,
+                'banked_sets': self.banked_sets,
+                'errors': self.errors
+            }
+
+class QuestionPregenerator:
+    """Generates interview questions in the background when an interview is scheduled.
+
+    The JD, difficulty and language are known when the recruiter schedules the
+    interview, so the LLM call runs on a small thread pool then and the
+    finished questions are stored on the interview row. ``/start_interview``
+    consumes them with ``take``: a job still running in this process is waited
+    on for up to ``QUESTION_PREGEN_WAIT`` seconds, and the stored questions are
+    cleared once taken, so a restarted interview gets a fresh draw. It only
+    generates live when there is nothing to take (the job failed, timed out or
+    ran in another worker, or the interview predates the column).
+    """
+
+    def __init__(self, workers=None, wait_timeout=None):
+        self.wait_timeout = wait_timeout if wait_timeout is not None else Config.QUESTION_PREGEN_WAIT
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or Config.QUESTION_PREGEN_WORKERS,
+            thread_name_prefix="question-pregen"
+        )
+        self.lock = threading.Lock()
+        # interview_id -> Future of the job generating its questions
+        self.pending = {}
+
+        # Telemetry
+        self.queued = 0
+        self.generated = 0
+        self.failed = 0
+        self.total_ms = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+
+    def enqueue(self, interview_id, jd_text, difficulty_level, roll_no=None, language=None):
+        """Start generating the questions for a newly scheduled interview"""
+        with self.lock:
+            if interview_id in self.pending:
+                return
+            self.pending[interview_id] = None
+            self.queued += 1
+        try:
+            future = self.executor.submit(self._generate, interview_id, jd_text, difficulty_level, roll_no, language or 'english')
+            with self.lock:
+                # The job may already have finished and removed itself
+                if interview_id in self.pending:
+                    self.pending[interview_id] = future
+        except Exception as e:
+            logger.error(f"Error queueing question generation for interview {interview_id}: {e}")
+            with self.lock:
+                self.pending.pop(interview_id, None)
+                self.failed += 1
+
+    def _generate(self, interview_id, jd_text, difficulty_level, roll_no, language):
+        start_time = time.perf_counter()
+        try:
+            questions = generate_interview_questions(jd_text, difficulty_level, roll_no, language)
+            store_questions(interview_id, questions)
+            with self.lock:
+                self.generated += 1
+                self.total_ms += (time.perf_counter() - start_time) * 1000
+            logger.info(f"Pre-generated {len(questions)} questions for interview {interview_id}")
+        except Exception as e:
+            logger.error(f"Error pre-generating questions for interview {interview_id}: {e}")
+            with self.lock:
+                self.failed += 1
+        finally:
+            with self.lock:
+                self.pending.pop(interview_id, None)
+
+    def take(self, interview_id):
+        """Consume the questions stored for the interview, or None when there are none to take"""
+        if not interview_id:
+            return None
+        with self.lock:
+            future = self.pending.get(interview_id)
+        if future is not None:
+            # Generation is under way: waiting is cheaper than generating the same questions again
+            with self.lock:
+                self.waits += 1
+            wait([future], timeout=self.wait_timeout)
+        questions = take_questions(interview_id)
+        with self.lock:
+            if questions:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return questions
+
+    def get_stats(self):
+        """Get question pre-generation statistics"""
+        with self.lock:
+            served = self.hits + self.misses
+            return {
+                'queued': self.queued,
+                'pending': len(self.pending),
+                'generated': self.generated,
+                'failed': self.failed,
+                'avg_generation_ms': round(self.total_ms / self.generated, 1) if self.generated else 0,
+                'pregenerated_starts': self.hits,
+                'live_generations': self.misses,
+                'waited_for_job': self.waits,
+                'hit_rate_percent': round(self.hits / served * 100, 1) if served else 0
+            }
+
+def store_questions(interview_id, questions):
+    """Store the questions on the interview row"""
+    with pooled_connection() as conn:
+        cs = conn.cursor()
+        cs.execute(
+            "UPDATE interview SET questions = %s WHERE interview_id = %s",
+            (json.dumps(questions), interview_id)
+        )
+        conn.commit()
+        cs.close()
+
+def take_questions(interview_id):
+    """Questions stored on the interview row, cleared so they are served once; None if there are none"""
+    if not table_columns('interview', ['questions']):
+        return None
+    try:
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("SELECT questions FROM interview WHERE interview_id = %s", (interview_id,))
+            row = cs.fetchone()
+            if row and row[0]:
+                # Only the request that clears the stored value gets it
+                cs.execute(
+                    "UPDATE interview SET questions = NULL WHERE interview_id = %s AND questions = %s",
+                    (interview_id, row[0])
+                )
+                if not cs.rowcount:
+                    row = None
+                conn.commit()
+            cs.close()
+        if not row or not row[0]:
+            return None
+        questions = json.loads(row[0])
+        if not isinstance(questions, list) or len(questions) < QUESTIONS_PER_INTERVIEW:
+            return None
+        return questions
+    except Exception as e:
+        logger.error(f"Error taking pre-generated questions for interview {interview_id}: {e}")
+        return None
+
+# Global question bank instance
+_bank = None
+_bank_lock = threading.Lock()
+
+def get_question_bank():
+    """Get the global question bank"""
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = QuestionBank()
+    return _bank
+
+# Global question pre-generator instance
+_pregenerator = None
+_pregenerator_lock = threading.Lock()
+
+def get_question_pregenerator():
+    """Get the global question pre-generator"""
+    global _pregenerator
+    if _pregenerator is None:
+        with _pregenerator_lock:
+            if _pregenerator is None:
+                _pregenerator = QuestionPregenerator()
+    return _pregenerator
+
+def pregenerate_questions(interview_id, jd_text, difficulty_level, roll_no=None, language=None):
+    """Generate and store an interview's questions in the background"""
+    get_question_pregenerator().enqueue(interview_id, jd_text, difficulty_level, roll_no, language)
@@ -1,69 +1,138 @@
-import json
 import logging
-from config import Config
-from backend.utils.json_encoder import CustomJSONEncoder
-from backend.services.session_service import (
-    get_interview_data as db_get_interview_data,
-    save_interview_data as db_save_interview_data,
-    clear_interview_data as db_clear_interview_data
+import threading
+from flask import g, has_request_context
+import atexit
+from backend.services.session_service import clear_interview_data as db_clear_interview_data
+from backend.services.interview_state_cache import InterviewStateCache
+from backend.services.interview_events import get_interview_event_log
+from backend.services.interview_state import new_interview_state, encode_state, decode_state
+from backend.services.invalidation_bus import publish, subscribe
+
+# Invalidation bus channel: a user's interview state was written by another worker
+INTERVIEW_STATE_CHANNEL = 'interview_state'
+
+def _publishing(saver):
+    """Wrap a saver so each database write evicts the user's state in the other workers"""
+    def save(user_id, data):
+        written = saver(user_id, data)
+        if written:
+            publish(INTERVIEW_STATE_CHANNEL, user_id)
+        return written
+    return save
+
+# Reads come from memory after the first load; writes go to the database per INTERVIEW_STATE_CACHE_MODE,
+# as compare-and-swap writes to the user's snapshot row (plus event-log appends when INTERVIEW_EVENT_LOG is on)
+interview_state_cache = InterviewStateCache(
+    loader=get_interview_event_log().load, saver=_publishing(get_interview_event_log().save)
 )
+atexit.register(interview_state_cache.shutdown)
+
+def _evict_interview_state(user_id):
+    """Another worker wrote this user's state: reload it on next use"""
+    # Unflushed local changes stay; their write is merged with the other worker's by compare-and-swap
+    interview_state_cache.invalidate(user_id, keep_dirty=True)
+    get_interview_event_log().forget(user_id)
+
+subscribe(INTERVIEW_STATE_CHANNEL, _evict_interview_state)
+
+# Request-scoped unit of work counters
+unit_of_work_stats = {'saves_requested': 0, 'saves_flushed': 0, 'saves_avoided': 0}
+_stats_lock = threading.Lock()
 
 def init_interview_data():
-    return {
-        "questions": [],
-        "answers": [],
-        "ratings": [],
-        "current_question": 0,
-        "interview_started": False,
-        "conversation_history": [],
-        "jd_text": "",
-        "difficulty_level": None,
-        "student_info": {
-            'name': '',
-            'roll_no': '',
-            'batch_no': '',
-            'center': '',
-            'course': '',
-            'eval_date': ''
-        },
-        "start_time": None,
-        "end_time": None,
-        "visual_feedback": [],
-        "last_frame_time": 0,
-        "last_activity_time": None,
-        "current_context": "",
-        "last_speech_time": None,
-        "speech_detected": False,
-        "current_answer": "",
-        "speech_start_time": None,
-        "is_processing_answer": False,
-        "interview_time_used": 0,
-        "visual_feedback_data": [],
-        "waiting_for_answer": False,
-        "report_generated": False
-    }
+    return new_interview_state()
 
-def get_interview_data(user_id):
-    """Get interview data from database"""
+def _request_states():
+    """Interview states loaded or saved during the current request, keyed by user"""
+    if not hasattr(g, '_interview_states'):
+        g._interview_states = {}
+    return g._interview_states
+
+def _load_interview_data(user_id):
+    """Return ``(data, version)``; the version is None when nothing was stored"""
     try:
-        data = db_get_interview_data(user_id)
+        data, version = interview_state_cache.get_versioned(user_id)
         if data:
-            return data
-        return init_interview_data()
+            return data, version
+        return init_interview_data(), None
     except Exception as e:
         logging.error(f"Error getting interview data: {str(e)}")
-        return init_interview_data()
+        return init_interview_data(), None
+
+def get_interview_data(user_id):
+    """Get interview data, loaded at most once per request from the state cache"""
+    if not has_request_context():
+        return _load_interview_data(user_id)[0]
+    states = _request_states()
+    if user_id not in states:
+        data, version = _load_interview_data(user_id)
+        states[user_id] = {
+            'data': data,
+            'loaded': encode_state(data),
+            'version': version,
+            'saves': 0,
+            'durable': False
+        }
+    return states[user_id]['data']
+
+def save_interview_data(user_id, data, durable=True):
+    """Save interview data; ``durable=False`` keeps transient changes in memory only.
 
-def save_interview_data(user_id, data):
-    """Save interview data to database"""
+    Inside a request the save is recorded and written once by ``flush_interview_data``
+    when the request ends, however many times it is called. The write is checked
+    against the version loaded at the start of the request, so a concurrent request's
+    save is merged with this one rather than overwritten.
+    """
+    if not has_request_context():
+        _persist_interview_data(user_id, data, durable)
+        return
+    state = _request_states().setdefault(user_id, {'loaded': None, 'version': None, 'saves': 0, 'durable': False})
+    state['data'] = data
+    state['saves'] += 1
+    state['durable'] = state['durable'] or durable
+    with _stats_lock:
+        unit_of_work_stats['saves_requested'] += 1
+
+def _persist_interview_data(user_id, data, durable, base=None, base_version=None):
     try:
-        db_save_interview_data(user_id, data)
+        interview_state_cache.put(user_id, data, durable=durable, base=base, base_version=base_version)
     except Exception as e:
         logging.error(f"Error saving interview data: {str(e)}")
 
+def flush_interview_data(exception=None):
+    """Write the interview states saved during this request. Registered as a teardown_request handler."""
+    states = g.pop('_interview_states', None)
+    if not states:
+        return
+    flushed = avoided = 0
+    for user_id, state in states.items():
+        if not state['saves']:
+            continue
+        if encode_state(state['data']) == state['loaded']:
+            # Saved but unchanged since it was loaded
+            avoided += state['saves']
+            continue
+        base = decode_state(state['loaded']) if state['loaded'] is not None else None
+        _persist_interview_data(user_id, state['data'], state['durable'], base, state['version'])
+        flushed += 1
+        avoided += state['saves'] - 1
+    with _stats_lock:
+        unit_of_work_stats['saves_flushed'] += flushed
+        unit_of_work_stats['saves_avoided'] += avoided
+
+def get_unit_of_work_stats():
+    """Get request-scoped save statistics"""
+    with _stats_lock:
+        return dict(unit_of_work_stats)
+
 def clear_interview_data(user_id):
-    """Clear interview data from database"""
+    """Clear interview data from the state cache and database"""
     try:
+        if has_request_context():
+            _request_states().pop(user_id, None)
+        interview_state_cache.invalidate(user_id)
+        get_interview_event_log().forget(user_id)
         db_clear_interview_data(user_id)
+        publish(INTERVIEW_STATE_CHANNEL, user_id)
     except Exception as e:
-        logging.error(f"Error clearing interview data: {str(e)}") 
\ No newline at end of file
+        logging.error(f"Error clearing interview data: {str(e)}")
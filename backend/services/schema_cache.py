@@ -0,0 +1,176 @@
+import json
+import logging
+import os
+import threading
+import time
+from backend.services.connection_pool import pooled_connection
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Tables whose optional columns the routes adapt to
+CACHED_TABLES = ('interview', 'interview_rating', 'visual_feedback', 'student_performance_report')
+
+class SchemaCache:
+    """TTL cache of the column sets of the interview tables.
+
+    All tables are loaded with one information_schema query. Concurrent
+    callers share a single refresh; once the TTL expires the stale column
+    sets keep being served while one background thread reloads them. Loads
+    are also written to a snapshot file so that workers starting together
+    reuse one probe instead of each issuing their own.
+    """
+
+    def __init__(self, ttl=None, snapshot_path=None, failure_ttl=30):
+        self.ttl = ttl if ttl is not None else Config.SCHEMA_CACHE_TTL
+        self.snapshot_path = snapshot_path if snapshot_path is not None else Config.SCHEMA_CACHE_SNAPSHOT_PATH
+        self.failure_ttl = failure_ttl
+        self.columns = None
+        self.loaded_at = 0.0
+        self.expires_at = 0.0
+        self.lock = threading.Lock()
+        self._refreshing = False
+        self.probes = 0
+
+    def get_columns(self, table):
+        """Return the lower-cased column names of ``table`` (empty if unknown)"""
+        columns = self._current()
+        return columns.get(table.lower(), frozenset()) if columns else frozenset()
+
+    def has_column(self, table, column):
+        return column.lower() in self.get_columns(table)
+
+    def select_columns(self, table, wanted):
+        """Filter ``wanted`` down to the columns that exist, keeping its order.
+
+        Columns are assumed present while the schema is unknown, so a failed
+        probe degrades to the full migrated schema rather than to nothing.
+        """
+        columns = self.get_columns(table)
+        if not columns:
+            return list(wanted)
+        return [column for column in wanted if column.lower() in columns]
+
+    def invalidate(self):
+        """Force the next lookup to reload the column sets"""
+        with self.lock:
+            self.expires_at = 0.0
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            try:
+                os.remove(self.snapshot_path)
+            except OSError:
+                pass
+
+    def _current(self):
+        now = time.time()
+        if self.columns is not None and now < self.expires_at:
+            return self.columns
+
+        if self.columns is None:
+            # Nothing to serve yet: the first caller loads, the others wait for it
+            with self.lock:
+                if self.columns is None or time.time() >= self.expires_at:
+                    self._refresh()
+            return self.columns
+
+        # Stale: keep serving it and let a single background thread reload
+        with self.lock:
+            if self._refreshing or time.time() < self.expires_at:
+                return self.columns
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+        return self.columns
+
+    def _background_refresh(self):
+        try:
+            with self.lock:
+                self._refresh()
+        finally:
+            self._refreshing = False
+
+    def _refresh(self):
+        """Load the column sets. Must be called with ``self.lock`` held."""
+        columns = self._load_snapshot()
+        if columns is None:
+            try:
+                columns = self._probe()
+                self._save_snapshot(columns)
+            except Exception as e:
+                logger.error(f"Error loading table columns from information_schema: {e}")
+                # Keep serving what we had and retry after a short back-off
+                if self.columns is None:
+                    self.columns = {}
+                self.expires_at = time.time() + self.failure_ttl
+                return
+        self.columns = columns
+        self.loaded_at = time.time()
+        self.expires_at = self.loaded_at + self.ttl
+
+    def _probe(self):
+        self.probes += 1
+        placeholders = ", ".join(["%s"] * len(CACHED_TABLES))
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute(f"""
+                SELECT LOWER(table_name), LOWER(column_name)
+                FROM information_schema.columns
+                WHERE table_schema = CURRENT_SCHEMA()
+                  AND LOWER(table_name) IN ({placeholders})
+            """, CACHED_TABLES)
+            rows = cs.fetchall()
+            cs.close()
+        columns = {}
+        for table_name, column_name in rows:
+            columns.setdefault(table_name, set()).add(column_name)
+        logger.info(f"Loaded column sets for {len(columns)} tables")
+        return {table: frozenset(names) for table, names in columns.items()}
+
+    def _load_snapshot(self):
+        """Reuse a snapshot written by another worker within the TTL"""
+        if not self.snapshot_path:
+            return None
+        try:
+            if time.time() - os.path.getmtime(self.snapshot_path) >= self.ttl:
+                return None
+            with open(self.snapshot_path, 'r', encoding='utf-8') as snapshot:
+                data = json.load(snapshot)
+            return {table: frozenset(names) for table, names in data.items()}
+        except (OSError, ValueError):
+            return None
+
+    def _save_snapshot(self, columns):
+        if not self.snapshot_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_path)), exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as snapshot:
+                json.dump({table: sorted(names) for table, names in columns.items()}, snapshot)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Could not write schema snapshot {self.snapshot_path}: {e}")
+
+    def get_stats(self):
+        """Get schema cache statistics"""
+        return {
+            'tables': sorted(self.columns) if self.columns else [],
+            'probes': self.probes,
+            'age_seconds': round(time.time() - self.loaded_at, 1) if self.loaded_at else None
+        }
+
+# Global schema cache instance
+_schema_cache = None
+_cache_lock = threading.Lock()
+
+def get_schema_cache():
+    """Get the global schema cache"""
+    global _schema_cache
+    if _schema_cache is None:
+        with _cache_lock:
+            if _schema_cache is None:
+                _schema_cache = SchemaCache()
+    return _schema_cache
+
+def table_columns(table, wanted):
+    """Columns from ``wanted`` that exist on ``table``, in the given order"""
+    return get_schema_cache().select_columns(table, wanted)
@@ -0,0 +1,209 @@
+import logging
+import threading
+from backend.services.connection_pool import pooled_connection
+from backend.services.schema_cache import get_schema_cache
+
+logger = logging.getLogger(__name__)
+
+# Ordered list of (version, description, statements). Append new entries with the
+# next version number; never edit a migration once it has shipped.
+MIGRATIONS = [
+    (1, "Create application tables", [
+        """
+        CREATE TABLE IF NOT EXISTS REGISTER (
+            STUDENT_ID STRING PRIMARY KEY,
+            NAME STRING,
+            COURSE_NAME STRING,
+            EMAIL_ID STRING,
+            MOBILE_NO STRING,
+            CENTER STRING,
+            BATCH_NO STRING,
+            PASSWORD STRING,
+            CREATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS job_descriptions (
+            jd_id INTEGER AUTOINCREMENT PRIMARY KEY,
+            jd_text TEXT,
+            admin_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS interview (
+            student_name TEXT,
+            roll_no TEXT,
+            email_id TEXT,
+            batch_no TEXT,
+            center TEXT,
+            course TEXT,
+            evaluation_date TEXT,
+            difficulty_level TEXT,
+            language TEXT,
+            interview_ts TIMESTAMP,
+            jd_id TEXT,
+            status TEXT
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS interview_rating(
+            roll_no TEXT,
+            technical_rating FLOAT,
+            communication_rating FLOAT,
+            problem_solving_rating FLOAT,
+            time_management_rating FLOAT,
+            total_rating FLOAT,
+            interview_ts TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS visual_feedback (
+            roll_no TEXT,
+            professional_appearance TEXT,
+            body_language TEXT,
+            environment TEXT,
+            distractions TEXT,
+            interview_ts TIMESTAMP,
+            feedback_timestamp TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS student_performance_report (
+            id INTEGER AUTOINCREMENT PRIMARY KEY,
+            student_name TEXT,
+            roll_no TEXT,
+            batch_no TEXT,
+            center TEXT,
+            course TEXT,
+            evaluation_date TEXT,
+            difficulty_level TEXT,
+            interview_ts TIMESTAMP,
+            report TEXT
+        );
+        """,
+    ]),
+    # Older deployments created the interview table without a language column
+    (2, "Add interview.language", [
+        "ALTER TABLE interview ADD COLUMN IF NOT EXISTS language TEXT",
+    ]),
+    # Surrogate key so interviews are found by point lookup instead of timestamp matching
+    (3, "Add and backfill interview.interview_id", [
+        "ALTER TABLE interview ADD COLUMN IF NOT EXISTS interview_id STRING",
+        "UPDATE interview SET interview_id = UUID_STRING() WHERE interview_id IS NULL",
+    ]),
+    (4, "Add interview.questions", [
+        "ALTER TABLE interview ADD COLUMN IF NOT EXISTS questions TEXT",
+    ]),
+    (5, "Create question bank tables", [
+        """
+        CREATE TABLE IF NOT EXISTS question_bank (
+            bank_key STRING,
+            question TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS question_bank_usage (
+            bank_key STRING,
+            roll_no STRING,
+            question TEXT,
+            used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+    ]),
+    # Session tables for the Snowflake session store, and the interview state event log
+    (6, "Create session and interview event tables", [
+        """
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            session_id STRING PRIMARY KEY,
+            user_id STRING,
+            session_data TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP,
+            last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS interview_data (
+            user_id STRING,
+            session_id STRING,
+            interview_data TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP,
+            PRIMARY KEY (user_id, session_id)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS interview_events (
+            user_id STRING,
+            seq INTEGER,
+            event_type STRING,
+            payload TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP,
+            PRIMARY KEY (user_id, seq)
+        );
+        """,
+    ]),
+    # Compare-and-swap version for interview state saves
+    (7, "Add interview_data.version", [
+        "ALTER TABLE interview_data ADD COLUMN IF NOT EXISTS version INTEGER DEFAULT 0",
+    ]),
+    # Question bank rows belong to a generated set and keep their position in it
+    (8, "Add question bank set ids and positions", [
+        "ALTER TABLE question_bank ADD COLUMN IF NOT EXISTS set_id STRING",
+        "ALTER TABLE question_bank ADD COLUMN IF NOT EXISTS position INTEGER",
+        "ALTER TABLE question_bank_usage ADD COLUMN IF NOT EXISTS set_id STRING",
+    ]),
+]
+
+_migration_lock = threading.Lock()
+_schema_version = None
+
+def get_schema_version():
+    """Return the schema version applied at startup, or None if migrations have not run"""
+    return _schema_version
+
+def apply_migrations():
+    """Bring the database schema up to date. Called once at startup."""
+    global _schema_version
+    with _migration_lock:
+        try:
+            with pooled_connection() as conn:
+                cs = conn.cursor()
+                cs.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_migrations (
+                        version INTEGER PRIMARY KEY,
+                        description TEXT,
+                        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                cs.execute("SELECT MAX(version) FROM schema_migrations")
+                row = cs.fetchone()
+                current_version = row[0] if row and row[0] is not None else 0
+                starting_version = current_version
+
+                for version, description, statements in MIGRATIONS:
+                    if version <= current_version:
+                        continue
+                    logger.info(f"Applying schema migration {version}: {description}")
+                    for statement in statements:
+                        cs.execute(statement)
+                    cs.execute(
+                        "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                        (version, description)
+                    )
+                    conn.commit()
+                    current_version = version
+
+                cs.close()
+            if current_version != starting_version:
+                # Columns may have changed; drop cached column sets and snapshots
+                get_schema_cache().invalidate()
+            _schema_version = current_version
+            logger.info(f"Database schema at version {current_version}")
+        except Exception as e:
+            logger.error(f"Error applying schema migrations: {e}")
+    return _schema_version
@@ -1,278 +1,237 @@
+import atexit
 import json
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
 from flask import current_app
-from backend.services.connection_pool import get_pooled_connection, return_pooled_connection
+from backend.services.session_store import get_session_store, EXPIRING_TABLES
 from backend.utils.json_encoder import CustomJSONEncoder
+from backend.services.interview_state import encode_state, decode_state
+from backend.utils.compression import compress_text, decompress_text
+from config import Config
 
 logger = logging.getLogger(__name__)
 
+class SessionTouchBuffer:
+    """Coalesces last_accessed updates for user_sessions.
+
+    Touches are recorded in memory and written by a background thread as one
+    ``UPDATE ... WHERE session_id IN (...)`` per flush. A session is written at
+    most once per ``granularity`` seconds; touches inside that window are
+    counted as coalesced.
+    """
+
+    def __init__(self, granularity=None, flush_interval=None, max_batch=500):
+        self.granularity = granularity if granularity is not None else Config.SESSION_TOUCH_GRANULARITY
+        self.flush_interval = flush_interval if flush_interval is not None else Config.SESSION_TOUCH_FLUSH_INTERVAL
+        self.max_batch = max_batch
+        self.pending = set()
+        self.last_written = {}
+        self.lock = threading.Lock()
+        self._flusher = None
+        self._closed = threading.Event()
+
+        # Telemetry
+        self.touches_recorded = 0
+        self.touches_coalesced = 0
+        self.flushes = 0
+        self.sessions_written = 0
+
+    def record(self, session_id):
+        """Note that a session was accessed; the database write is deferred"""
+        now = time.time()
+        with self.lock:
+            self.touches_recorded += 1
+            if session_id in self.pending or now - self.last_written.get(session_id, 0) < self.granularity:
+                self.touches_coalesced += 1
+                return
+            self.pending.add(session_id)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True, name="session-touch-flusher")
+                self._flusher.start()
+
+    def discard(self, session_id):
+        """Forget a session that has been deleted"""
+        with self.lock:
+            self.pending.discard(session_id)
+            self.last_written.pop(session_id, None)
+
+    def mark_written(self, session_id):
+        """Note that last_accessed was just written along with the session payload"""
+        with self.lock:
+            self.pending.discard(session_id)
+            self.last_written[session_id] = time.time()
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write pending touches in batched UPDATEs"""
+        with self.lock:
+            session_ids = list(self.pending)
+            self.pending.clear()
+            now = time.time()
+            # Forget sessions whose window has passed so the map stays bounded
+            self.last_written = {
+                sid: ts for sid, ts in self.last_written.items() if now - ts < self.granularity
+            }
+        for start in range(0, len(session_ids), self.max_batch):
+            batch = session_ids[start:start + self.max_batch]
+            try:
+                get_session_store().touch_sessions(batch, self.granularity)
+            except Exception as e:
+                logger.error(f"Error updating session access: {e}")
+                continue
+            written_at = time.time()
+            with self.lock:
+                self.flushes += 1
+                self.sessions_written += len(batch)
+                for session_id in batch:
+                    self.last_written[session_id] = written_at
+
+    def get_stats(self):
+        """Get session touch statistics"""
+        with self.lock:
+            return {
+                'touches_recorded': self.touches_recorded,
+                'touches_coalesced': self.touches_coalesced,
+                'pending': len(self.pending),
+                'flushes': self.flushes,
+                'sessions_written': self.sessions_written
+            }
+
+    def shutdown(self):
+        self._closed.set()
+        self.flush()
+
+session_touch_buffer = SessionTouchBuffer()
+atexit.register(session_touch_buffer.shutdown)
+
 def init_session_tables():
     """Initialize session and interview data tables"""
-    conn = None
     try:
-        conn = get_pooled_connection()
-        cs = conn.cursor()
-        
-        # Create sessions table
-        cs.execute("""
-            CREATE TABLE IF NOT EXISTS user_sessions (
-                session_id STRING PRIMARY KEY,
-                user_id STRING,
-                session_data TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP,
-                last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-        
-        # Create interview_data table for concurrent interviews
-        cs.execute("""
-            CREATE TABLE IF NOT EXISTS interview_data (
-                user_id STRING,
-                session_id STRING,
-                interview_data TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP,
-                PRIMARY KEY (user_id, session_id)
-            );
-        """)
-        
-        conn.commit()
-        cs.close()
+        get_session_store().init_tables()
         logger.info("Session tables initialized successfully")
     except Exception as e:
         logger.error(f"Error initializing session tables: {e}")
-    finally:
-        if conn:
-            return_pooled_connection(conn)
+
+def serialize_session(session_data):
+    """Serialize session data deterministically, so equal sessions give equal payloads"""
+    return json.dumps(session_data, cls=CustomJSONEncoder, sort_keys=True)
 
 def create_session(user_id, session_data, expires_in=4600):
     """Create a new session for a user"""
-    conn = None
     try:
         session_id = f"{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
         expires_at = datetime.now() + timedelta(seconds=expires_in)
         
-        conn = get_pooled_connection()
-        cs = conn.cursor()
-        
-        cs.execute("""
-            INSERT INTO user_sessions (session_id, user_id, session_data, expires_at)
-            VALUES (%s, %s, %s, %s)
-        """, (session_id, user_id, json.dumps(session_data, cls=CustomJSONEncoder), expires_at))
-        
-        conn.commit()
-        cs.close()
-        
+        get_session_store().create_session(
+            session_id, user_id, serialize_session(session_data), expires_at
+        )
         return session_id
     except Exception as e:
         logger.error(f"Error creating session: {e}")
         return None
-    finally:
-        if conn:
-            return_pooled_connection(conn)
+
+def save_session(session_id, user_id, payload, expires_in=4600):
+    """Upsert an already-serialized session payload. Returns True on success."""
+    try:
+        expires_at = datetime.now() + timedelta(seconds=expires_in)
+        get_session_store().save_session(session_id, user_id, payload, expires_at)
+        session_touch_buffer.mark_written(session_id)
+        return True
+    except Exception as e:
+        logger.error(f"Error saving session: {e}")
+        return False
 
 def get_session(session_id):
     """Get session data by session ID"""
-    conn = None
     try:
-        conn = get_pooled_connection()
-        cs = conn.cursor()
-        
-        cs.execute("""
-            SELECT session_data, expires_at 
-            FROM user_sessions 
-            WHERE session_id = %s AND expires_at > CURRENT_TIMESTAMP
-        """, (session_id,))
-        
-        row = cs.fetchone()
-        cs.close()
-        
-        if row:
+        session_data = get_session_store().get_session(session_id)
+        if session_data:
             # Update last accessed time
             update_session_access(session_id)
-            return json.loads(row[0])
+            return json.loads(session_data)
         return None
     except Exception as e:
         logger.error(f"Error getting session: {e}")
         return None
-    finally:
-        if conn:
-            return_pooled_connection(conn)
 
 def update_session_access(session_id):
-    """Update last accessed time for session"""
-    conn = None
-    try:
-        conn = get_pooled_connection()
-        cs = conn.cursor()
-        
-        cs.execute("""
-            UPDATE user_sessions 
-            SET last_accessed = CURRENT_TIMESTAMP 
-            WHERE session_id = %s
-        """, (session_id,))
-        
-        conn.commit()
-        cs.close()
-    except Exception as e:
-        logger.error(f"Error updating session access: {e}")
-    finally:
-        if conn:
-            return_pooled_connection(conn)
+    """Record an access; last_accessed is written in coalesced batches"""
+    session_touch_buffer.record(session_id)
 
 def delete_session(session_id):
     """Delete a session"""
-    conn = None
     try:
-        conn = get_pooled_connection()
-        cs = conn.cursor()
-        
-        cs.execute("DELETE FROM user_sessions WHERE session_id = %s", (session_id,))
-        
-        conn.commit()
-        cs.close()
+        session_touch_buffer.discard(session_id)
+        get_session_store().delete_session(session_id)
     except Exception as e:
         logger.error(f"Error deleting session: {e}")
-    finally:
-        if conn:
-            return_pooled_connection(conn)
 
-def cleanup_expired_sessions():
-    """Clean up expired sessions"""
-    conn = None
-    try:
-        conn = get_pooled_connection()
-        cs = conn.cursor()
-        
-        cs.execute("DELETE FROM user_sessions WHERE expires_at <= CURRENT_TIMESTAMP")
-        cs.execute("DELETE FROM interview_data WHERE expires_at <= CURRENT_TIMESTAMP")
-        
-        conn.commit()
-        cs.close()
-        logger.info("Expired sessions cleaned up")
-    except Exception as e:
-        logger.error(f"Error cleaning up expired sessions: {e}")
-    finally:
-        if conn:
-            return_pooled_connection(conn)
+def cleanup_expired_sessions(chunk_size=None):
+    """Delete expired sessions and interview data in bounded chunks.
+
+    Each chunk is its own short statement, so the connection goes back to
+    the pool between chunks. Returns the number of rows deleted per table.
+    """
+    chunk_size = chunk_size or Config.SESSION_CLEANUP_CHUNK_SIZE
+    store = get_session_store()
+    deleted = {}
+    for table in EXPIRING_TABLES:
+        deleted[table] = 0
+        try:
+            while True:
+                count = store.delete_expired(table, chunk_size)
+                deleted[table] += count
+                if count < chunk_size:
+                    break
+        except Exception as e:
+            logger.error(f"Error cleaning up expired rows in {table}: {e}")
+    if any(deleted.values()):
+        logger.info(f"Expired sessions cleaned up: {deleted}")
+    return deleted
 
 def get_interview_data(user_id, session_id=None):
     """Get interview data for a user"""
-    conn = None
     try:
-        conn = get_pooled_connection()
-        cs = conn.cursor()
-        
-        if session_id:
-            cs.execute("""
-                SELECT interview_data 
-                FROM interview_data 
-                WHERE user_id = %s AND session_id = %s AND expires_at > CURRENT_TIMESTAMP
-            """, (user_id, session_id))
-        else:
-            cs.execute("""
-                SELECT interview_data 
-                FROM interview_data 
-                WHERE user_id = %s AND expires_at > CURRENT_TIMESTAMP
-                ORDER BY updated_at DESC
-                LIMIT 1
-            """, (user_id,))
-        
-        row = cs.fetchone()
-        cs.close()
-        
-        if row:
-            return json.loads(row[0])
+        interview_data = get_session_store().get_interview_data(user_id, session_id)
+        if interview_data:
+            return decode_state(decompress_text(interview_data))
         return None
     except Exception as e:
         logger.error(f"Error getting interview data: {e}")
         return None
-    finally:
-        if conn:
-            return_pooled_connection(conn)
 
 def save_interview_data(user_id, interview_data, session_id=None, expires_in=4600):
     """Save interview data for a user"""
-    conn = None
     try:
         if not session_id:
             session_id = f"{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
         
         expires_at = datetime.now() + timedelta(seconds=expires_in)
         
-        conn = get_pooled_connection()
-        cs = conn.cursor()
-        
-        # Use MERGE for upsert operation
-        cs.execute("""
-            MERGE INTO interview_data AS target
-            USING (SELECT %s as user_id, %s as session_id) AS source
-            ON target.user_id = source.user_id AND target.session_id = source.session_id
-            WHEN MATCHED THEN
-                UPDATE SET 
-                    interview_data = %s,
-                    updated_at = CURRENT_TIMESTAMP,
-                    expires_at = %s
-            WHEN NOT MATCHED THEN
-                INSERT (user_id, session_id, interview_data, expires_at)
-                VALUES (%s, %s, %s, %s)
-        """, (user_id, session_id, json.dumps(interview_data, cls=CustomJSONEncoder), 
-              expires_at, user_id, session_id, json.dumps(interview_data, cls=CustomJSONEncoder), expires_at))
-        
-        conn.commit()
-        cs.close()
-        
+        get_session_store().save_interview_data(
+            user_id, session_id, compress_text(encode_state(interview_data).decode('utf-8')), expires_at
+        )
         return session_id
     except Exception as e:
         logger.error(f"Error saving interview data: {e}")
         return None
-    finally:
-        if conn:
-            return_pooled_connection(conn)
 
 def clear_interview_data(user_id, session_id=None):
     """Clear interview data for a user"""
-    conn = None
     try:
-        conn = get_pooled_connection()
-        cs = conn.cursor()
-        
-        if session_id:
-            cs.execute("DELETE FROM interview_data WHERE user_id = %s AND session_id = %s", (user_id, session_id))
-        else:
-            cs.execute("DELETE FROM interview_data WHERE user_id = %s", (user_id,))
-        
-        conn.commit()
-        cs.close()
+        get_session_store().clear_interview_data(user_id, session_id)
     except Exception as e:
         logger.error(f"Error clearing interview data: {e}")
-    finally:
-        if conn:
-            return_pooled_connection(conn)
 
 def get_active_interviews():
     """Get count of active interviews"""
-    conn = None
     try:
-        conn = get_pooled_connection()
-        cs = conn.cursor()
-        
-        cs.execute("""
-            SELECT COUNT(DISTINCT user_id) 
-            FROM interview_data 
-            WHERE expires_at > CURRENT_TIMESTAMP
-        """)
-        
-        row = cs.fetchone()
-        cs.close()
-        
-        return row[0] if row else 0
+        return get_session_store().count_active_interviews()
     except Exception as e:
         logger.error(f"Error getting active interviews count: {e}")
         return 0
-    finally:
-        if conn:
-            return_pooled_connection(conn)
@@ -0,0 +1,597 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from config import Config
+from backend.services.connection_pool import pooled_connection
+
+logger = logging.getLogger(__name__)
+
+# Tables with an expires_at column that the cleanup job prunes, and their keys
+EXPIRING_TABLES = {
+    'user_sessions': ('session_id',),
+    'interview_data': ('user_id', 'session_id'),
+    'interview_events': ('user_id', 'seq'),
+}
+
+class SessionStore:
+    """Storage backend for the user_sessions and interview_data tables.
+
+    Payloads are passed in and out as already-serialized JSON strings;
+    serialization and error handling stay in session_service.
+    """
+
+    name = "base"
+
+    def init_tables(self):
+        raise NotImplementedError
+
+    def create_session(self, session_id, user_id, session_data, expires_at):
+        raise NotImplementedError
+
+    def save_session(self, session_id, user_id, session_data, expires_at):
+        """Insert or replace a session's payload in a single statement"""
+        raise NotImplementedError
+
+    def get_session(self, session_id):
+        """Return the serialized session data, or None if missing or expired"""
+        raise NotImplementedError
+
+    def touch_sessions(self, session_ids, granularity=0):
+        """Set last_accessed to now for sessions whose stored value is at least ``granularity`` seconds old"""
+        raise NotImplementedError
+
+    def delete_session(self, session_id):
+        raise NotImplementedError
+
+    def delete_expired(self, table, limit):
+        """Delete at most ``limit`` expired rows from ``table`` (one of ``EXPIRING_TABLES``); return the count"""
+        raise NotImplementedError
+
+    def get_interview_data(self, user_id, session_id=None):
+        """Return the serialized interview data, or None if missing or expired"""
+        raise NotImplementedError
+
+    def save_interview_data(self, user_id, session_id, interview_data, expires_at):
+        raise NotImplementedError
+
+    def get_interview_data_version(self, user_id, session_id):
+        """Return ``(interview_data, version)`` for one row, or None if there is no row.
+
+        The version is returned even for expired rows (with ``interview_data`` None),
+        so the next compare-and-swap continues from it.
+        """
+        raise NotImplementedError
+
+    def compare_and_swap_interview_data(self, user_id, session_id, interview_data, expected_version,
+                                        new_version, expires_at):
+        """Write a row only if its version is still ``expected_version``, and set it to ``new_version``.
+
+        ``expected_version=0`` also matches a missing row, which is then inserted;
+        ``interview_data=None`` keeps the stored payload. Returns True if the row was written.
+        """
+        raise NotImplementedError
+
+    def clear_interview_data(self, user_id, session_id=None):
+        raise NotImplementedError
+
+    def append_interview_events(self, user_id, session_id, events, expected_version, expires_at):
+        """Insert ``(seq, event_type, payload)`` events and claim their sequence numbers, atomically.
+
+        In one transaction, moves the ``session_id`` row's version from
+        ``expected_version`` to the last event's seq and inserts the events.
+        Returns False (writing nothing) if the version has moved on; if the
+        insert fails the version bump is rolled back and the error is raised.
+        """
+        raise NotImplementedError
+
+    def get_interview_events(self, user_id, after_seq=0):
+        """Return the user's ``(seq, event_type, payload)`` events after ``after_seq``, oldest first"""
+        raise NotImplementedError
+
+    def delete_interview_events(self, user_id, through_seq=None):
+        """Delete the user's events up to ``through_seq`` (all of them if None)"""
+        raise NotImplementedError
+
+    def count_active_interviews(self):
+        raise NotImplementedError
+
+class SnowflakeSessionStore(SessionStore):
+    """Session tables in Snowflake, accessed through the shared connection pool"""
+
+    name = "snowflake"
+
+    def init_tables(self):
+        """Nothing to do: the tables are created by schema migrations 6 and 7 (``schema_service``) at startup"""
+
+    def create_session(self, session_id, user_id, session_data, expires_at):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                INSERT INTO user_sessions (session_id, user_id, session_data, expires_at)
+                VALUES (%s, %s, %s, %s)
+            """, (session_id, user_id, session_data, expires_at))
+            conn.commit()
+            cs.close()
+
+    def save_session(self, session_id, user_id, session_data, expires_at):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                MERGE INTO user_sessions AS target
+                USING (SELECT %s as session_id) AS source
+                ON target.session_id = source.session_id
+                WHEN MATCHED THEN
+                    UPDATE SET
+                        user_id = %s,
+                        session_data = %s,
+                        expires_at = %s,
+                        last_accessed = CURRENT_TIMESTAMP
+                WHEN NOT MATCHED THEN
+                    INSERT (session_id, user_id, session_data, expires_at)
+                    VALUES (%s, %s, %s, %s)
+            """, (session_id, user_id, session_data, expires_at,
+                  session_id, user_id, session_data, expires_at))
+            conn.commit()
+            cs.close()
+
+    def get_session(self, session_id):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                SELECT session_data, expires_at
+                FROM user_sessions
+                WHERE session_id = %s AND expires_at > CURRENT_TIMESTAMP
+            """, (session_id,))
+            row = cs.fetchone()
+            cs.close()
+        return row[0] if row else None
+
+    def touch_sessions(self, session_ids, granularity=0):
+        session_ids = list(session_ids)
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute(f"""
+                UPDATE user_sessions
+                SET last_accessed = CURRENT_TIMESTAMP
+                WHERE session_id IN ({', '.join(['%s'] * len(session_ids))})
+                  AND (last_accessed IS NULL OR last_accessed < DATEADD(second, -%s, CURRENT_TIMESTAMP))
+            """, session_ids + [granularity])
+            conn.commit()
+            cs.close()
+
+    def delete_session(self, session_id):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("DELETE FROM user_sessions WHERE session_id = %s", (session_id,))
+            conn.commit()
+            cs.close()
+
+    def delete_expired(self, table, limit):
+        keys = EXPIRING_TABLES[table]
+        join = " AND ".join(f"{table}.{key} = expired.{key}" for key in keys)
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            # Snowflake has no DELETE ... LIMIT, so pick the chunk's keys in a subquery
+            cs.execute(f"""
+                DELETE FROM {table}
+                USING (
+                    SELECT {', '.join(keys)} FROM {table}
+                    WHERE expires_at <= CURRENT_TIMESTAMP
+                    LIMIT %s
+                ) AS expired
+                WHERE {join}
+            """, (limit,))
+            deleted = cs.rowcount or 0
+            conn.commit()
+            cs.close()
+        return deleted
+
+    def get_interview_data(self, user_id, session_id=None):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            if session_id:
+                cs.execute("""
+                    SELECT interview_data
+                    FROM interview_data
+                    WHERE user_id = %s AND session_id = %s AND expires_at > CURRENT_TIMESTAMP
+                """, (user_id, session_id))
+            else:
+                cs.execute("""
+                    SELECT interview_data
+                    FROM interview_data
+                    WHERE user_id = %s AND expires_at > CURRENT_TIMESTAMP
+                    ORDER BY updated_at DESC
+                    LIMIT 1
+                """, (user_id,))
+            row = cs.fetchone()
+            cs.close()
+        return row[0] if row else None
+
+    def save_interview_data(self, user_id, session_id, interview_data, expires_at):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            # Use MERGE for upsert operation
+            cs.execute("""
+                MERGE INTO interview_data AS target
+                USING (SELECT %s as user_id, %s as session_id) AS source
+                ON target.user_id = source.user_id AND target.session_id = source.session_id
+                WHEN MATCHED THEN
+                    UPDATE SET
+                        interview_data = %s,
+                        updated_at = CURRENT_TIMESTAMP,
+                        expires_at = %s
+                WHEN NOT MATCHED THEN
+                    INSERT (user_id, session_id, interview_data, expires_at)
+                    VALUES (%s, %s, %s, %s)
+            """, (user_id, session_id, interview_data, expires_at,
+                  user_id, session_id, interview_data, expires_at))
+            conn.commit()
+            cs.close()
+
+    def get_interview_data_version(self, user_id, session_id):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                SELECT IFF(expires_at > CURRENT_TIMESTAMP, interview_data, NULL), COALESCE(version, 0)
+                FROM interview_data
+                WHERE user_id = %s AND session_id = %s
+            """, (user_id, session_id))
+            row = cs.fetchone()
+            cs.close()
+        return (row[0], row[1]) if row else None
+
+    def compare_and_swap_interview_data(self, user_id, session_id, interview_data, expected_version,
+                                        new_version, expires_at):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                MERGE INTO interview_data AS target
+                USING (SELECT %s as user_id, %s as session_id) AS source
+                ON target.user_id = source.user_id AND target.session_id = source.session_id
+                WHEN MATCHED AND COALESCE(target.version, 0) = %s THEN
+                    UPDATE SET
+                        interview_data = COALESCE(%s, target.interview_data),
+                        version = %s,
+                        updated_at = CURRENT_TIMESTAMP,
+                        expires_at = %s
+                WHEN NOT MATCHED AND %s = 0 AND %s IS NOT NULL THEN
+                    INSERT (user_id, session_id, interview_data, version, expires_at)
+                    VALUES (%s, %s, %s, %s, %s)
+            """, (user_id, session_id, expected_version, interview_data, new_version, expires_at,
+                  expected_version, interview_data,
+                  user_id, session_id, interview_data, new_version, expires_at))
+            written = cs.rowcount or 0
+            conn.commit()
+            cs.close()
+        return written > 0
+
+    def clear_interview_data(self, user_id, session_id=None):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            if session_id:
+                cs.execute("DELETE FROM interview_data WHERE user_id = %s AND session_id = %s", (user_id, session_id))
+            else:
+                cs.execute("DELETE FROM interview_data WHERE user_id = %s", (user_id,))
+                cs.execute("DELETE FROM interview_events WHERE user_id = %s", (user_id,))
+            conn.commit()
+            cs.close()
+
+    def append_interview_events(self, user_id, session_id, events, expected_version, expires_at):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            try:
+                cs.execute("BEGIN")
+                cs.execute("""
+                    UPDATE interview_data
+                    SET version = %s, updated_at = CURRENT_TIMESTAMP, expires_at = %s
+                    WHERE user_id = %s AND session_id = %s AND COALESCE(version, 0) = %s
+                """, (events[-1][0], expires_at, user_id, session_id, expected_version))
+                if not cs.rowcount:
+                    conn.rollback()
+                    return False
+                cs.execute(f"""
+                    INSERT INTO interview_events (user_id, seq, event_type, payload, expires_at)
+                    VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(events))}
+                """, [value for seq, event_type, payload in events
+                      for value in (user_id, seq, event_type, payload, expires_at)])
+                conn.commit()
+                return True
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cs.close()
+
+    def get_interview_events(self, user_id, after_seq=0):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                SELECT seq, event_type, payload
+                FROM interview_events
+                WHERE user_id = %s AND seq > %s AND expires_at > CURRENT_TIMESTAMP
+                ORDER BY seq
+            """, (user_id, after_seq))
+            rows = cs.fetchall()
+            cs.close()
+        return rows
+
+    def delete_interview_events(self, user_id, through_seq=None):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            if through_seq is None:
+                cs.execute("DELETE FROM interview_events WHERE user_id = %s", (user_id,))
+            else:
+                cs.execute("DELETE FROM interview_events WHERE user_id = %s AND seq <= %s", (user_id, through_seq))
+            conn.commit()
+            cs.close()
+
+    def count_active_interviews(self):
+        with pooled_connection() as conn:
+            cs = conn.cursor()
+            cs.execute("""
+                SELECT COUNT(DISTINCT user_id)
+                FROM interview_data
+                WHERE expires_at > CURRENT_TIMESTAMP
+            """)
+            row = cs.fetchone()
+            cs.close()
+        return row[0] if row else 0
+
+class SQLiteSessionStore(SessionStore):
+    """Session tables in a local SQLite file (WAL mode) for on-box, offline-capable session traffic.
+
+    Each thread keeps its own connection; timestamps are stored as Unix epoch seconds.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=None):
+        self.path = path or Config.SESSION_SQLITE_PATH
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    def init_tables(self):
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_sessions (
+                session_id TEXT PRIMARY KEY,
+                user_id TEXT,
+                session_data TEXT,
+                created_at REAL,
+                expires_at REAL,
+                last_accessed REAL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS interview_data (
+                user_id TEXT,
+                session_id TEXT,
+                interview_data TEXT,
+                created_at REAL,
+                updated_at REAL,
+                expires_at REAL,
+                version INTEGER DEFAULT 0,
+                PRIMARY KEY (user_id, session_id)
+            )
+        """)
+        # Files created before compare-and-swap saves
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(interview_data)")]
+        if 'version' not in columns:
+            conn.execute("ALTER TABLE interview_data ADD COLUMN version INTEGER DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_interview_data_user ON interview_data (user_id, updated_at)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS interview_events (
+                user_id TEXT,
+                seq INTEGER,
+                event_type TEXT,
+                payload TEXT,
+                created_at REAL,
+                expires_at REAL,
+                PRIMARY KEY (user_id, seq)
+            )
+        """)
+
+    def create_session(self, session_id, user_id, session_data, expires_at):
+        now = time.time()
+        self._connection().execute("""
+            INSERT INTO user_sessions (session_id, user_id, session_data, created_at, expires_at, last_accessed)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (session_id, user_id, session_data, now, expires_at.timestamp(), now))
+
+    def save_session(self, session_id, user_id, session_data, expires_at):
+        now = time.time()
+        self._connection().execute("""
+            INSERT INTO user_sessions (session_id, user_id, session_data, created_at, expires_at, last_accessed)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (session_id) DO UPDATE SET
+                user_id = excluded.user_id,
+                session_data = excluded.session_data,
+                expires_at = excluded.expires_at,
+                last_accessed = excluded.last_accessed
+        """, (session_id, user_id, session_data, now, expires_at.timestamp(), now))
+
+    def get_session(self, session_id):
+        row = self._connection().execute("""
+            SELECT session_data FROM user_sessions
+            WHERE session_id = ? AND expires_at > ?
+        """, (session_id, time.time())).fetchone()
+        return row[0] if row else None
+
+    def touch_sessions(self, session_ids, granularity=0):
+        session_ids = list(session_ids)
+        now = time.time()
+        self._connection().execute(f"""
+            UPDATE user_sessions SET last_accessed = ?
+            WHERE session_id IN ({', '.join(['?'] * len(session_ids))})
+              AND (last_accessed IS NULL OR last_accessed < ?)
+        """, [now] + session_ids + [now - granularity])
+
+    def delete_session(self, session_id):
+        self._connection().execute("DELETE FROM user_sessions WHERE session_id = ?", (session_id,))
+
+    def delete_expired(self, table, limit):
+        if table not in EXPIRING_TABLES:
+            raise KeyError(table)
+        cursor = self._connection().execute(f"""
+            DELETE FROM {table} WHERE rowid IN (
+                SELECT rowid FROM {table} WHERE expires_at <= ? LIMIT ?
+            )
+        """, (time.time(), limit))
+        return cursor.rowcount
+
+    def get_interview_data(self, user_id, session_id=None):
+        conn = self._connection()
+        if session_id:
+            row = conn.execute("""
+                SELECT interview_data FROM interview_data
+                WHERE user_id = ? AND session_id = ? AND expires_at > ?
+            """, (user_id, session_id, time.time())).fetchone()
+        else:
+            row = conn.execute("""
+                SELECT interview_data FROM interview_data
+                WHERE user_id = ? AND expires_at > ?
+                ORDER BY updated_at DESC
+                LIMIT 1
+            """, (user_id, time.time())).fetchone()
+        return row[0] if row else None
+
+    def save_interview_data(self, user_id, session_id, interview_data, expires_at):
+        now = time.time()
+        self._connection().execute("""
+            INSERT INTO interview_data (user_id, session_id, interview_data, created_at, updated_at, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, session_id) DO UPDATE SET
+                interview_data = excluded.interview_data,
+                updated_at = excluded.updated_at,
+                expires_at = excluded.expires_at
+        """, (user_id, session_id, interview_data, now, now, expires_at.timestamp()))
+
+    def get_interview_data_version(self, user_id, session_id):
+        row = self._connection().execute("""
+            SELECT CASE WHEN expires_at > ? THEN interview_data END, COALESCE(version, 0)
+            FROM interview_data
+            WHERE user_id = ? AND session_id = ?
+        """, (time.time(), user_id, session_id)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def compare_and_swap_interview_data(self, user_id, session_id, interview_data, expected_version,
+                                        new_version, expires_at):
+        now = time.time()
+        if expected_version == 0 and interview_data is not None:
+            cursor = self._connection().execute("""
+                INSERT INTO interview_data
+                    (user_id, session_id, interview_data, version, created_at, updated_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (user_id, session_id) DO UPDATE SET
+                    interview_data = excluded.interview_data,
+                    version = excluded.version,
+                    updated_at = excluded.updated_at,
+                    expires_at = excluded.expires_at
+                WHERE COALESCE(version, 0) = 0
+            """, (user_id, session_id, interview_data, new_version, now, now, expires_at.timestamp()))
+        else:
+            cursor = self._connection().execute("""
+                UPDATE interview_data SET
+                    interview_data = COALESCE(?, interview_data),
+                    version = ?,
+                    updated_at = ?,
+                    expires_at = ?
+                WHERE user_id = ? AND session_id = ? AND COALESCE(version, 0) = ?
+            """, (interview_data, new_version, now, expires_at.timestamp(), user_id, session_id, expected_version))
+        return cursor.rowcount > 0
+
+    def clear_interview_data(self, user_id, session_id=None):
+        conn = self._connection()
+        if session_id:
+            conn.execute("DELETE FROM interview_data WHERE user_id = ? AND session_id = ?", (user_id, session_id))
+        else:
+            conn.execute("DELETE FROM interview_data WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM interview_events WHERE user_id = ?", (user_id,))
+
+    def append_interview_events(self, user_id, session_id, events, expected_version, expires_at):
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute("""
+                UPDATE interview_data SET version = ?, updated_at = ?, expires_at = ?
+                WHERE user_id = ? AND session_id = ? AND COALESCE(version, 0) = ?
+            """, (events[-1][0], now, expires_at.timestamp(), user_id, session_id, expected_version))
+            if not cursor.rowcount:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute(f"""
+                INSERT INTO interview_events (user_id, seq, event_type, payload, created_at, expires_at)
+                VALUES {', '.join(['(?, ?, ?, ?, ?, ?)'] * len(events))}
+            """, [value for seq, event_type, payload in events
+                  for value in (user_id, seq, event_type, payload, now, expires_at.timestamp())])
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_interview_events(self, user_id, after_seq=0):
+        return self._connection().execute("""
+            SELECT seq, event_type, payload FROM interview_events
+            WHERE user_id = ? AND seq > ? AND expires_at > ?
+            ORDER BY seq
+        """, (user_id, after_seq, time.time())).fetchall()
+
+    def delete_interview_events(self, user_id, through_seq=None):
+        if through_seq is None:
+            self._connection().execute("DELETE FROM interview_events WHERE user_id = ?", (user_id,))
+        else:
+            self._connection().execute(
+                "DELETE FROM interview_events WHERE user_id = ? AND seq <= ?", (user_id, through_seq)
+            )
+
+    def count_active_interviews(self):
+        row = self._connection().execute(
+            "SELECT COUNT(DISTINCT user_id) FROM interview_data WHERE expires_at > ?",
+            (time.time(),)
+        ).fetchone()
+        return row[0] if row else 0
+
+SESSION_STORES = {
+    SnowflakeSessionStore.name: SnowflakeSessionStore,
+    SQLiteSessionStore.name: SQLiteSessionStore,
+}
+
+# Global session store instance
+_session_store = None
+_store_lock = threading.Lock()
+
+def get_session_store():
+    """Get the session store selected by Config.SESSION_STORE"""
+    global _session_store
+    if _session_store is None:
+        with _store_lock:
+            if _session_store is None:
+                store_name = (Config.SESSION_STORE or "snowflake").lower()
+                store_class = SESSION_STORES.get(store_name)
+                if store_class is None:
+                    logger.error(f"Unknown SESSION_STORE '{store_name}', falling back to snowflake")
+                    store_class = SnowflakeSessionStore
+                _session_store = store_class()
+                logger.info(f"Using {_session_store.name} session store")
+    return _session_store
+
+def set_session_store(store):
+    """Replace the global session store (used by tests and benchmarks)"""
+    global _session_store
+    with _store_lock:
+        _session_store = store
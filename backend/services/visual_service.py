@@ -2,11 +2,11 @@ import base64
 import cv2
 import numpy as np
 import logging
-import openai
 import json
 import hashlib
 from datetime import datetime
 from backend.utils.performance_utils import timing_decorator
+from backend.services.llm_client import chat_completion
 
 logger = logging.getLogger(__name__)
 
@@ -155,7 +155,7 @@ def analyze_visual_response(frame_base64, conversation_context, candidate_info=N
     
     logger.info(f"Sending visual analysis request to OpenAI for {candidate_name}")
     
-    response = openai.ChatCompletion.create(
+    response = chat_completion(
         model="gpt-4o",
         messages=[
             {
@@ -0,0 +1,447 @@
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from backend.services.connection_pool import pooled_connection
+from backend.services.schema_cache import table_columns
+from backend.services.query_cache import invalidate_tables
+from backend.utils.json_encoder import CustomJSONEncoder
+from backend.utils.compression import compress_text
+from config import Config
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: one worker process, nothing to coordinate
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Column lists for the multi-row inserts, keyed by record kind
+INSERT_COLUMNS = {
+    'interview_rating': (
+        'roll_no', 'technical_rating', 'communication_rating', 'problem_solving_rating',
+        'time_management_rating', 'total_rating', 'interview_ts'
+    ),
+    'visual_feedback': (
+        'roll_no', 'professional_appearance', 'body_language', 'environment',
+        'distractions', 'interview_ts'
+    ),
+    'student_performance_report': (
+        'student_name', 'roll_no', 'batch_no', 'center', 'course', 'evaluation_date',
+        'difficulty_level', 'interview_ts', 'report'
+    ),
+}
+
+class WriteBehindQueue:
+    """Durable write-behind queue for end-of-interview report writes.
+
+    Records are appended to a local spool file and acknowledged there once a
+    background writer has flushed them to Snowflake, so pending writes survive
+    a restart. Each process spools to its own file (``write_behind.<pid>.jsonl``
+    next to ``WRITE_BEHIND_SPOOL_PATH``); on start a process adopts the spools
+    left behind by processes that are no longer running. A record that keeps
+    failing is retried on its own and moved to ``write_behind.dead.jsonl``
+    after ``WRITE_BEHIND_MAX_ATTEMPTS`` attempts, so it cannot block the rest.
+    Supported kinds are ``interview_status`` plus the tables in ``INSERT_COLUMNS``.
+    """
+
+    def __init__(self, spool_path=None, batch_size=None, flush_interval=None, max_backoff=60, max_attempts=None):
+        self.base_path = spool_path or Config.WRITE_BEHIND_SPOOL_PATH
+        self.batch_size = batch_size or Config.WRITE_BEHIND_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else Config.WRITE_BEHIND_FLUSH_INTERVAL
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts or Config.WRITE_BEHIND_MAX_ATTEMPTS
+        root, ext = os.path.splitext(self.base_path)
+        self._spool_pattern = (root, ext)
+        self.dead_letter_path = f"{root}.dead{ext}"
+        self._closed = threading.Event()
+
+        # Telemetry
+        self.records_enqueued = 0
+        self.records_flushed = 0
+        self.batches_flushed = 0
+        self.flush_failures = 0
+        self.consecutive_failures = 0
+        self.dead_lettered = 0
+        self.last_error = None
+        self.last_flush_ms = 0.0
+
+        spool_dir = os.path.dirname(os.path.abspath(self.base_path))
+        os.makedirs(spool_dir, exist_ok=True)
+        self._start()
+
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start(self):
+        """Open this process's spool, adopting orphaned records, and start the writer"""
+        self.pending = deque()
+        self.attempts = {}
+        self.lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._replay_spool()
+        self._spool = open(self.spool_path, 'a', encoding='utf-8')
+
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True, name="write-behind")
+        self._writer.start()
+
+    def _after_fork(self):
+        """Workers forked from a preloaded app need their own spool and writer"""
+        if self._closed.is_set():
+            return
+        try:
+            self._spool.close()
+        except Exception:
+            pass
+        try:
+            self._start()
+        except Exception as e:
+            logger.error(f"Error starting write-behind queue after fork: {e}")
+
+    def _spool_path_for(self, pid):
+        root, ext = self._spool_pattern
+        return f"{root}.{pid}{ext}"
+
+    @contextmanager
+    def _spool_dir_lock(self):
+        """Serialize spool adoption and dead-lettering between the processes on this host"""
+        with open(self.base_path + '.lock', 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _orphaned_spools(self):
+        """Spools whose process is gone, plus the shared spool used before spools were per-process"""
+        root, ext = self._spool_pattern
+        orphans = [self.base_path] if os.path.exists(self.base_path) else []
+        for path in sorted(glob.glob(f"{glob.escape(root)}.*{ext}")):
+            pid = path[len(root) + 1:len(path) - len(ext)]
+            # Our own pid here is a file left by an earlier process that had the same pid
+            if pid.isdigit() and (int(pid) == os.getpid() or not _pid_alive(int(pid))):
+                orphans.append(path)
+        return orphans
+
+    def _replay_spool(self):
+        """Load records that were spooled but never acknowledged, here or by a dead process"""
+        self.spool_path = self._spool_path_for(os.getpid())
+        with self._spool_dir_lock():
+            orphans = self._orphaned_spools()
+            records = {}
+            for path in orphans:
+                records.update(_read_spool(path))
+            if not orphans:
+                return
+            # Move the records into our own spool before removing the files they came from
+            with open(self.spool_path + '.tmp', 'w', encoding='utf-8') as spool:
+                for entry in records.values():
+                    spool.write(json.dumps(entry) + "\n")
+                spool.flush()
+                os.fsync(spool.fileno())
+            os.replace(self.spool_path + '.tmp', self.spool_path)
+            for path in orphans:
+                if path != self.spool_path:
+                    os.remove(path)
+        self.pending.extend(records.values())
+        if records:
+            logger.info(f"Recovered {len(records)} unflushed report writes from {len(orphans)} spool file(s)")
+
+    def _append_spool(self, entry):
+        self._spool.write(json.dumps(entry, cls=CustomJSONEncoder) + "\n")
+        self._spool.flush()
+        os.fsync(self._spool.fileno())
+
+    def enqueue(self, kind, params):
+        """Spool a record for background persistence and return immediately"""
+        if kind != 'interview_status' and kind not in INSERT_COLUMNS:
+            raise ValueError(f"Unknown write-behind record kind: {kind}")
+        # Round-trip through JSON so replayed and live records look the same
+        entry = json.loads(json.dumps(
+            {'id': uuid.uuid4().hex, 'kind': kind, 'params': list(params)}, cls=CustomJSONEncoder
+        ))
+        with self.lock:
+            self._append_spool(entry)
+            self.pending.append(entry)
+            self.records_enqueued += 1
+        self._wakeup.set()
+        return entry['id']
+
+    def _writer_loop(self):
+        while not self._closed.is_set():
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            if self._closed.is_set():
+                break
+            while self.depth() and not self._closed.is_set():
+                if not self.flush_once():
+                    backoff = min(2 ** self.consecutive_failures, self.max_backoff)
+                    logger.warning(f"Write-behind flush failed, retrying in {backoff}s")
+                    self._closed.wait(backoff)
+
+    def depth(self):
+        with self.lock:
+            return len(self.pending)
+
+    def flush_once(self):
+        """Write one batch to Snowflake. Returns False if the batch failed and was kept."""
+        with self._flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return True
+                # A record that failed before is retried on its own so it cannot hold back the rest
+                size = 1 if self.attempts.get(self.pending[0]['id']) else self.batch_size
+                batch = [self.pending[i] for i in range(min(size, len(self.pending)))]
+
+            start_time = time.perf_counter()
+            rejected = False
+            try:
+                with pooled_connection() as conn:
+                    cs = conn.cursor()
+                    try:
+                        cs.execute("BEGIN")
+                        self._write_batch(cs, batch)
+                        conn.commit()
+                    except Exception:
+                        rejected = True
+                        conn.rollback()
+                        raise
+                    finally:
+                        cs.close()
+            except Exception as e:
+                with self.lock:
+                    self.flush_failures += 1
+                    self.consecutive_failures += 1
+                    self.last_error = str(e)
+                logger.error(f"Error flushing write-behind batch of {len(batch)} records: {e}")
+                # Only failed writes count as attempts; an unreachable database is waited out
+                if rejected and self._record_failure(batch):
+                    return True
+                return False
+
+            # Dashboards reading these tables must see the new rows
+            invalidate_tables(*self._tables_written(batch))
+
+            with self.lock:
+                self._acknowledge(batch)
+                self.records_flushed += len(batch)
+                self.batches_flushed += 1
+                self.consecutive_failures = 0
+                self.last_flush_ms = round((time.perf_counter() - start_time) * 1000, 2)
+            logger.debug(f"Flushed {len(batch)} write-behind records in {self.last_flush_ms}ms")
+            return True
+
+    def _record_failure(self, batch):
+        """Count a failed attempt; returns True if the record was moved to the dead-letter file"""
+        with self.lock:
+            for entry in batch:
+                self.attempts[entry['id']] = self.attempts.get(entry['id'], 0) + 1
+            if len(batch) > 1 or self.attempts[batch[0]['id']] < self.max_attempts:
+                return False
+        entry = batch[0]
+        try:
+            with self._spool_dir_lock():
+                with open(self.dead_letter_path, 'a', encoding='utf-8') as dead_letters:
+                    dead_letters.write(json.dumps(dict(entry, error=self.last_error)) + "\n")
+                    dead_letters.flush()
+                    os.fsync(dead_letters.fileno())
+        except Exception as e:
+            logger.error(f"Error dead-lettering write-behind record {entry['id']}: {e}")
+            return False
+        with self.lock:
+            self._acknowledge(batch)
+            self.dead_lettered += 1
+            self.consecutive_failures = 0
+        logger.error(f"Moved write-behind {entry['kind']} record {entry['id']} to {self.dead_letter_path} after {self.max_attempts} attempts")
+        return True
+
+    def _acknowledge(self, batch):
+        """Drop ``batch`` from the head of the queue and the spool. Must be called with ``self.lock`` held."""
+        for entry in batch:
+            self.pending.popleft()
+            self.attempts.pop(entry['id'], None)
+        if self.pending:
+            self._append_spool({'ack': [entry['id'] for entry in batch]})
+        else:
+            # Everything is acknowledged, start a fresh spool
+            self._spool.close()
+            self._spool = open(self.spool_path, 'w', encoding='utf-8')
+
+    def _tables_written(self, batch):
+        return {'interview' if entry['kind'] == 'interview_status' else entry['kind'] for entry in batch}
+
+    def _write_batch(self, cs, batch):
+        by_kind = {}
+        for entry in batch:
+            by_kind.setdefault(entry['kind'], []).append(entry['params'])
+
+        status_updates = by_kind.pop('interview_status', [])
+        # Records spooled before interview_id existed carry only (email_id, interview_ts)
+        interview_ids = [params[2] for params in status_updates if len(params) > 2 and params[2]]
+        if interview_ids:
+            cs.execute(
+                f"UPDATE interview SET status = 'Completed' WHERE interview_id IN ({', '.join(['%s'] * len(interview_ids))})",
+                interview_ids
+            )
+        for params in status_updates:
+            if len(params) > 2 and params[2]:
+                continue
+            email_id, interview_ts = params[0], params[1]
+            cs.execute("""
+                UPDATE interview
+                SET status = 'Completed'
+                WHERE email_id = %s AND interview_ts = COALESCE(
+                    TRY_TO_TIMESTAMP_TZ(%s, 'YYYY-MM-DD""T""HH24:MI:SS.FF TZHTZM')::TIMESTAMP_NTZ,
+                    TRY_TO_TIMESTAMP(%s, 'YYYY-MM-DD HH24:MI:SS')
+                )
+            """, (email_id, interview_ts, interview_ts))
+
+        reports = by_kind.pop('student_performance_report', [])
+        if reports:
+            self._insert_reports(cs, reports)
+
+        for kind, rows in by_kind.items():
+            columns, rows = self._existing_columns(kind, rows)
+            placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+            cs.execute(
+                f"INSERT INTO {kind} ({', '.join(columns)}) VALUES {', '.join([placeholders] * len(rows))}",
+                [value for row in rows for value in row]
+            )
+
+    def _existing_columns(self, kind, rows):
+        """Drop columns the table does not have (older schemas) from the column list and rows"""
+        columns = INSERT_COLUMNS[kind]
+        present = table_columns(kind, columns)
+        if len(present) == len(columns):
+            return columns, rows
+        indexes = [columns.index(column) for column in present]
+        return present, [[row[i] for i in indexes] for row in rows]
+
+    def _insert_reports(self, cs, rows):
+        """Insert performance reports that are not already stored, in one statement"""
+        columns = INSERT_COLUMNS['student_performance_report']
+        roll_no_index = columns.index('roll_no')
+        ts_index = columns.index('interview_ts')
+        unique_rows = {}
+        for row in rows:
+            unique_rows.setdefault((row[roll_no_index], row[ts_index]), row)
+        columns, rows = self._existing_columns('student_performance_report', list(unique_rows.values()))
+        if 'report' in columns:
+            report_index = columns.index('report')
+            rows = [row[:report_index] + [compress_text(row[report_index])] + row[report_index + 1:] for row in rows]
+
+        placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        select_columns = ", ".join(
+            "TRY_TO_TIMESTAMP(v.interview_ts)" if column == 'interview_ts' else f"v.{column}"
+            for column in columns
+        )
+        cs.execute(f"""
+            INSERT INTO student_performance_report ({', '.join(columns)})
+            SELECT {select_columns}
+            FROM VALUES {', '.join([placeholders] * len(rows))} AS v({', '.join(columns)})
+            WHERE NOT EXISTS (
+                SELECT 1 FROM student_performance_report s
+                WHERE s.roll_no = v.roll_no AND s.interview_ts = TRY_TO_TIMESTAMP(v.interview_ts)
+            )
+        """, [value for row in rows for value in row])
+
+    def flush(self, timeout=30):
+        """Synchronously drain the queue, giving up after ``timeout`` seconds"""
+        deadline = time.time() + timeout
+        while self.depth() and time.time() < deadline:
+            if not self.flush_once():
+                time.sleep(min(1, max(0, deadline - time.time())))
+        remaining = self.depth()
+        if remaining:
+            logger.warning(f"{remaining} write-behind records left in {self.spool_path} for the next start")
+        return remaining == 0
+
+    def get_stats(self):
+        """Get write-behind queue statistics"""
+        with self.lock:
+            return {
+                'depth': len(self.pending),
+                'records_enqueued': self.records_enqueued,
+                'records_flushed': self.records_flushed,
+                'batches_flushed': self.batches_flushed,
+                'flush_failures': self.flush_failures,
+                'dead_lettered': self.dead_lettered,
+                'last_flush_ms': self.last_flush_ms,
+                'last_error': self.last_error
+            }
+
+    def shutdown(self, timeout=30):
+        """Flush pending records and stop the background writer"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._wakeup.set()
+        self._writer.join(timeout=5)
+        self.flush(timeout=timeout)
+        with self.lock:
+            self._spool.close()
+            if not self.pending:
+                os.remove(self.spool_path)
+        logger.info("Write-behind queue shut down")
+
+def _read_spool(path):
+    """Records in a spool file that were never acknowledged, in spool order"""
+    records = {}
+    with open(path, 'r', encoding='utf-8') as spool:
+        for line in spool:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-append
+                continue
+            if 'ack' in entry:
+                for record_id in entry['ack']:
+                    records.pop(record_id, None)
+            else:
+                records[entry['id']] = entry
+    return records
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, owned by another user
+        return True
+    return True
+
+# Global write-behind queue instance
+_write_behind_queue = None
+_queue_lock = threading.Lock()
+
+def get_write_behind_queue():
+    """Get the global write-behind queue, starting its writer on first use"""
+    global _write_behind_queue
+    if _write_behind_queue is None:
+        with _queue_lock:
+            if _write_behind_queue is None:
+                _write_behind_queue = WriteBehindQueue()
+                atexit.register(_write_behind_queue.shutdown)
+    return _write_behind_queue
+
+def enqueue_write(kind, params):
+    """Queue a report write for background persistence"""
+    return get_write_behind_queue().enqueue(kind, params)
+
+def shutdown_write_behind_queue():
+    """Flush and stop the global write-behind queue"""
+    global _write_behind_queue
+    if _write_behind_queue:
+        _write_behind_queue.shutdown()
+        _write_behind_queue = None
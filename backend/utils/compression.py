@@ -0,0 +1,98 @@
+import base64
+import logging
+import threading
+import time
+import zlib
+from config import Config
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Compressed values are stored as text: a magic prefix naming the codec, then base64.
+# Plain JSON and HTML never start with "~z", so uncompressed values read back unchanged.
+ZLIB_MAGIC = "~zl1:"
+ZSTD_MAGIC = "~zs1:"
+
+compression_stats = {
+    'values_compressed': 0,
+    'values_skipped': 0,
+    'bytes_in': 0,
+    'bytes_out': 0,
+    'compress_ms': 0.0,
+    'values_decompressed': 0,
+    'decompress_ms': 0.0
+}
+_stats_lock = threading.Lock()
+
+def _codec():
+    """Return the configured codec name, or None when compression is off"""
+    codec = (Config.PAYLOAD_COMPRESSION or "off").lower()
+    if codec == "off":
+        return None
+    if codec == "zstd" and zstandard is None:
+        logger.warning("PAYLOAD_COMPRESSION=zstd but zstandard is not installed, using zlib")
+        return "zlib"
+    return codec if codec in ("zlib", "zstd") else None
+
+def compress_text(value):
+    """Compress a text value above PAYLOAD_COMPRESSION_THRESHOLD bytes; other values pass through"""
+    codec = _codec()
+    if codec is None or not isinstance(value, str):
+        return value
+    raw = value.encode('utf-8')
+    if len(raw) < Config.PAYLOAD_COMPRESSION_THRESHOLD:
+        with _stats_lock:
+            compression_stats['values_skipped'] += 1
+        return value
+
+    start_time = time.perf_counter()
+    if codec == "zstd":
+        packed = ZSTD_MAGIC + base64.b64encode(zstandard.ZstdCompressor().compress(raw)).decode('ascii')
+    else:
+        packed = ZLIB_MAGIC + base64.b64encode(zlib.compress(raw, 6)).decode('ascii')
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    if len(packed) >= len(raw):
+        # Not worth it (already dense text); store as is
+        with _stats_lock:
+            compression_stats['values_skipped'] += 1
+            compression_stats['compress_ms'] += elapsed_ms
+        return value
+    with _stats_lock:
+        compression_stats['values_compressed'] += 1
+        compression_stats['bytes_in'] += len(raw)
+        compression_stats['bytes_out'] += len(packed)
+        compression_stats['compress_ms'] += elapsed_ms
+    return packed
+
+def decompress_text(value):
+    """Reverse ``compress_text``; values without a magic prefix are returned unchanged"""
+    if not isinstance(value, str) or not value.startswith("~z"):
+        return value
+    start_time = time.perf_counter()
+    if value.startswith(ZLIB_MAGIC):
+        text = zlib.decompress(base64.b64decode(value[len(ZLIB_MAGIC):])).decode('utf-8')
+    elif value.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed value found but zstandard is not installed")
+        text = zstandard.ZstdDecompressor().decompress(base64.b64decode(value[len(ZSTD_MAGIC):])).decode('utf-8')
+    else:
+        return value
+    with _stats_lock:
+        compression_stats['values_decompressed'] += 1
+        compression_stats['decompress_ms'] += (time.perf_counter() - start_time) * 1000
+    return text
+
+def get_compression_stats():
+    """Get payload compression statistics"""
+    with _stats_lock:
+        stats = dict(compression_stats)
+    stats['codec'] = _codec() or 'off'
+    stats['compression_ratio'] = round(stats['bytes_in'] / stats['bytes_out'], 2) if stats['bytes_out'] else None
+    stats['compress_ms'] = round(stats['compress_ms'], 2)
+    stats['decompress_ms'] = round(stats['decompress_ms'], 2)
+    return stats
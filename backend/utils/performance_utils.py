@@ -1,5 +1,7 @@
 import time
+import bisect
 import logging
+import threading
 from functools import wraps
 from config import Config
 
@@ -56,4 +58,38 @@ class PerformanceMonitor:
 
 def log_performance(operation_name):
     """Context manager for performance logging"""
-    return PerformanceMonitor(operation_name)
\ No newline at end of file
+    return PerformanceMonitor(operation_name)
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket histogram of durations, reported in milliseconds"""
+
+    DEFAULT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, 30000)
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds):
+        """Record one duration given in seconds"""
+        value_ms = seconds * 1000
+        index = bisect.bisect_left(self.buckets_ms, value_ms)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += value_ms
+            self.max_ms = max(self.max_ms, value_ms)
+
+    def snapshot(self):
+        """Get counts per bucket plus count, average and max"""
+        with self.lock:
+            labels = [f"<={b}ms" for b in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+            return {
+                'count': self.count,
+                'avg_ms': round(self.total_ms / self.count, 2) if self.count else 0,
+                'max_ms': round(self.max_ms, 2),
+                'buckets': dict(zip(labels, self.counts))
+            }
@@ -1,15 +1,83 @@
+import copy
 import json
 import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from flask.sessions import SessionInterface, SessionMixin
+from flask.sessions import SessionInterface, SessionMixin, SecureCookieSessionInterface
 from werkzeug.datastructures import CallbackDict
 from backend.services.session_service import (
-    create_session, get_session, update_session_access, 
+    create_session, get_session, save_session, serialize_session, update_session_access,
     delete_session, cleanup_expired_sessions, init_session_tables
 )
+from backend.services.job_runner import schedule_job
+from backend.services.invalidation_bus import publish, subscribe, start_invalidation_bus
+from config import Config
 
 logger = logging.getLogger(__name__)
 
+class SessionCache:
+    """Bounded LRU cache of session data with a short TTL.
+
+    A hit lets ``open_session`` skip the database entirely. Entries are
+    dropped explicitly when a session is deleted (e.g. on logout).
+    """
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl if ttl is not None else Config.SESSION_CACHE_TTL
+        self.max_entries = max_entries or Config.SESSION_CACHE_MAX_ENTRIES
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(session_id)
+            if entry and entry[0] > now:
+                self.entries.move_to_end(session_id)
+                self.hits += 1
+                # Handlers mutate session dicts, so never hand out the cached object
+                return copy.deepcopy(entry[1])
+            if entry:
+                del self.entries[session_id]
+            self.misses += 1
+            return None
+
+    def put(self, session_id, session_data):
+        with self.lock:
+            self.entries[session_id] = (time.time() + self.ttl, copy.deepcopy(session_data))
+            self.entries.move_to_end(session_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, session_id):
+        with self.lock:
+            self.entries.pop(session_id, None)
+
+    def get_stats(self):
+        """Get session cache statistics"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate_percent': round(self.hits / lookups * 100, 2) if lookups else 0
+            }
+
+# Shared by every DatabaseSessionInterface in the process
+session_cache = SessionCache()
+
+# Invalidation bus channels: a session was changed or deleted, or a signed cookie revoked, by another worker
+SESSION_CHANNEL = 'session'
+SESSION_REVOKED_CHANNEL = 'session_revoked'
+
+subscribe(SESSION_CHANNEL, session_cache.invalidate)
+
 class DatabaseSession(CallbackDict, SessionMixin):
     def __init__(self, initial=None, session_id=None, user_id=None):
         def on_update(self):
@@ -19,6 +87,8 @@ class DatabaseSession(CallbackDict, SessionMixin):
         self.user_id = user_id
         self.modified = False
         self.new = False
+        # Serialized payload as loaded; save_session writes only when it differs
+        self.snapshot = serialize_session(dict(self)) if session_id else None
 
 class DatabaseSessionInterface(SessionInterface):
     def __init__(self, app=None):
@@ -34,8 +104,7 @@ class DatabaseSessionInterface(SessionInterface):
             init_session_tables()
         
         # Set up periodic cleanup of expired sessions
-        if not hasattr(app, 'session_cleanup_task'):
-            app.session_cleanup_task = None
+        schedule_session_cleanup(app)
     
     def open_session(self, app, request):
         """Open a session for the request"""
@@ -43,7 +112,14 @@ class DatabaseSessionInterface(SessionInterface):
         user_id = None
         
         if session_id:
-            session_data = get_session(session_id)
+            session_data = session_cache.get(session_id)
+            if session_data is None:
+                session_data = get_session(session_id)
+                if session_data:
+                    session_cache.put(session_id, session_data)
+            elif session_data:
+                # Touches are buffered in memory, so record cache hits too
+                update_session_access(session_id)
             if session_data:
                 user_id = session_data.get('user')
                 return DatabaseSession(
@@ -64,7 +140,9 @@ class DatabaseSessionInterface(SessionInterface):
             if session.modified:
                 # Delete the session
                 if session.session_id:
+                    session_cache.invalidate(session.session_id)
                     delete_session(session.session_id)
+                    publish(SESSION_CHANNEL, session.session_id)
                 response.delete_cookie(
                     app.config.get('SESSION_COOKIE_NAME', 'session'),
                     domain=domain,
@@ -76,21 +154,35 @@ class DatabaseSessionInterface(SessionInterface):
         expires = self.get_expiration_time(app, session)
         
         # Save session data
-        if session.modified:
+        if session.session_id:
+            # Diff against the loaded snapshot rather than trusting ``modified``:
+            # reassigning an unchanged value costs nothing, and in-place changes
+            # to nested values are still caught
+            session_data = dict(session)
+            payload = serialize_session(session_data)
+            if payload != session.snapshot:
+                if save_session(
+                    session.session_id,
+                    session.get('user'),
+                    payload,
+                    expires_in=app.config.get('PERMANENT_SESSION_LIFETIME', 4600)
+                ):
+                    session.snapshot = payload
+                    session_cache.put(session.session_id, session_data)
+                    publish(SESSION_CHANNEL, session.session_id)
+        elif session.modified and session.get('user'):
+            # Create new session
             session_data = dict(session)
-            if session.session_id:
-                # Update existing session
-                update_session_access(session.session_id)
-            else:
-                # Create new session
-                if session.get('user'):
-                    session_id = create_session(
-                        session.get('user'), 
-                        session_data, 
-                        expires_in=app.config.get('PERMANENT_SESSION_LIFETIME', 4600)
-                    )
-                    session.session_id = session_id
-                    session.user_id = session.get('user')
+            session_id = create_session(
+                session.get('user'), 
+                session_data, 
+                expires_in=app.config.get('PERMANENT_SESSION_LIFETIME', 4600)
+            )
+            session.session_id = session_id
+            session.user_id = session.get('user')
+            if session_id:
+                session.snapshot = serialize_session(session_data)
+                session_cache.put(session_id, session_data)
         
         # Set cookie
         if session.session_id:
@@ -111,7 +203,8 @@ class DatabaseSessionInterface(SessionInterface):
     
     def get_cookie_path(self, app):
         """Get the cookie path"""
-        return app.config.get('SESSION_COOKIE_PATH', '/')
+        # Flask defaults SESSION_COOKIE_PATH to None, which would scope the cookie to the request path
+        return app.config.get('SESSION_COOKIE_PATH') or app.config.get('APPLICATION_ROOT') or '/'
     
     def get_cookie_httponly(self, app):
         """Get the cookie httponly setting"""
@@ -134,7 +227,102 @@ class DatabaseSessionInterface(SessionInterface):
         
         return datetime.utcnow() + timedelta(seconds=lifetime)
 
+class SessionDenylist:
+    """In-memory set of revoked signed-cookie session ids, kept until the cookies would expire anyway"""
+
+    def __init__(self):
+        self.revoked = {}
+        self.lock = threading.Lock()
+
+    def revoke(self, sid, ttl):
+        with self.lock:
+            self.revoked[sid] = time.time() + ttl
+            self._prune()
+
+    def is_revoked(self, sid):
+        with self.lock:
+            expires_at = self.revoked.get(sid)
+            return expires_at is not None and expires_at > time.time()
+
+    def _prune(self):
+        now = time.time()
+        for sid in [sid for sid, expires_at in self.revoked.items() if expires_at <= now]:
+            del self.revoked[sid]
+
+    def __len__(self):
+        return len(self.revoked)
+
+session_denylist = SessionDenylist()
+
+def _revoke_from_other_worker(sid):
+    session_denylist.revoke(sid, Config.PERMANENT_SESSION_LIFETIME)
+
+subscribe(SESSION_REVOKED_CHANNEL, _revoke_from_other_worker)
+
+class SignedCookieSessionInterface(SecureCookieSessionInterface):
+    """Stateless sessions: a signed, expiring payload carried in the cookie.
+
+    Opening a session is an HMAC check plus an in-memory denylist lookup, with
+    no database I/O. Only the keys in ``persisted_keys`` are written to the
+    cookie; each cookie carries a random ``_sid`` so it can be revoked.
+    """
+
+    salt = 'interview-bot-session'
+    persisted_keys = ('user', 'role', '_sid', '_permanent')
+
+    def open_session(self, app, request):
+        session = super().open_session(app, request)
+        if session is None:
+            return None
+        session.sid = session.get('_sid')
+        if session.sid and session_denylist.is_revoked(session.sid):
+            return self.session_class()
+        return session
+
+    def save_session(self, app, session, response):
+        if not session:
+            if session.modified and getattr(session, 'sid', None):
+                # Logout: refuse this cookie even if a copy of it is replayed
+                revoke_signed_session(session.sid, app)
+            return super().save_session(app, session, response)
+
+        for key in [key for key in session if key not in self.persisted_keys]:
+            del session[key]
+        if '_sid' not in session:
+            session['_sid'] = uuid.uuid4().hex
+        return super().save_session(app, session, response)
+
+def revoke_signed_session(sid, app):
+    """Revoke a signed-cookie session by its ``_sid``, in every worker"""
+    session_denylist.revoke(sid, app.permanent_session_lifetime.total_seconds())
+    publish(SESSION_REVOKED_CHANNEL, sid)
+
+def schedule_session_cleanup(app):
+    """Prune expired user_sessions and interview_data rows every SESSION_CLEANUP_INTERVAL seconds"""
+    if getattr(app, 'session_cleanup_task', None) is None:
+        app.session_cleanup_task = schedule_job(
+            'session_cleanup',
+            cleanup_expired_sessions,
+            app.config.get('SESSION_CLEANUP_INTERVAL', 300)
+        )
+    return app.session_cleanup_task
+
 def setup_database_sessions(app):
     """Setup database-based sessions for the Flask app"""
     app.session_interface = DatabaseSessionInterface(app)
     logger.info("Database-based session interface initialized")
+
+def setup_sessions(app):
+    """Install the session interface selected by SESSION_MODE ("database" or "cookie")"""
+    # Cache invalidations between workers start with the app, not when the caches are imported
+    start_invalidation_bus()
+    mode = app.config.get('SESSION_MODE', 'database')
+    if mode == 'cookie':
+        app.session_interface = SignedCookieSessionInterface()
+        # Interview state still lives in the interview_data table
+        with app.app_context():
+            init_session_tables()
+        schedule_session_cleanup(app)
+        logger.info("Signed-cookie session interface initialized")
+    else:
+        setup_database_sessions(app)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark requests per second of an authenticated route under each session mode.
+
+Runs in-process through Flask's test client, so the numbers isolate the cost of
+opening and saving the session (no network or template rendering). The database
+mode uses the SQLite session store by default so the benchmark runs offline;
+pass --store snowflake to measure against the configured Snowflake account.
+
+    python benchmark_session_modes.py --requests 2000 --threads 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per mode (default 2000)")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent clients (default 4)")
+    parser.add_argument("--store", choices=["sqlite", "snowflake"], default="sqlite",
+                        help="session store used by the database mode (default sqlite)")
+    return parser.parse_args()
+
+def build_app(mode):
+    from flask import Flask, session, jsonify
+    from config import Config
+    from backend.utils.session_interface import setup_sessions
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config['SESSION_MODE'] = mode
+    setup_sessions(app)
+
+    @app.route('/login/<user>')
+    def login(user):
+        session['user'] = user
+        session['role'] = 'student'
+        return 'ok'
+
+    @app.route('/whoami')
+    def whoami():
+        # Same guard the real routes use
+        if 'user' not in session or session.get('role') != 'student':
+            return jsonify({"status": "error"}), 401
+        return jsonify({"user": session['user']})
+
+    return app
+
+def run_mode(label, app, total_requests, threads):
+    per_client = max(1, total_requests // threads)
+
+    def client_loop(index):
+        client = app.test_client()
+        client.get(f'/login/bench{index}@test.com')
+        failures = 0
+        for _ in range(per_client):
+            if client.get('/whoami').status_code != 200:
+                failures += 1
+        return failures
+
+    # Warm up connections, caches and imports
+    client_loop(threads)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        failures = sum(executor.map(client_loop, range(threads)))
+    elapsed = time.perf_counter() - start
+    completed = per_client * threads
+    print(f"{label:<32} {completed / elapsed:>10.1f} req/s  {elapsed * 1000 / completed:>8.3f} ms/req  failures={failures}")
+
+def main():
+    args = parse_args()
+    if args.store == "sqlite":
+        os.environ["SESSION_STORE"] = "sqlite"
+        os.environ["SESSION_SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(), "bench_sessions.db")
+    else:
+        os.environ["SESSION_STORE"] = "snowflake"
+
+    from backend.utils.session_interface import session_cache
+
+    print(f"Session mode benchmark: {args.requests} requests, {args.threads} clients, database store={args.store}")
+    print("=" * 72)
+
+    database_app = build_app('database')
+    run_mode("database (session cache)", database_app, args.requests, args.threads)
+
+    cache_ttl = session_cache.ttl
+    session_cache.ttl = 0
+    run_mode("database (no session cache)", database_app, args.requests, args.threads)
+    session_cache.ttl = cache_ttl
+
+    run_mode("cookie (signed, stateless)", build_app('cookie'), args.requests, args.threads)
+
+if __name__ == "__main__":
+    main()
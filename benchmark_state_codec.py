@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the interview state codec.
+
+Compares the previous path (json + CustomJSONEncoder, then datetime.fromisoformat
+on the datetime fields) with the msgspec InterviewState codec used by
+session_service and redis_service, plus msgspec msgpack for reference. The state
+is a synthetic late-interview record with long visual descriptions.
+
+    python benchmark_state_codec.py --iterations 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import msgspec
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.services.interview_state import InterviewState, new_interview_state, encode_state, decode_state, state_to_dict
+from backend.utils.json_encoder import CustomJSONEncoder
+
+DATETIME_FIELDS = ('start_time', 'end_time', 'last_activity_time', 'last_speech_time')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000, help="encode/decode rounds per codec (default 2000)")
+    parser.add_argument("--questions", type=int, default=15, help="questions answered in the synthetic state (default 15)")
+    return parser.parse_args()
+
+def build_state(questions):
+    now = datetime.now(timezone.utc)
+    description = (
+        "The candidate is seated in a well-lit room facing the camera, dressed in a collared shirt. "
+        "Posture is upright with occasional glances to the left of the screen; the background is a plain "
+        "wall with a bookshelf partially visible. No other people or devices are visible in the frame. "
+    ) * 3
+    state = new_interview_state()
+    state.update({
+        'interview_id': '3f1c2a9e-6a51-4d0e-9d55-0c1f2b7a8e44',
+        'interview_started': True,
+        'jd_text': "Backend engineer with Python, Flask and Snowflake experience. " * 20,
+        'difficulty_level': 'medium',
+        'start_time': now,
+        'last_activity_time': now,
+        'last_speech_time': now,
+        'current_question': questions,
+        'jd_id': 42,
+        'language': 'english',
+        'interview_ts': str(now),
+    })
+    for i in range(questions):
+        question = f"Question {i + 1}: explain how you would design a rate limiter for a multi-tenant API. " * 2
+        answer = "I would start with a token bucket per tenant stored in Redis, then ... " * 6
+        state['questions'].append(question)
+        state['answers'].append(answer)
+        state['ratings'].append({'technical': 7, 'communication': 8, 'problem_solving': 7, 'time_management': 6})
+        state['conversation_history'].append({'speaker': 'bot', 'text': question, 'timestamp': now.isoformat()})
+        state['conversation_history'].append({'speaker': 'user', 'text': answer, 'timestamp': now.isoformat()})
+        for _ in range(3):
+            state['visual_feedback'].append(description)
+            state['visual_feedback_data'].append({'timestamp': now.isoformat(), 'feedback': description})
+    return state
+
+def json_encode(state):
+    return json.dumps(state, cls=CustomJSONEncoder)
+
+def json_decode(payload):
+    state = json.loads(payload)
+    for field in DATETIME_FIELDS:
+        if isinstance(state.get(field), str):
+            state[field] = datetime.fromisoformat(state[field])
+    return state
+
+_msgpack_encoder = msgspec.msgpack.Encoder()
+_msgpack_decoder = msgspec.msgpack.Decoder(InterviewState)
+
+def msgpack_encode(state):
+    return _msgpack_encoder.encode(msgspec.convert(
+        dict({k: v for k, v in state.items() if k in InterviewState.__struct_fields__},
+             extra={k: v for k, v in state.items() if k not in InterviewState.__struct_fields__}),
+        InterviewState
+    ))
+
+def msgpack_decode(payload):
+    return state_to_dict(_msgpack_decoder.decode(payload))
+
+def measure(encode, decode, state, iterations):
+    payload = encode(state)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encode(state)
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode(payload)
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+    return encode_us, decode_us, len(payload)
+
+def main():
+    args = parse_args()
+    state = build_state(args.questions)
+    codecs = [
+        ("json + CustomJSONEncoder", json_encode, json_decode),
+        ("msgspec json (InterviewState)", encode_state, decode_state),
+        ("msgspec msgpack (reference)", msgpack_encode, msgpack_decode),
+    ]
+
+    print(f"Interview state codec benchmark: {args.iterations} iterations, {args.questions} questions")
+    print("=" * 78)
+    print(f"{'codec':<32} {'encode us':>10} {'decode us':>10} {'bytes':>10} {'round trip':>12}")
+    baseline = None
+    for label, encode, decode in codecs:
+        encode_us, decode_us, size = measure(encode, decode, state, args.iterations)
+        total = encode_us + decode_us
+        baseline = baseline or total
+        print(f"{label:<32} {encode_us:>10.1f} {decode_us:>10.1f} {size:>10} {baseline / total:>11.2f}x")
+
+if __name__ == "__main__":
+    main()
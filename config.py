@@ -26,6 +26,7 @@ class Config:
     SESSION_COOKIE_DOMAIN = None          # important when accessing via raw IP
     SESSION_COOKIE_MAX_SIZE = 4093
     SESSION_USE_SIGNER = True
+    SESSION_MODE = os.getenv("SESSION_MODE", "database")  # "database" (server-side rows) or "cookie" (signed, stateless)
     SESSION_PERMANENT = False             # non-permanent for now (safer on shared machines)
     PERMANENT_SESSION_LIFETIME = 4600     # seconds
 
@@ -33,6 +34,24 @@ class Config:
     MAX_CONCURRENT_INTERVIEWS = 10
     INTERVIEW_SESSION_TIMEOUT = 4600      # 76 minutes
     SESSION_CLEANUP_INTERVAL = 300        # 5 minutes
+    SESSION_CLEANUP_CHUNK_SIZE = int(os.getenv("SESSION_CLEANUP_CHUNK_SIZE", "1000"))  # expired rows deleted per statement
+    SESSION_STORE = os.getenv("SESSION_STORE", "snowflake")                    # "snowflake" or "sqlite"
+    SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", "interview_sessions.db")  # used when SESSION_STORE=sqlite
+    SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", "30"))              # seconds a session stays in the in-process cache
+    SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "2048"))
+    SESSION_TOUCH_GRANULARITY = int(os.getenv("SESSION_TOUCH_GRANULARITY", "60"))            # write last_accessed at most once per window
+    SESSION_TOUCH_FLUSH_INTERVAL = int(os.getenv("SESSION_TOUCH_FLUSH_INTERVAL", "15"))      # seconds between batched last_accessed flushes
+    INTERVIEW_STATE_CACHE_MODE = os.getenv("INTERVIEW_STATE_CACHE_MODE", "write_through")  # "write_through", "write_behind" or "off"
+    INTERVIEW_STATE_CACHE_MAX_ENTRIES = int(os.getenv("INTERVIEW_STATE_CACHE_MAX_ENTRIES", "512"))
+    INTERVIEW_STATE_FLUSH_INTERVAL = int(os.getenv("INTERVIEW_STATE_FLUSH_INTERVAL", "5"))      # seconds between write-behind flushes
+    INTERVIEW_EVENT_LOG = os.getenv("INTERVIEW_EVENT_LOG", "1") in ("1", "true", "True")      # persist state changes as events (off: full snapshot per save)
+    INTERVIEW_SNAPSHOT_EVERY = int(os.getenv("INTERVIEW_SNAPSHOT_EVERY", "20"))                # events between full-state snapshots
+    PAYLOAD_COMPRESSION = os.getenv("PAYLOAD_COMPRESSION", "off")                             # "off", "zlib" or "zstd" (needs zstandard)
+    PAYLOAD_COMPRESSION_THRESHOLD = int(os.getenv("PAYLOAD_COMPRESSION_THRESHOLD", "4096"))   # bytes; smaller values are stored as is
+    INVALIDATION_BUS = os.getenv("INVALIDATION_BUS", "1") in ("1", "true", "True")          # broadcast cache evictions between workers on this host
+    INVALIDATION_BUS_PATH = os.getenv("INVALIDATION_BUS_PATH", "spool/invalidation_bus.db")    # SQLite change feed shared by the workers
+    INVALIDATION_POLL_INTERVAL = float(os.getenv("INVALIDATION_POLL_INTERVAL", "0.5"))         # seconds between change feed polls
+    INVALIDATION_RETENTION = int(os.getenv("INVALIDATION_RETENTION", "300"))                   # seconds feed rows are kept
 
     # --- Server settings ---
     USE_RELOADER = False                  # avoid duplicate threads/processes
@@ -47,6 +66,17 @@ class Config:
     # --- OpenAI ---
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "Unknown")
     OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "Unknown")
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))                       # pooled connections to the OpenAI API per process
+    LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))   # idle connections kept open for reuse
+    LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))                   # seconds an idle connection stays open
+    LLM_HTTP2 = os.getenv("LLM_HTTP2", "1") in ("1", "true", "True")                       # used when the h2 package is installed
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))                                     # default per-call timeout; call sites may pass their own
+    LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))                                # SDK retries on connection errors, 429 and 5xx
+    QUESTION_PREGEN_WORKERS = int(os.getenv("QUESTION_PREGEN_WORKERS", "2"))                # background threads generating questions at schedule time
+    QUESTION_PREGEN_WAIT = float(os.getenv("QUESTION_PREGEN_WAIT", "20"))                   # seconds /start_interview waits on a running job
+    QUESTION_BANK = os.getenv("QUESTION_BANK", "1") in ("1", "true", "True")               # reuse generated questions per JD, difficulty and language
+    QUESTION_BANK_MAX_SETS = int(os.getenv("QUESTION_BANK_MAX_SETS", "20"))                 # newest sets per key considered for rotation
 
     # --- Snowflake ---
     SNOW_USER = os.getenv("SNOW_USER", "")
@@ -56,6 +86,26 @@ class Config:
     SNOW_DATABASE = os.getenv("SNOW_DATABASE", "")
     SNOW_SCHEMA = os.getenv("SNOW_SCHEMA", "PUBLIC")
 
+    # --- Connection pool ---
+    DB_POOL_MIN_CONNECTIONS = int(os.getenv("DB_POOL_MIN_CONNECTIONS", "5"))                    # opened in parallel by the background warm-up
+    DB_POOL_VALIDATION_IDLE_SECONDS = int(os.getenv("DB_POOL_VALIDATION_IDLE_SECONDS", "300"))  # re-check idle connections older than this
+    DB_POOL_MAX_CONNECTION_AGE = int(os.getenv("DB_POOL_MAX_CONNECTION_AGE", "3600"))           # retire connections after 1 hour
+    DB_POOL_LEAK_THRESHOLD_SECONDS = int(os.getenv("DB_POOL_LEAK_THRESHOLD_SECONDS", "120"))    # log call sites holding a connection longer than this
+
+    # --- Write-behind queue for end-of-interview report writes ---
+    WRITE_BEHIND_SPOOL_PATH = os.getenv("WRITE_BEHIND_SPOOL_PATH", "spool/write_behind.jsonl")  # append-only, survives restarts
+    WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "100"))                   # records per Snowflake transaction
+    WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "2"))           # seconds between idle flushes
+    WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", "5"))                 # failed writes before a record is dead-lettered
+
+    # --- Schema capability cache ---
+    SCHEMA_CACHE_TTL = int(os.getenv("SCHEMA_CACHE_TTL", "600"))                                        # seconds before column sets are reloaded
+    SCHEMA_CACHE_SNAPSHOT_PATH = os.getenv("SCHEMA_CACHE_SNAPSHOT_PATH", "spool/schema_cache.json")     # shared by workers on the same host
+
+    # --- Dashboard query result cache ---
+    QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", "30"))                  # seconds a cached dashboard query stays fresh
+    QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "256"))
+
     # --- Interview runtime options ---
     MAX_FRAME_SIZE = 500
     FRAME_CAPTURE_INTERVAL = 5
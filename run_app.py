@@ -60,15 +60,11 @@ def check_dependencies():
 def test_database_connection():
     """Test database connection"""
     try:
-        from backend.services.snowflake_service import get_snowflake_connection
-        conn = get_snowflake_connection()
-        if conn:
-            conn.close()
-            print("✅ Database connection successful")
-            return True
-        else:
-            print("❌ Database connection failed")
-            return False
+        from backend.services.connection_pool import pooled_connection
+        with pooled_connection():
+            pass
+        print("✅ Database connection successful")
+        return True
     except Exception as e:
         print(f"❌ Database connection error: {e}")
         return False
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared Snowflake connection pool
+"""
+import ast
+import os
+import threading
+import time
+
+import pytest
+
+from backend.services import connection_pool
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Only the pool (and the connection factory it wraps) may open raw connections
+ALLOWED_FILES = {
+    os.path.join('backend', 'services', 'connection_pool.py'),
+    os.path.join('backend', 'services', 'snowflake_service.py'),
+}
+
+def _application_sources():
+    """Yield relative paths of every application module that can reach Snowflake"""
+    for name in ('app.py', 'run_app.py'):
+        yield name
+    for dirpath, dirnames, filenames in os.walk(os.path.join(ROOT_DIR, 'backend')):
+        dirnames[:] = [d for d in dirnames if d != '__pycache__']
+        for filename in filenames:
+            if filename.endswith('.py'):
+                yield os.path.relpath(os.path.join(dirpath, filename), ROOT_DIR)
+
+def _raw_connection_sites(tree):
+    """Return line numbers that import or call a raw Snowflake connection factory"""
+    sites = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom):
+            if any(alias.name == 'get_snowflake_connection' for alias in node.names):
+                sites.append(node.lineno)
+        elif isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Name) and func.id == 'get_snowflake_connection':
+                sites.append(node.lineno)
+            elif isinstance(func, ast.Attribute):
+                if func.attr == 'get_snowflake_connection':
+                    sites.append(node.lineno)
+                elif func.attr == 'connect' and ast.unparse(func.value).endswith('connector'):
+                    sites.append(node.lineno)
+    return sites
+
+def test_no_raw_connections_outside_pool():
+    offenders = []
+    for rel_path in _application_sources():
+        if rel_path in ALLOWED_FILES:
+            continue
+        with open(os.path.join(ROOT_DIR, rel_path), encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=rel_path)
+        offenders.extend(f"{rel_path}:{line}" for line in _raw_connection_sites(tree))
+    assert not offenders, (
+        "Open Snowflake connections with connection_pool.pooled_connection(), "
+        f"not directly: {', '.join(offenders)}"
+    )
+
+class FakeCursor:
+    def execute(self, *args, **kwargs):
+        pass
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor()
+
+    def close(self):
+        self.closed = True
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    monkeypatch.setattr(connection_pool, 'get_snowflake_connection', FakeConnection)
+    monkeypatch.setattr(connection_pool, '_connection_pool', None)
+    pool = connection_pool.get_connection_pool()
+    assert pool.wait_until_ready(timeout=5)
+    yield pool
+    connection_pool.cleanup_connection_pool()
+
+def test_pooled_connection_returns_connection_to_pool(fake_pool):
+    idle_before = fake_pool.pool.qsize()
+    with connection_pool.pooled_connection() as conn:
+        assert isinstance(conn, FakeConnection)
+        assert fake_pool.pool.qsize() == idle_before - 1
+    assert fake_pool.pool.qsize() == idle_before
+    assert not conn.closed
+
+def test_pooled_connection_returns_connection_on_error(fake_pool):
+    idle_before = fake_pool.pool.qsize()
+    with pytest.raises(RuntimeError):
+        with connection_pool.pooled_connection():
+            raise RuntimeError("query failed")
+    assert fake_pool.pool.qsize() == idle_before
+
+def test_recently_used_connections_skip_validation(monkeypatch):
+    monkeypatch.setattr(connection_pool, 'get_snowflake_connection', FakeConnection)
+    pool = connection_pool.ConnectionPool(max_connections=2, validation_idle_threshold=60)
+    conn = pool.get_connection()
+    pool.return_connection(conn)
+    stats = pool.get_pool_stats()
+    assert stats['validations_skipped'] == 1
+    assert stats['validations_performed'] == 0
+    pool.cleanup()
+
+def test_idle_connections_are_validated(monkeypatch):
+    monkeypatch.setattr(connection_pool, 'get_snowflake_connection', FakeConnection)
+    pool = connection_pool.ConnectionPool(max_connections=2, validation_idle_threshold=0)
+    pool.return_connection(pool.get_connection())
+    assert pool.get_pool_stats()['validations_performed'] == 1
+    pool.cleanup()
+
+def test_connections_past_max_age_are_retired(monkeypatch):
+    monkeypatch.setattr(connection_pool, 'get_snowflake_connection', FakeConnection)
+    pool = connection_pool.ConnectionPool(max_connections=2, max_connection_age=-1)
+    conn = pool.get_connection()
+    pool.return_connection(conn)
+    assert conn.closed
+    assert pool.get_pool_stats()['connections_retired'] >= 1
+    pool.cleanup()
+
+def test_warm_up_runs_in_background_and_in_parallel(monkeypatch):
+    def slow_connection():
+        time.sleep(0.3)
+        return FakeConnection()
+
+    monkeypatch.setattr(connection_pool, 'get_snowflake_connection', slow_connection)
+    started = time.time()
+    pool = connection_pool.ConnectionPool(max_connections=5, min_connections=4)
+    assert time.time() - started < 0.2
+    assert not pool.is_ready()
+
+    conn = pool.get_connection()
+    assert isinstance(conn, FakeConnection)
+    pool.return_connection(conn)
+
+    assert pool.wait_until_ready(timeout=5)
+    # Four connections opened in parallel take roughly as long as one
+    assert time.time() - started < 1.0
+    assert pool.get_pool_stats()['active_connections'] == 4
+    pool.cleanup()
+
+def test_checkouts_record_wait_and_hold_times(fake_pool):
+    with connection_pool.pooled_connection():
+        holders = fake_pool.get_checked_out_connections()
+        assert len(holders) == 1
+        assert holders[0]['call_site'].startswith('test_connection_pool.py:')
+    stats = fake_pool.get_pool_stats()
+    assert stats['wait_time_ms']['count'] == 1
+    assert stats['hold_time_ms']['count'] == 1
+    assert stats['checked_out'] == 0
+
+def test_leak_detector_reports_long_held_connections(fake_pool, monkeypatch):
+    monkeypatch.setattr(fake_pool, 'leak_threshold', 0)
+    conn = fake_pool.get_connection()
+    time.sleep(0.01)
+    assert fake_pool.check_for_leaks() == 1
+    # Each leak is only reported once
+    assert fake_pool.check_for_leaks() == 0
+    assert fake_pool.get_pool_stats()['leaks_detected'] == 1
+    fake_pool.return_connection(conn)
+
+def test_fallback_connections_are_only_adopted_when_pool_has_room(monkeypatch):
+    monkeypatch.setattr(connection_pool, 'get_snowflake_connection', FakeConnection)
+    pool = connection_pool.ConnectionPool(max_connections=1)
+    pooled = pool.get_connection()
+    fallback = FakeConnection()
+
+    # The pool is at max_connections, so the fallback connection is closed instead of pooled
+    pool.return_connection(fallback)
+    assert fallback.closed
+    assert pool.get_pool_stats()['active_connections'] == 1
+
+    pool.return_connection(pooled)
+    pool._close_connection(pool.pool.get_nowait())
+    adopted = FakeConnection()
+    pool.return_connection(adopted)
+    assert not adopted.closed
+    assert pool.get_pool_stats()['active_connections'] == 1
+    pool.cleanup()
+
+def test_new_connections_are_opened_outside_the_pool_lock(monkeypatch):
+    pool = connection_pool.ConnectionPool(max_connections=2, connection_timeout=0.1, min_connections=0)
+
+    def locked_check_connection():
+        # Stats must stay readable while a connection is logging in
+        assert pool.lock.acquire(timeout=1)
+        pool.lock.release()
+        return FakeConnection()
+
+    monkeypatch.setattr(connection_pool, 'get_snowflake_connection', locked_check_connection)
+    conn = pool.get_connection()
+    assert isinstance(conn, FakeConnection)
+    assert pool.get_pool_stats()['active_connections'] == 1
+
+    # A failed login releases its reserved slot
+    monkeypatch.setattr(connection_pool, 'get_snowflake_connection', lambda: None)
+    pool._create_new_connection()
+    assert pool.get_pool_stats()['active_connections'] == 1
+    pool.return_connection(conn)
+    pool.cleanup()
+
+def test_checkout_during_warm_up_does_not_stall_behind_handed_out_connections(monkeypatch):
+    release = threading.Event()
+    logins = []
+
+    def connection():
+        logins.append(1)
+        # The second warm-up login hangs; every other login is instant
+        if len(logins) == 2:
+            release.wait(5)
+        return FakeConnection()
+
+    monkeypatch.setattr(connection_pool, 'get_snowflake_connection', connection)
+    pool = connection_pool.ConnectionPool(max_connections=3, min_connections=2)
+    first = pool.get_connection()
+
+    # One checkout waits for the warm-up login still in flight
+    waiter = threading.Thread(target=lambda: pool.return_connection(pool.get_connection()))
+    waiter.start()
+    while not pool.warm_up_waiters:
+        time.sleep(0.01)
+
+    # The next one opens a connection of its own instead of waiting behind it
+    started = time.time()
+    second = pool.get_connection()
+    assert time.time() - started < 1
+    assert pool.get_pool_stats()['active_connections'] == 3
+
+    # Warm-up reserved its slots, so the pool never goes past max_connections
+    release.set()
+    waiter.join()
+    assert pool.get_pool_stats()['active_connections'] == 3
+    pool.return_connection(first)
+    pool.return_connection(second)
+    pool.cleanup()
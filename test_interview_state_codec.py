@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for the InterviewState codec's handling of interview_ts
+"""
+import pytest
+from datetime import datetime
+
+from backend.services import session_store
+from backend.services.interview_events import InterviewEventLog
+from backend.services.interview_state import encode_state, decode_state, new_interview_state
+
+# The form the TRY_TO_TIMESTAMP(..., 'YYYY-MM-DD HH24:MI:SS') fallbacks and conversation file names expect
+LEGACY_TS = '2026-10-17 09:30:05'
+
+@pytest.fixture
+def store(tmp_path):
+    sqlite_store = session_store.SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    sqlite_store.init_tables()
+    previous = session_store.get_session_store()
+    session_store.set_session_store(sqlite_store)
+    yield sqlite_store
+    session_store.set_session_store(previous)
+
+def test_interview_ts_round_trips_in_legacy_format():
+    # Routes copy interview_ts from the interview row as a datetime
+    payload = encode_state(dict(new_interview_state(), interview_ts=datetime(2026, 10, 17, 9, 30, 5)))
+    assert b'"interview_ts":"2026-10-17 09:30:05"' in payload
+    assert decode_state(payload)['interview_ts'] == LEGACY_TS
+
+    # Payloads written with the ISO encoding are read back in the legacy format
+    assert decode_state(b'{"extra": {"interview_ts": "2026-10-17T09:30:05"}}')['interview_ts'] == LEGACY_TS
+
+def test_interview_ts_survives_event_replay(store):
+    log = InterviewEventLog()
+    assert log.save('candidate', new_interview_state())
+    # Set after the snapshot, so it is persisted as a fields_updated event
+    assert log.save('candidate', dict(new_interview_state(), interview_ts=datetime(2026, 10, 17, 9, 30, 5)))
+
+    assert InterviewEventLog().load('candidate')['interview_ts'] == LEGACY_TS
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for compare-and-swap interview state saves and the merge policy
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from backend.services import session_store
+from backend.services.interview_events import InterviewEventLog
+from backend.services.interview_state import new_interview_state, merge_states
+from backend.services.interview_state_cache import InterviewStateCache
+
+@pytest.fixture
+def store(tmp_path):
+    sqlite_store = session_store.SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    sqlite_store.init_tables()
+    previous = session_store.get_session_store()
+    session_store.set_session_store(sqlite_store)
+    yield sqlite_store
+    session_store.set_session_store(previous)
+
+def _started_state():
+    state = new_interview_state()
+    state.update({'interview_started': True, 'questions': ['Q1', 'Q2'], 'current_question': 0})
+    return state
+
+def test_merge_keeps_both_sides_of_commuting_fields():
+    base = _started_state()
+    mine = dict(base, answers=['A1'], current_question=1, interview_time_used=30, current_context='mine')
+    theirs = dict(base, speech_detected=True, interview_time_used=5, current_context='theirs')
+
+    merged = merge_states(base, mine, theirs)
+
+    assert merged['answers'] == ['A1']
+    assert merged['current_question'] == 1
+    assert merged['speech_detected'] is True
+    assert merged['interview_time_used'] == 35
+    # Not mergeable: the later save wins
+    assert merged['current_context'] == 'mine'
+
+def test_stale_save_is_merged_in_cache():
+    stored = {}
+    cache = InterviewStateCache(
+        loader=lambda user_id: stored.get(user_id),
+        saver=lambda user_id, data: stored.__setitem__(user_id, data) or True,
+        mode='write_through'
+    )
+    stored['candidate'] = _started_state()
+
+    # /process_answer and /check_speech both read version v
+    answer_state, version = cache.get_versioned('candidate')
+    speech_state, speech_version = cache.get_versioned('candidate')
+    assert speech_version == version
+
+    answer_state['answers'] = ['A1']
+    answer_state['current_question'] = 1
+    cache.put('candidate', answer_state, base=_started_state(), base_version=version)
+
+    # The speech poll saves last, from the state it read before the answer was recorded
+    speech_state['speech_detected'] = True
+    cache.put('candidate', speech_state, durable=False, base=_started_state(), base_version=speech_version)
+
+    current = cache.get('candidate')
+    assert current['answers'] == ['A1']
+    assert current['current_question'] == 1
+    assert current['speech_detected'] is True
+    assert cache.get_stats()['conflicts'] == 1
+
+def test_event_log_merges_writes_from_another_process(store):
+    first, second = InterviewEventLog(), InterviewEventLog()
+    assert first.save('candidate', _started_state())
+
+    # Both processes hold the same persisted state
+    assert second.load('candidate')['questions'] == ['Q1', 'Q2']
+    assert first.save('candidate', dict(_started_state(), answers=['A1'], current_question=1))
+    # The second save conflicts and returns the merged state it persisted
+    merged = second.save('candidate', dict(_started_state(), ratings=[{'technical': 7}]))
+    assert merged['answers'] == ['A1']
+
+    state = InterviewEventLog().load('candidate')
+    assert state['answers'] == ['A1']
+    assert state['ratings'] == [{'technical': 7}]
+    assert state['current_question'] == 1
+    assert second.get_stats()['cas_conflicts'] == 1
+
+def test_snapshot_saves_merge_stale_writes_with_event_log_off(store):
+    first, second = InterviewEventLog(use_events=False), InterviewEventLog(use_events=False)
+    assert first.save('candidate', _started_state())
+
+    # /check_speech read the state before /process_answer saved
+    assert second.load('candidate')['questions'] == ['Q1', 'Q2']
+    assert first.save('candidate', dict(_started_state(), answers=['A1'], current_question=1))
+    merged = second.save('candidate', dict(_started_state(), speech_detected=True))
+    assert merged['answers'] == ['A1']
+
+    # Every save went to the one snapshot row, without events
+    assert store.get_interview_events('candidate') == []
+    state = InterviewEventLog(use_events=False).load('candidate')
+    assert state['answers'] == ['A1']
+    assert state['current_question'] == 1
+    assert state['speech_detected'] is True
+    assert second.get_stats()['cas_conflicts'] == 1
+
+def test_compare_and_swap_rejects_stale_version(store):
+    expires_at = datetime.now() + timedelta(hours=1)
+
+    assert store.compare_and_swap_interview_data('candidate', 'snapshot', '{}', 0, 1, expires_at)
+    assert not store.compare_and_swap_interview_data('candidate', 'snapshot', '{"a": 1}', 0, 1, expires_at)
+    assert store.compare_and_swap_interview_data('candidate', 'snapshot', None, 1, 4, expires_at)
+    assert store.get_interview_data_version('candidate', 'snapshot') == ('{}', 4)
+
+def test_failed_event_insert_does_not_claim_sequence_numbers(store):
+    log = InterviewEventLog()
+    assert log.save('candidate', _started_state())
+    _, version = store.get_interview_data_version('candidate', 'snapshot')
+
+    # The version bump succeeds, then the event insert fails in the same transaction
+    store._connection().execute("""
+        CREATE TRIGGER fail_event_insert BEFORE INSERT ON interview_events
+        BEGIN SELECT RAISE(ABORT, 'disk full'); END
+    """)
+    assert log.save('candidate', dict(_started_state(), answers=['A1'], current_question=1)) is False
+    assert store.get_interview_data_version('candidate', 'snapshot')[1] == version
+
+    store._connection().execute("DROP TRIGGER fail_event_insert")
+    assert log.save('candidate', dict(_started_state(), answers=['A1'], current_question=1))
+    state = InterviewEventLog().load('candidate')
+    assert state['answers'] == ['A1']
+    assert state['current_question'] == 1
+
+def test_failed_write_through_save_is_retried_by_flusher():
+    stored = {}
+    outage = {'down': True}
+
+    def saver(user_id, data):
+        if outage['down']:
+            raise ConnectionError("database unavailable")
+        stored[user_id] = data
+        return True
+
+    cache = InterviewStateCache(loader=stored.get, saver=saver, mode='write_through', flush_interval=60)
+    state = _started_state()
+    state['answers'] = ['A1']
+
+    # The error does not reach the request; the entry stays dirty for the flusher
+    assert cache.put('candidate', state) is False
+    assert cache.get_stats()['dirty'] == 1
+    assert cache.get_stats()['write_failures'] == 1
+    assert cache._flusher is not None
+
+    outage['down'] = False
+    cache.shutdown()
+    assert stored['candidate']['answers'] == ['A1']
+    assert cache.get_stats()['dirty'] == 0
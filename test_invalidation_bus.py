@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite-backed cross-worker invalidation bus
+"""
+from backend.services.invalidation_bus import InvalidationBus
+from backend.services.interview_state_cache import InterviewStateCache
+
+def _bus(path):
+    # A long poll interval keeps the background poller out of the way; tests call poll() directly
+    bus = InvalidationBus(path=str(path), poll_interval=3600, retention=300, enabled=True)
+    bus.start()
+    return bus
+
+def test_other_workers_receive_invalidations(tmp_path):
+    path = tmp_path / "bus.db"
+    writer, reader = _bus(path), _bus(path)
+    writer_seen, reader_seen = [], []
+    writer.subscribe('interview_state', writer_seen.append)
+    reader.subscribe('interview_state', reader_seen.append)
+    reader.subscribe('session', lambda key: reader_seen.append(('session', key)))
+
+    writer.publish('interview_state', 'candidate@example.com')
+    writer.publish('session', 'abc123')
+
+    assert reader.poll() == 2
+    assert reader_seen == ['candidate@example.com', ('session', 'abc123')]
+    # A worker does not evict its own, already current, entries
+    writer.poll()
+    assert writer_seen == []
+    assert reader.get_stats()['received'] == 2
+
+def test_invalidation_evicts_clean_cached_state_only(tmp_path):
+    stored = {'clean': {'current_question': 1}, 'dirty': {'current_question': 1}}
+    cache = InterviewStateCache(
+        loader=lambda user_id: dict(stored[user_id]),
+        saver=lambda user_id, data: True,
+        mode='write_behind',
+        flush_interval=3600
+    )
+    cache.get('clean')
+    cache.put('dirty', {'current_question': 2})
+
+    writer, reader = _bus(tmp_path / "bus.db"), _bus(tmp_path / "bus.db")
+    reader.subscribe('interview_state', lambda user_id: cache.invalidate(user_id, keep_dirty=True))
+    writer.publish('interview_state', 'clean')
+    writer.publish('interview_state', 'dirty')
+    reader.poll()
+
+    assert 'clean' not in cache.entries
+    assert cache.get('dirty')['current_question'] == 2
+    cache.shutdown()
+
+def test_bus_does_nothing_until_started(tmp_path):
+    path = tmp_path / "spool" / "bus.db"
+    bus = InvalidationBus(path=str(path), poll_interval=3600, retention=300, enabled=True)
+    bus.subscribe('interview_state', lambda key: None)
+    bus.publish('interview_state', 'candidate@example.com')
+
+    # Subscribing and publishing before app setup neither creates the feed nor starts a poller
+    assert not path.parent.exists()
+    assert bus._poller is None
+    assert bus.get_stats()['published'] == 0
+
+    bus.start()
+    bus.publish('interview_state', 'candidate@example.com')
+    assert path.exists()
+    assert bus.get_stats()['published'] == 1
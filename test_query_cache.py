@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the read-only query cache
+"""
+import contextlib
+
+from backend.services import query_cache
+from backend.services.query_cache import QueryCache
+
+class FakeCursor:
+    description = [('ID',)]
+
+    def __init__(self, results, on_execute):
+        self.results = results
+        self.on_execute = on_execute
+
+    def execute(self, sql, params=None):
+        self.on_execute()
+
+    def fetchall(self):
+        return [(self.results.pop(0),)]
+
+    def close(self):
+        pass
+
+def _fake_connection(monkeypatch, results, on_execute=lambda: None):
+    @contextlib.contextmanager
+    def pooled_connection():
+        yield type('FakeConnection', (), {'cursor': lambda self: FakeCursor(results, on_execute)})()
+
+    monkeypatch.setattr(query_cache, 'pooled_connection', pooled_connection)
+
+def test_results_are_cached_until_invalidated(monkeypatch):
+    cache = QueryCache(ttl=60, max_entries=10)
+    _fake_connection(monkeypatch, [1, 2])
+
+    assert cache.query('SELECT id FROM interview', tables=('interview',))[0] == [(1,)]
+    assert cache.query('SELECT id FROM interview', tables=('interview',))[0] == [(1,)]
+    cache.invalidate_tables('INTERVIEW')
+    assert cache.query('SELECT id FROM interview', tables=('interview',))[0] == [(2,)]
+    assert cache.get_stats()['hits'] == 1
+
+def test_result_read_during_a_write_is_not_cached(monkeypatch):
+    cache = QueryCache(ttl=60, max_entries=10)
+    # The write lands while the SELECT is in flight
+    _fake_connection(monkeypatch, [1, 2], on_execute=lambda: cache.invalidate_tables('interview'))
+
+    assert cache.query('SELECT id FROM interview', tables=('interview',))[0] == [(1,)]
+    assert cache.get_stats()['entries'] == 0
+    assert cache.query('SELECT id FROM interview', tables=('interview',))[0] == [(2,)]
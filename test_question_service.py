@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for question finalization, schedule-time pre-generation and the question bank
+"""
+import threading
+import time
+
+from backend.services import question_service
+from backend.services.question_service import (
+    QuestionBank,
+    QuestionPregenerator,
+    finalize_questions,
+    question_bank_key,
+    FALLBACK_QUESTIONS
+)
+
+def test_finalize_sanitizes_dedupes_and_pads():
+    questions = finalize_questions(['**Question 1:** What is REST?', 'What is REST?', '', None, '* Explain indexing *'])
+
+    assert questions[:2] == ['What is REST?', 'Explain indexing']
+    assert questions[2:] == FALLBACK_QUESTIONS[:3]
+
+def test_start_takes_pregenerated_questions_once(monkeypatch):
+    stored = {}
+    release = threading.Event()
+
+    def generate(jd_text, difficulty, roll_no, language):
+        release.wait(5)
+        return [f'{difficulty} {language} Q{i}' for i in range(5)]
+
+    monkeypatch.setattr(question_service, 'generate_interview_questions', generate)
+    monkeypatch.setattr(question_service, 'store_questions', stored.__setitem__)
+    monkeypatch.setattr(question_service, 'take_questions', lambda interview_id: stored.pop(interview_id, None))
+    pregenerator = QuestionPregenerator(workers=1, wait_timeout=5)
+
+    # Not scheduled: the caller generates live
+    assert pregenerator.take('interview-0') is None
+
+    # Started while the job is still running: waits for it instead of generating again
+    pregenerator.enqueue('interview-1', 'Python developer JD', 'medium', 'R1', 'hindi')
+    threading.Timer(0.1, release.set).start()
+    assert pregenerator.take('interview-1') == [f'medium hindi Q{i}' for i in range(5)]
+
+    # Taken questions are consumed, so a restarted interview gets a fresh draw
+    assert pregenerator.take('interview-1') is None
+    stats = pregenerator.get_stats()
+    assert stats['generated'] == 1
+    assert stats['pending'] == 0
+    assert stats['waited_for_job'] == 1
+    assert stats['pregenerated_starts'] == 1
+
+def _in_memory_bank(generate):
+    bank = QuestionBank(enabled=True, generate=generate, max_sets=20, wait_timeout=5)
+    banked, usage = {}, []
+
+    def load(bank_key, roll_no):
+        use_counts, seen = {}, set()
+        for key, set_id, used_by, question in usage:
+            if key == bank_key:
+                use_counts[set_id] = use_counts.get(set_id, 0) + 1
+                if used_by == roll_no:
+                    seen.add(question)
+        return list(banked.get(bank_key, {}).items()), use_counts, seen
+
+    bank._load = load
+    bank._add = lambda bank_key, set_id, questions: banked.setdefault(bank_key, {}).__setitem__(set_id, list(questions))
+    bank._record_usage = lambda bank_key, set_id, roll_no, questions: usage.extend(
+        (bank_key, set_id, roll_no, q) for q in questions
+    )
+    return bank
+
+def test_question_bank_rotates_whole_sets_without_repeats():
+    calls = []
+
+    def generate(jd_text, difficulty, roll_no, language):
+        calls.append(roll_no)
+        return [f'Q{len(calls)}-{i}' for i in range(5)]
+
+    bank = _in_memory_bank(generate)
+    jd = 'Python developer\n  with Django'
+
+    first = bank.draw(jd, 'medium', 'R1', 'english')
+    # Same JD content, different whitespace and case: served from the bank, in generated order
+    second = bank.draw(' python DEVELOPER with django ', 'Medium', 'R2', 'English')
+    assert second == first == [f'Q1-{i}' for i in range(5)]
+    assert calls == ['R1']
+
+    # The only set has been asked to R1, so a retake generates a new one
+    retake = bank.draw(jd, 'medium', 'R1', 'english')
+    assert retake == [f'Q2-{i}' for i in range(5)]
+    assert calls == ['R1', 'R1']
+
+    # R3 gets the least used set: the retake set, used once, over the first set, used twice
+    assert bank.draw(jd, 'medium', 'R3', 'english') == retake
+    assert bank.get_stats()['hit_rate_percent'] == 50.0
+
+    assert question_bank_key(jd, 'medium', 'english') != question_bank_key(jd, 'hard', 'english')
+
+def test_concurrent_misses_generate_once():
+    calls = []
+    release = threading.Event()
+
+    def generate(jd_text, difficulty, roll_no, language):
+        calls.append(roll_no)
+        release.wait(5)
+        return [f'Q{i}' for i in range(5)]
+
+    bank = _in_memory_bank(generate)
+    results = {}
+    first = threading.Thread(target=lambda: results.setdefault('R1', bank.draw('JD', 'medium', 'R1')))
+    first.start()
+    while not calls:
+        time.sleep(0.01)
+    second = threading.Thread(target=lambda: results.setdefault('R2', bank.draw('JD', 'medium', 'R2')))
+    second.start()
+    while not bank.get_stats()['waits']:
+        time.sleep(0.01)
+    release.set()
+    first.join()
+    second.join()
+
+    assert calls == ['R1']
+    assert results['R1'] == results['R2'] == [f'Q{i}' for i in range(5)]
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for dirty-tracking persistence in DatabaseSessionInterface
+"""
+import pytest
+from flask import Flask, session
+
+from config import Config
+from backend.services import session_store
+from backend.services.session_service import get_session, session_touch_buffer
+from backend.utils.session_interface import DatabaseSessionInterface, session_cache
+
+@pytest.fixture
+def store(tmp_path):
+    sqlite_store = session_store.SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    previous = session_store.get_session_store()
+    session_store.set_session_store(sqlite_store)
+    yield sqlite_store
+    # Write buffered touches while the SQLite store is still installed
+    session_touch_buffer.flush()
+    session_store.set_session_store(previous)
+
+@pytest.fixture
+def app(store):
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.session_interface = DatabaseSessionInterface(app)
+
+    @app.route('/login/<user>')
+    def login(user):
+        session['user'] = user
+        session['role'] = 'student'
+        return 'ok'
+
+    @app.route('/whoami')
+    def whoami():
+        return session.get('user', '')
+
+    @app.route('/same_role')
+    def same_role():
+        session['role'] = 'student'
+        return 'ok'
+
+    @app.route('/set_step/<int:step>')
+    def set_step(step):
+        session['step'] = step
+        return 'ok'
+
+    return app
+
+@pytest.fixture
+def statements(store):
+    """Record every SQL statement the test thread sends to the session store"""
+    executed = []
+    store._connection().set_trace_callback(executed.append)
+    yield executed
+    store._connection().set_trace_callback(None)
+
+def _login(client):
+    client.get('/login/student@example.com')
+    return client.get_cookie(Config.SESSION_COOKIE_NAME).value
+
+def test_read_only_requests_issue_no_statements(app, statements):
+    client = app.test_client()
+    _login(client)
+    statements.clear()
+
+    for _ in range(5):
+        assert client.get('/whoami').data == b'student@example.com'
+    assert client.get('/same_role').status_code == 200
+
+    assert statements == []
+
+def test_changed_session_is_saved_in_one_statement(app, statements):
+    client = app.test_client()
+    session_id = _login(client)
+    statements.clear()
+
+    client.get('/set_step/2')
+
+    assert len(statements) == 1
+    assert statements[0].lstrip().startswith('INSERT INTO user_sessions')
+    session_cache.invalidate(session_id)
+    assert get_session(session_id)['step'] == 2
+
+def test_unchanged_session_after_cache_miss_only_reads(app, statements):
+    client = app.test_client()
+    session_id = _login(client)
+    session_cache.invalidate(session_id)
+    statements.clear()
+
+    client.get('/same_role')
+
+    assert len(statements) == 1
+    assert statements[0].lstrip().startswith('SELECT')
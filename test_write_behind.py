@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-process write-behind spool and dead-lettering of failing records
+"""
+import json
+import os
+from contextlib import contextmanager
+
+from backend.services import write_behind
+from backend.services.write_behind import WriteBehindQueue
+
+def _queue(tmp_path, **kwargs):
+    # A long flush interval keeps the background writer idle; tests call flush_once() directly
+    return WriteBehindQueue(spool_path=str(tmp_path / "write_behind.jsonl"), flush_interval=3600, **kwargs)
+
+def _spool_line(entry):
+    return json.dumps(entry) + "\n"
+
+def test_spools_of_dead_processes_are_adopted_once(tmp_path):
+    # A live process (this test runner's parent) and a process that no longer exists
+    live = tmp_path / f"write_behind.{os.getppid()}.jsonl"
+    dead = tmp_path / "write_behind.999999999.jsonl"
+    live.write_text(_spool_line({'id': 'live', 'kind': 'interview_status', 'params': ['a', 'ts']}))
+    dead.write_text(
+        _spool_line({'id': 'done', 'kind': 'interview_status', 'params': ['b', 'ts']})
+        + _spool_line({'id': 'lost', 'kind': 'interview_status', 'params': ['c', 'ts']})
+        + _spool_line({'ack': ['done']})
+    )
+
+    queue = _queue(tmp_path)
+    assert [entry['id'] for entry in queue.pending] == ['lost']
+    assert not dead.exists()
+    assert live.exists()
+    assert queue.spool_path == str(tmp_path / f"write_behind.{os.getpid()}.jsonl")
+
+    # The adopted record is now durable in this process's own spool
+    with open(queue.spool_path) as spool:
+        assert [json.loads(line)['id'] for line in spool] == ['lost']
+
+def test_failing_record_is_retried_alone_then_dead_lettered(tmp_path, monkeypatch):
+    written = []
+
+    class Cursor:
+        def execute(self, sql, params=None):
+            if sql != "BEGIN":
+                written.append(params)
+
+        def close(self):
+            pass
+
+    class Connection:
+        def cursor(self):
+            return Cursor()
+
+        def commit(self):
+            pass
+
+        def rollback(self):
+            pass
+
+    @contextmanager
+    def pooled_connection():
+        yield Connection()
+
+    def write_batch(cs, batch):
+        if any(entry['params'][0] == 'bad' for entry in batch):
+            raise ValueError("rejected")
+        for entry in batch:
+            cs.execute("UPDATE", entry['params'])
+
+    monkeypatch.setattr(write_behind, 'pooled_connection', pooled_connection)
+    monkeypatch.setattr(write_behind, 'invalidate_tables', lambda *tables: None)
+    queue = _queue(tmp_path, max_attempts=2)
+    monkeypatch.setattr(queue, '_write_batch', write_batch)
+    # Stop the background writer so the test drives every flush
+    queue._closed.set()
+    queue._wakeup.set()
+    queue._writer.join()
+    for email in ('bad', 'good-1', 'good-2'):
+        queue.enqueue('interview_status', [email, 'ts'])
+
+    assert not queue.flush_once()        # whole batch fails
+    assert queue.flush_once()            # bad record alone fails again and is dead-lettered
+    # The rest of the failed batch go through, one at a time
+    assert queue.flush_once() and queue.flush_once()
+    assert written == [['good-1', 'ts'], ['good-2', 'ts']]
+    assert queue.depth() == 0
+    assert queue.get_stats()['dead_lettered'] == 1
+    with open(queue.dead_letter_path) as dead_letters:
+        assert json.loads(dead_letters.readline())['params'] == ['bad', 'ts']